@@ -1,16 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import pandas as pd
 import os
+import re
 import datetime
 
-from app.database import get_db_connection, get_all_labeled_data
+from app.database import get_db_connection
+from app.exporter import has_labeled_data, export_labeled_data
+from app.search import search_videos
+from app.label_query import get_labels_page
+from app.replica import get_replica_stats
+from app.retries import get_retry_stats, get_dead_letters, requeue_dead_letters
+from app.thumbnail_store import thumbnail_store
+from app.thumbnail_derivatives import derivative_path, queue_derivatives
+from config import THUMBNAIL_VARIANTS, THUMBNAIL_CACHE_MAX_AGE
 from app.utils import secure_filename
+from api.security import issue_token, revoke_token, get_token_claims, require_admin
+from api.repository import run_db, stream_db
 
 router = APIRouter()
 
+_THUMBNAIL_HASH = re.compile(r'[0-9a-f]{64}')
+
 class AuthRequest(BaseModel):
     username: str
     password: str
@@ -20,18 +33,29 @@ class DataResponse(BaseModel):
     message: str
     data: Optional[dict] = None
 
+class RequeueRequest(BaseModel):
+    video_ids: Optional[List[str]] = None
+    error_class: Optional[str] = None
+
 @router.post("/api/auth", response_model=DataResponse)
 async def authenticate(auth_req: AuthRequest):
-    """Authenticate admin for API access"""
+    """Authenticate admin and issue a bearer token for API access"""
     from app.database import authenticate_user
     
-    user = authenticate_user(auth_req.username, auth_req.password)
+    user = await run_db("auth", authenticate_user, auth_req.username, auth_req.password)
     
     if user and user['is_admin']:
+        token, expires_at = issue_token(user)
         return {
             "success": True,
             "message": "Authentication successful",
-            "data": {"user_id": user['id'], "username": user['username']}
+            "data": {
+                "user_id": user['id'],
+                "username": user['username'],
+                "access_token": token,
+                "token_type": "bearer",
+                "expires_at": expires_at
+            }
         }
     
     raise HTTPException(
@@ -39,62 +63,212 @@ async def authenticate(auth_req: AuthRequest):
         detail="Invalid credentials",
     )
 
+@router.post("/api/auth/revoke", response_model=DataResponse)
+async def revoke(claims: dict = Depends(get_token_claims)):
+    """Revoke the bearer token used for this request"""
+    await run_db("auth", revoke_token, claims)
+    return {
+        "success": True,
+        "message": "Token revoked"
+    }
+
 @router.get("/api/export-data")
-async def export_data(username: str, password: str):
-    """Export labeled data as CSV"""
-    from app.database import authenticate_user
-    
-    # Authenticate
-    user = authenticate_user(username, password)
+async def export_data(
+    format: str = "csv",
+    since: Optional[str] = None,
+    compress: bool = False,
+    claims: dict = Depends(require_admin)
+):
+    """Stream labeled data as CSV, NDJSON, Parquet or Arrow IPC.
     
-    if not user or not user['is_admin']:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Unauthorized access",
-        )
-    
-    # Get data
-    df = get_all_labeled_data()
-    
-    if df.empty:
+    Pass the X-Next-Cursor header of a previous export as `since` to get
+    only the labels added after it.
+    """
+    if not since and not await run_db("export", has_labeled_data):
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={"message": "No data available"}
         )
     
-    # Create CSV file
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"youtube_clickbait_data_{timestamp}.csv"
-    filepath = f"/tmp/{filename}"
+    try:
+        body, media_type, extension, next_cursor = await run_db(
+            "export", export_labeled_data, format, since=since, compress=compress
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     
-    df.to_csv(filepath, index=False)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"youtube_clickbait_data_{timestamp}.{extension}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
     
-    # Return file
-    return FileResponse(
-        path=filepath, 
-        filename=filename,
-        media_type="text/csv"
+    # Rows are fetched and encoded as the client reads them
+    return StreamingResponse(
+        stream_db("export", body), media_type=media_type, headers=headers
     )
 
 @router.get("/api/stats")
-async def get_stats(username: str, password: str):
+async def get_stats(claims: dict = Depends(require_admin)):
     """Get system statistics"""
-    from app.database import authenticate_user, get_admin_dashboard_stats
+    from app.database import get_admin_dashboard_stats, get_pool_stats
     
-    # Authenticate
-    user = authenticate_user(username, password)
+    # Get stats
+    stats = await run_db("stats", get_admin_dashboard_stats)
+    stats['db_pool'] = get_pool_stats()
+    stats['replica'] = get_replica_stats()
     
-    if not user or not user['is_admin']:
+    return {
+        "success": True,
+        "message": "Statistics retrieved successfully",
+        "data": stats
+    }
+
+@router.get("/api/dead-letters")
+async def list_dead_letters(
+    error_class: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    claims: dict = Depends(require_admin)
+):
+    """List videos whose extraction failed for good, with the retry backlog counts"""
+    videos = await run_db("retries", get_dead_letters, error_class=error_class, limit=limit, offset=offset)
+    retry_stats = await run_db("retries", get_retry_stats)
+    return {
+        "success": True,
+        "message": f"Found {len(videos)} dead-lettered videos",
+        "data": {"videos": videos, "stats": retry_stats}
+    }
+
+@router.post("/api/dead-letters/requeue", response_model=DataResponse)
+async def requeue(request: RequeueRequest, claims: dict = Depends(require_admin)):
+    """Requeue dead-lettered videos: the given IDs, else all (of `error_class`, if given)"""
+    count = await run_db(
+        "retries", requeue_dead_letters,
+        video_ids=request.video_ids, error_class=request.error_class
+    )
+    return {
+        "success": True,
+        "message": f"{count} videos requeued for processing",
+        "data": {"requeued": count}
+    }
+
+@router.get("/api/search")
+async def search(
+    q: Optional[str] = None,
+    channel: Optional[str] = None,
+    is_clickbait: Optional[bool] = None,
+    confidence_level: Optional[int] = Query(None, ge=1, le=4),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=200),
+    claims: dict = Depends(require_admin)
+):
+    """Ranked full-text search over titles, descriptions and channels"""
+    try:
+        results = await run_db(
+            "search", search_videos, q, channel=channel, is_clickbait=is_clickbait,
+            confidence_level=confidence_level, page=page, page_size=page_size
+        )
+    except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Unauthorized access",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
         )
     
-    # Get stats
-    stats = get_admin_dashboard_stats()
+    return {
+        "success": True,
+        "message": "Search completed successfully",
+        "data": results
+    }
+
+@router.get("/api/labels")
+async def list_labels(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = None,
+    user: Optional[str] = None,
+    labeled_from: Optional[str] = None,
+    labeled_to: Optional[str] = None,
+    is_clickbait: Optional[bool] = None,
+    confidence_level: Optional[int] = Query(None, ge=1, le=4),
+    channel: Optional[str] = None,
+    claims: dict = Depends(require_admin)
+):
+    """Page through labels newest first; pass `next_cursor` back as `cursor`.
+    
+    `fields` is a comma-separated column list (description is left out by default).
+    """
+    try:
+        page = await run_db(
+            "labels", get_labels_page,
+            cursor=cursor,
+            limit=limit,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+            username=user,
+            labeled_from=labeled_from,
+            labeled_to=labeled_to,
+            is_clickbait=is_clickbait,
+            confidence_level=confidence_level,
+            channel=channel
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     
     return {
         "success": True,
-        "message": "Statistics retrieved successfully",
-        "data": stats
-    }
\ No newline at end of file
+        "message": "Labels retrieved successfully",
+        "data": page
+    }
+
+@router.get("/thumbnails/{variant}/{digest}.webp")
+async def get_thumbnail_variant(variant: str, digest: str):
+    """Serve a resized thumbnail; URLs are content-addressed, so responses never change.
+    
+    Only rendered files are served. This route needs no token, so a missing
+    variant is queued for the background pool rather than rendered here.
+    """
+    if variant not in THUMBNAIL_VARIANTS or not _THUMBNAIL_HASH.fullmatch(digest):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Thumbnail not found")
+    
+    path = derivative_path(digest, variant)
+    if not os.path.exists(path):
+        if not os.path.exists(thumbnail_store.blob_path(digest)):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Thumbnail not found")
+        queue_derivatives([digest])
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Thumbnail not rendered yet",
+            headers={"Retry-After": "5"},
+        )
+    
+    return FileResponse(
+        path,
+        media_type="image/webp",
+        headers={"Cache-Control": f"public, max-age={THUMBNAIL_CACHE_MAX_AGE}, immutable"}
+    )
+
+@router.get("/api/thumbnails/{video_id}")
+async def get_video_thumbnail(video_id: str, variant: str = "ui"):
+    """Redirect to the current thumbnail of a video"""
+    if variant not in THUMBNAIL_VARIANTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown variant {variant!r}; choose from {', '.join(THUMBNAIL_VARIANTS)}",
+        )
+    
+    digest = (await run_db("thumbnails", thumbnail_store.lookup, [video_id])).get(video_id)
+    if digest is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Thumbnail not found")
+    
+    # A video's thumbnail can change, so only the redirect is short-lived
+    return RedirectResponse(
+        f"/thumbnails/{variant}/{digest}.webp",
+        status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+        headers={"Cache-Control": "public, max-age=300"}
+    )
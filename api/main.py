@@ -29,8 +29,15 @@ async def root():
         "message": "YouTube Clickbait Data API",
         "endpoints": [
             "/api/auth",
+            "/api/auth/revoke",
             "/api/export-data",
-            "/api/stats"
+            "/api/stats",
+            "/api/dead-letters",
+            "/api/dead-letters/requeue",
+            "/api/search",
+            "/api/labels",
+            "/api/thumbnails/{video_id}",
+            "/thumbnails/{variant}/{hash}.webp"
         ],
         "version": "1.0.0"
     }
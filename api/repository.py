@@ -0,0 +1,131 @@
+"""Async access to the blocking database layer for the API.
+
+Handlers must not call sqlite or pandas code directly on the event loop:
+one slow export would stall every other request. Database work is
+instead submitted to thread pools, one per endpoint group, each sized to
+the group's concurrency limit and with its own timeout. Exports or
+thumbnail renders therefore cannot occupy the threads that cheap calls
+like /api/stats and /api/auth need.
+
+A call that times out returns 504 at once, but its thread keeps running
+until the database call finishes, so it keeps its slot until then. The
+limits cap the work actually running, not just the requests waiting.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, status
+
+from config import API_DB_MAX_WORKERS, API_ENDPOINT_LIMITS
+
+# Per endpoint group; created lazily
+_executors = {}
+
+# Created lazily so they bind to the server's running event loop
+_semaphores = {}
+
+_DONE = object()
+
+
+def _get_limits(endpoint):
+    return API_ENDPOINT_LIMITS.get(endpoint, (API_DB_MAX_WORKERS, 30))
+
+
+def _get_executor(endpoint):
+    executor = _executors.get(endpoint)
+    if executor is None:
+        max_concurrent, _ = _get_limits(endpoint)
+        executor = _executors[endpoint] = ThreadPoolExecutor(
+            max_workers=max_concurrent, thread_name_prefix=f"api-{endpoint}"
+        )
+    return executor
+
+
+class _Slot:
+    """One concurrency slot; released only once the work started in it has finished"""
+
+    def __init__(self, semaphore):
+        self._semaphore = semaphore
+        self._running = None
+
+    def track(self, future):
+        self._running = future
+
+    async def idle(self):
+        """Wait until the work started in this slot (e.g. after a timeout) has finished"""
+        if self._running is not None and not self._running.done():
+            await asyncio.wait({self._running})
+
+    def release(self):
+        if self._running is not None and not self._running.done():
+            self._running.add_done_callback(lambda _: self._semaphore.release())
+        else:
+            self._semaphore.release()
+
+
+@asynccontextmanager
+async def endpoint_slot(endpoint):
+    """Hold one of the endpoint group's concurrency slots; 503 if none frees up in time"""
+    max_concurrent, timeout = _get_limits(endpoint)
+    semaphore = _semaphores.get(endpoint)
+    if semaphore is None:
+        semaphore = _semaphores[endpoint] = asyncio.Semaphore(max_concurrent)
+
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Too many concurrent {endpoint} requests, try again later",
+        )
+    slot = _Slot(semaphore)
+    try:
+        yield slot
+    finally:
+        slot.release()
+
+
+async def _in_executor(endpoint, slot, func, *args, **kwargs):
+    _, timeout = _get_limits(endpoint)
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_get_executor(endpoint), functools.partial(func, *args, **kwargs))
+    slot.track(future)
+    # Unlike wait_for, wait leaves the future alone on timeout, so the slot
+    # is released when the thread is really done
+    done, _ = await asyncio.wait({future}, timeout=timeout)
+    if not done:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"{endpoint} request timed out",
+        )
+    return future.result()
+
+
+async def run_db(endpoint, func, *args, **kwargs):
+    """Run a blocking database call off the event loop within the endpoint's limits"""
+    async with endpoint_slot(endpoint) as slot:
+        return await _in_executor(endpoint, slot, func, *args, **kwargs)
+
+
+async def stream_db(endpoint, iterator):
+    """Drain a blocking iterator (e.g. an export) chunk by chunk off the event loop.
+
+    The endpoint slot is held for the whole stream; the timeout applies to
+    each chunk.
+    """
+    async with endpoint_slot(endpoint) as slot:
+        try:
+            while True:
+                chunk = await _in_executor(endpoint, slot, next, iterator, _DONE)
+                if chunk is _DONE:
+                    break
+                yield chunk
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                # A generator cannot be closed while a timed-out next() still runs
+                await slot.idle()
+                await _in_executor(endpoint, slot, close)
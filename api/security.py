@@ -0,0 +1,213 @@
+"""Signed, expiring bearer tokens for the API.
+
+Tokens are ``<payload>.<signature>`` where the payload is base64url JSON
+and the signature an HMAC-SHA256 over it. Verified tokens are kept in a
+small in-process LRU cache for API_TOKEN_CACHE_SECONDS, so repeated
+requests with the same token need neither a signature check nor a
+database hit. A cache miss also checks the revocation table, which bounds
+how long a token revoked in another process stays usable.
+"""
+
+import os
+import re
+import hmac
+import json
+import time
+import base64
+import hashlib
+import secrets
+import tempfile
+import threading
+from collections import OrderedDict
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from config import (
+    API_TOKEN_TTL_MINUTES,
+    API_TOKEN_CACHE_SECONDS,
+    API_TOKEN_CACHE_SIZE,
+    API_TOKEN_SECRET,
+    API_TOKEN_SECRET_FILE,
+)
+from app.database import is_api_token_revoked, revoke_api_token
+from api.repository import run_db
+
+
+class InvalidToken(Exception):
+    """Raised for malformed, forged, expired or revoked tokens"""
+
+
+_SECRET_READ_ATTEMPTS = 20
+_TOKEN_PATTERN = re.compile(r'[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+')
+
+
+def _load_secret():
+    if API_TOKEN_SECRET:
+        return API_TOKEN_SECRET.encode()
+
+    # Share one generated secret between all processes on this host. The
+    # secret is written to a temp file and linked into place, so other
+    # processes see either no file or the complete secret
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(API_TOKEN_SECRET_FILE), suffix='.part')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(secrets.token_hex(32))
+        os.link(tmp_path, API_TOKEN_SECRET_FILE)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp_path)
+
+    for _ in range(_SECRET_READ_ATTEMPTS):
+        with open(API_TOKEN_SECRET_FILE) as f:
+            secret = f.read().strip()
+        if secret:
+            return secret.encode()
+        time.sleep(0.1)
+    raise RuntimeError(
+        f"API token secret file {API_TOKEN_SECRET_FILE} is empty; "
+        "delete it or set API_TOKEN_SECRET"
+    )
+
+
+_secret = _load_secret()
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(data):
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def _sign(payload):
+    return _b64encode(hmac.new(_secret, payload.encode('ascii'), hashlib.sha256).digest())
+
+
+def issue_token(user):
+    """Issue a bearer token for a user row; returns (token, expires_at)"""
+    expires_at = int(time.time() + API_TOKEN_TTL_MINUTES * 60)
+    claims = {
+        'uid': user['id'],
+        'usr': user['username'],
+        'adm': bool(user['is_admin']),
+        'exp': expires_at,
+        'jti': secrets.token_urlsafe(12),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode())
+    return f"{payload}.{_sign(payload)}", expires_at
+
+
+class TokenCache:
+    """LRU cache of verified token claims with a per-entry TTL"""
+
+    def __init__(self, max_size=API_TOKEN_CACHE_SIZE, ttl=API_TOKEN_CACHE_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            claims, cached_until = entry
+            if cached_until < time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return claims
+
+    def put(self, token, claims):
+        # Never cache past the token's own expiry
+        cached_until = min(time.time() + self.ttl, claims['exp'])
+        with self._lock:
+            self._entries[token] = (claims, cached_until)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict_jti(self, jti):
+        with self._lock:
+            for token in [t for t, (c, _) in self._entries.items() if c['jti'] == jti]:
+                del self._entries[token]
+
+
+token_cache = TokenCache()
+
+
+def _check_token(token):
+    """Claims of a well-formed, correctly signed, unexpired token; raises InvalidToken"""
+    # Both parts are base64url; anything else (e.g. non-ASCII) is rejected
+    # before it reaches the signature check
+    if not _TOKEN_PATTERN.fullmatch(token):
+        raise InvalidToken("Malformed token")
+    payload, signature = token.split('.')
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise InvalidToken("Invalid token signature")
+
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        raise InvalidToken("Malformed token")
+    if claims['exp'] < time.time():
+        raise InvalidToken("Token expired")
+    return claims
+
+
+async def verify_token(token):
+    """Return the token's claims or raise InvalidToken.
+
+    On a cache miss the revocation lookup goes through run_db, so it
+    counts against the "auth" endpoint group's database limits.
+    """
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+
+    claims = _check_token(token)
+    if await run_db("auth", is_api_token_revoked, claims['jti']):
+        raise InvalidToken("Token revoked")
+
+    token_cache.put(token, claims)
+    return claims
+
+
+def revoke_token(claims):
+    """Revoke a token everywhere; immediate in this process"""
+    revoke_api_token(claims['jti'], claims['exp'])
+    token_cache.evict_jti(claims['jti'])
+
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def get_token_claims(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)):
+    """FastAPI dependency: claims of the bearer token in the Authorization header"""
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing bearer token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        return await verify_token(credentials.credentials)
+    except InvalidToken as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+async def require_admin(claims: dict = Depends(get_token_claims)):
+    """FastAPI dependency: only admin tokens are accepted"""
+    if not claims['adm']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return claims
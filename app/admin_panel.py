@@ -5,8 +5,12 @@ import datetime
 import matplotlib.pyplot as plt
 import json
 
-from app.database import get_admin_dashboard_stats, get_all_labeled_data, save_instructions, get_instructions
+from app.database import get_admin_dashboard_stats, get_all_labeled_data, save_instructions, get_instructions, get_pool_stats
+from app.exporter import EXPORT_FORMATS, export_labeled_data
+from app.search import search_videos
 from app.youtube_scraper import YouTubeVideoFetcher
+from app.sources import add_source, remove_source, get_sources, get_source_syncs, sync_source
+from app.retries import get_retry_stats, get_dead_letters, requeue_dead_letters
 from app.auth import logout_user
 
 def render_admin_panel():
@@ -16,6 +20,8 @@ def render_admin_panel():
     menu_options = [
         "Dashboard",
         "Add Videos",
+        "Sources",
+        "Failed Videos",
         "Upload CSV",
         "View Data",
         "Export Data",
@@ -29,6 +35,10 @@ def render_admin_panel():
         render_admin_dashboard()
     elif choice == "Add Videos":
         render_add_videos()
+    elif choice == "Sources":
+        render_sources()
+    elif choice == "Failed Videos":
+        render_failed_videos()
     elif choice == "Upload CSV":
         render_csv_upload()
     elif choice == "View Data":
@@ -44,7 +54,7 @@ def render_admin_dashboard():
     """Render admin dashboard with statistics"""
     st.header("Dashboard")
     
-    # Get statistics
+    # Get statistics (O(1) counters kept current by triggers)
     stats = get_admin_dashboard_stats()
     
     # Display summary statistics
@@ -78,6 +88,10 @@ def render_admin_dashboard():
         st.pyplot(fig)
     else:
         st.write("No contributions yet.")
+    
+    # Connection pool counters for this process
+    with st.expander("Database Connection Pool", expanded=False):
+        st.json(get_pool_stats())
 
 def render_add_videos():
     """Render form to add videos"""
@@ -108,6 +122,10 @@ def render_add_videos():
                     
                     if df is not None and not df.empty:
                         st.success(f"Successfully added {len(df)} videos for processing!")
+                        if fetcher.skipped:
+                            st.info(f"Skipped {fetcher.skipped} videos already in the database.")
+                    elif fetcher.skipped:
+                        st.info(f"All {fetcher.skipped} videos found are already in the database.")
                     else:
                         st.error("No videos were found or could be processed.")
                 except Exception as e:
@@ -115,6 +133,100 @@ def render_add_videos():
         else:
             st.warning("Please enter a URL")
 
+def render_sources():
+    """Manage channels and playlists that are synced for new videos"""
+    st.header("Tracked Sources")
+    
+    with st.form("add_source"):
+        col1, col2, col3 = st.columns([1, 3, 1])
+        with col1:
+            source_type = st.selectbox("Type", ["channel", "playlist"])
+        with col2:
+            url = st.text_input("Channel or playlist URL")
+        with col3:
+            interval = st.number_input("Sync every (hours)", min_value=1, max_value=168, value=6)
+        if st.form_submit_button("Track Source") and url:
+            try:
+                source_id = add_source(source_type, url, sync_interval_minutes=int(interval) * 60)
+                with st.spinner("Running first sync..."):
+                    result = sync_source(source_id)
+                if result['error']:
+                    st.error(f"Source added, but the sync failed: {result['error']}")
+                else:
+                    st.success(f"Source added: {result['new']} new videos queued for processing")
+            except ValueError as e:
+                st.error(str(e))
+    
+    sources = get_sources()
+    if not sources:
+        st.info("No sources are tracked yet.")
+        return
+    
+    st.dataframe(pd.DataFrame(sources).set_index('id'))
+    
+    source_id = st.selectbox(
+        "Source",
+        [source['id'] for source in sources],
+        format_func=lambda i: next(s['url'] for s in sources if s['id'] == i)
+    )
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if st.button("Sync Now"):
+            with st.spinner("Syncing..."):
+                result = sync_source(source_id)
+            st.success(f"{result['found']} videos found, {result['new']} new, "
+                       f"{result['duration_seconds']:.1f}s")
+    with col2:
+        if st.button("Full Resync"):
+            with st.spinner("Syncing..."):
+                result = sync_source(source_id, full=True)
+            st.success(f"{result['found']} videos found, {result['new']} new, "
+                       f"{result['duration_seconds']:.1f}s")
+    with col3:
+        if st.button("Stop Tracking"):
+            remove_source(source_id)
+            st.experimental_rerun()
+    
+    syncs = get_source_syncs(source_id)
+    if syncs:
+        st.subheader("Recent Syncs")
+        st.dataframe(pd.DataFrame(syncs))
+
+def render_failed_videos():
+    """Show the retry backlog and requeue dead-lettered videos"""
+    st.header("Failed Videos")
+    
+    stats = get_retry_stats()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Due for Processing", stats['due'])
+    with col2:
+        st.metric("Waiting to Retry", stats['waiting'])
+    with col3:
+        st.metric("Dead-Lettered", stats['dead'])
+    
+    if not stats['dead']:
+        st.info("No videos are in the dead-letter table.")
+        return
+    
+    error_class = st.selectbox(
+        "Error class",
+        ["all"] + sorted(stats['dead_by_class']),
+        format_func=lambda c: c if c == "all" else f"{c} ({stats['dead_by_class'][c]})"
+    )
+    error_class = None if error_class == "all" else error_class
+    
+    dead_letters = get_dead_letters(error_class=error_class, limit=500)
+    st.dataframe(pd.DataFrame(dead_letters))
+    
+    selected = st.multiselect(
+        "Videos to requeue (leave empty to requeue everything shown by the filter)",
+        [video['video_id'] for video in dead_letters]
+    )
+    if st.button("Requeue"):
+        count = requeue_dead_letters(video_ids=selected or None, error_class=error_class)
+        st.success(f"{count} videos requeued for processing")
+
 def render_csv_upload():
     """Render CSV upload interface"""
     st.header("Upload Video Data CSV")
@@ -170,7 +282,10 @@ def render_csv_upload():
             
             if st.button("Process CSV Data"):
                 with st.spinner("Processing videos from CSV..."):
-                    success_count = 0
+                    from app.thumbnails import fetch_thumbnails
+                    from app.database import add_videos_bulk
+                    
+                    video_rows = []
                     error_count = 0
                     progress_bar = st.progress(0)
                     
@@ -190,20 +305,7 @@ def render_csv_upload():
                                 'video_url': str(row['video_url']),
                                 'local_thumbnail_path': None
                             }
-                            
-                            # Download thumbnail
-                            from app.youtube_scraper import YouTubeDataScraper
-                            scraper = YouTubeDataScraper()
-                            video_data['local_thumbnail_path'] = scraper.download_thumbnail(
-                                video_data['thumbnail_url'],
-                                video_data['video_id']
-                            )
-                            
-                            # Add to database
-                            from app.database import add_video, mark_video_processed
-                            if add_video(video_data):
-                                mark_video_processed(video_data['video_id'])
-                                success_count += 1
+                            video_rows.append(video_data)
                         except Exception as e:
                             error_count += 1
                             st.error(f"Error processing video {row['video_id']}: {str(e)}")
@@ -211,10 +313,22 @@ def render_csv_upload():
                         # Update progress
                         progress_bar.progress((idx + 1) / len(df))
                     
+                    # Download thumbnails concurrently, skipping ones already on disk
+                    thumbnail_paths = fetch_thumbnails(
+                        (video_data['video_id'], video_data['thumbnail_url'])
+                        for video_data in video_rows
+                    )
+                    for video_data in video_rows:
+                        video_data['local_thumbnail_path'] = thumbnail_paths[video_data['video_id']]
+                    
+                    # Add to database and mark as processed in chunked transactions
+                    result = add_videos_bulk(video_rows, processed=True)
+                    
                     st.success(f"""
                     Processing complete!
-                    - Successfully processed: {success_count} videos
-                    - Errors: {error_count} videos
+                    - Inserted: {result['inserted']} videos
+                    - Updated: {result['updated']} videos
+                    - Errors: {error_count + result['failed']} videos
                     """)
                     
         except Exception as e:
@@ -224,6 +338,39 @@ def render_view_data():
     """View collected and labeled data"""
     st.header("View Labeled Data")
     
+    # Full-text search
+    col1, col2 = st.columns(2)
+    with col1:
+        query = st.text_input("Search titles and descriptions")
+    with col2:
+        channel = st.text_input("Channel")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        label_filter = st.selectbox("Label", ["Any", "Clickbait", "Not clickbait"])
+    with col2:
+        confidence_filter = st.selectbox("Confidence", ["Any", 1, 2, 3, 4])
+    with col3:
+        page = st.number_input("Page", min_value=1, value=1, step=1)
+    
+    if query.strip() or channel.strip():
+        results = search_videos(
+            query,
+            channel=channel,
+            is_clickbait=None if label_filter == "Any" else label_filter == "Clickbait",
+            confidence_level=None if confidence_filter == "Any" else confidence_filter,
+            page=page,
+            page_size=50
+        )
+        
+        if results['results']:
+            st.dataframe(pd.DataFrame(results['results']).drop(columns=['rank']))
+            if results['has_more']:
+                st.caption("More results on the next page.")
+        else:
+            st.info("No matching videos.")
+        return
+    
     df = get_all_labeled_data()
     
     if not df.empty:
@@ -233,25 +380,40 @@ def render_view_data():
         st.info("No labeled data available yet.")
 
 def render_export_data():
-    """Export data as CSV"""
+    """Export data as CSV, NDJSON, Parquet or Arrow IPC"""
     st.header("Export Data")
     
-    df = get_all_labeled_data()
+    export_format = st.selectbox("Format", list(EXPORT_FORMATS))
+    since = st.text_input(
+        "Only labels after cursor (optional)",
+        help="Paste the cursor shown after a previous export to download only new labels."
+    )
     
-    if not df.empty:
-        # Create a download link
-        csv = df.to_csv(index=False)
+    if st.button("Prepare Export"):
+        try:
+            chunks, media_type, extension, next_cursor = export_labeled_data(
+                export_format, since=since.strip() or None
+            )
+            data = b"".join(chunks)
+        except (ValueError, ImportError) as e:
+            st.error(f"Export failed: {str(e)}")
+            return
+        
+        if next_cursor is None:
+            st.info("No data available for export.")
+            return
+        
         current_date = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"youtube_clickbait_data_{current_date}.csv"
+        filename = f"youtube_clickbait_data_{current_date}.{extension}"
         
         st.download_button(
-            label="Download CSV",
-            data=csv,
+            label=f"Download {export_format.upper()}",
+            data=data,
             file_name=filename,
-            mime="text/csv"
+            mime=media_type
         )
-    else:
-        st.info("No data available for export.")
+        st.write("Cursor for the next incremental export:")
+        st.code(next_cursor)
 
 def render_labeling_instructions():
     """Render interface for managing labeling instructions"""
@@ -10,7 +10,8 @@ from app.database import (
     create_user, 
     create_reset_token,
     validate_reset_token,
-    reset_password
+    reset_password,
+    release_video_leases
 )
 
 def login_user():
@@ -169,7 +170,10 @@ def reset_password_form(token):
 def logout_user():
     """Log out the current user"""
     if st.button("Logout"):
-        for key in ['logged_in', 'username', 'user_id', 'is_admin']:
+        # Hand any prefetched videos back to the labeling queue
+        if 'user_id' in st.session_state:
+            release_video_leases(st.session_state['user_id'])
+        for key in ['logged_in', 'username', 'user_id', 'is_admin', 'lease_batch']:
             if key in st.session_state:
                 del st.session_state[key]
         st.session_state['page'] = 'login'
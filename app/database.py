@@ -5,124 +5,24 @@ import pandas as pd
 import os
 import uuid
 import hashlib
+import json
 import secrets
-from contextlib import contextmanager
+import logging
+import threading
 
-from config import DATABASE_PATH
+from app.db_pool import get_db_connection, get_pool_stats, write_transaction
+from app import label_queue
+from app.settings import settings
+from app.exporter import build_labeled_data_query
+from app.replica import get_replica_connection
+from config import LABEL_BATCH_SIZE, BULK_INSERT_CHUNK_SIZE, USER_STATS_CACHE_SECONDS
 
-# Create tables if they don't exist
-def init_db():
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Users table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            is_admin BOOLEAN DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # Reset tokens table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS reset_tokens (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            token TEXT NOT NULL,
-            expires_at TIMESTAMP NOT NULL,
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-        ''')
-        
-        # Videos table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS videos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            video_id TEXT UNIQUE NOT NULL,
-            title TEXT,
-            description TEXT,
-            view_count INTEGER,
-            like_count INTEGER,
-            thumbnail_url TEXT,
-            local_thumbnail_path TEXT,
-            duration INTEGER,
-            upload_date TEXT,
-            channel_id TEXT,
-            channel_name TEXT,
-            video_url TEXT,
-            processed BOOLEAN DEFAULT 0,
-            assigned_to INTEGER DEFAULT NULL,
-            assigned_at TIMESTAMP DEFAULT NULL,
-            FOREIGN KEY (assigned_to) REFERENCES users (id)
-        )
-        ''')
-        
-        # Labels table (for user contributions)
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS labels (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            video_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            is_clickbait BOOLEAN NOT NULL,
-            confidence_level INTEGER NOT NULL CHECK(confidence_level BETWEEN 1 AND 4),
-            labeled_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (video_id) REFERENCES videos (id),
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-        ''')
-        
-        # Add confidence_level column if it doesn't exist
-        try:
-            cursor.execute('ALTER TABLE labels ADD COLUMN confidence_level INTEGER NOT NULL DEFAULT 3 CHECK(confidence_level BETWEEN 1 AND 4)')
-        except sqlite3.OperationalError:
-            # Column already exists
-            pass
-        
-        # Daily stats table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS daily_stats (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            date TEXT NOT NULL,
-            contribution_count INTEGER DEFAULT 0,
-            FOREIGN KEY (user_id) REFERENCES users (id),
-            UNIQUE (user_id, date)
-        )
-        ''')
-        
-        # Add skipped_videos table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS skipped_videos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            video_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            skipped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (video_id) REFERENCES videos (id),
-            FOREIGN KEY (user_id) REFERENCES users (id),
-            UNIQUE(video_id, user_id)
-        )
-        ''')
-        
-        # Create default admin user if it doesn't exist
-        cursor.execute('''
-        INSERT OR IGNORE INTO users (username, email, password_hash, is_admin)
-        VALUES (?, ?, ?, 1)
-        ''', ('admin', 'admin@example.com', hash_password('admin123')))
-        
-        conn.commit()
+logger = logging.getLogger(__name__)
 
-@contextmanager
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-    finally:
-        conn.close()
+# Bring the schema up to date (a single version check when nothing is pending)
+def init_db():
+    from app.migrations import ensure_schema
+    ensure_schema()
 
 # Authentication and user management functions
 def hash_password(password):
@@ -217,158 +117,228 @@ def reset_password(user_id, new_password):
         conn.commit()
         return True
 
+# API token revocation
+def revoke_api_token(jti, expires_at):
+    """Record an API token as revoked until it would have expired anyway"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT OR IGNORE INTO api_token_revocations (jti, expires_at) VALUES (?, ?)",
+            (jti, expires_at)
+        )
+        # Revocations of expired tokens are no longer needed
+        cursor.execute(
+            "DELETE FROM api_token_revocations WHERE expires_at < ?",
+            (time.time(),)
+        )
+        conn.commit()
+
+def is_api_token_revoked(jti):
+    """Check whether an API token has been revoked"""
+    with get_db_connection() as conn:
+        row = conn.execute(
+            "SELECT 1 FROM api_token_revocations WHERE jti = ?", (jti,)
+        ).fetchone()
+        return row is not None
+
 # Video management functions
+VIDEO_FIELDS = [
+    'video_id', 'title', 'description', 'view_count', 
+    'like_count', 'thumbnail_url', 'duration', 'upload_date',
+    'channel_id', 'channel_name', 'video_url'
+]
+
 def add_video(video_data):
     """Add a video to the database"""
-    required_fields = [
-        'video_id', 'title', 'description', 'view_count', 
-        'like_count', 'thumbnail_url', 'duration', 'upload_date',
-        'channel_id', 'channel_name', 'video_url'
-    ]
-    
     # Validate required fields
-    for field in required_fields:
+    for field in VIDEO_FIELDS:
         if field not in video_data:
             raise ValueError(f"Missing required field: {field}")
+    
+    result = add_videos_bulk([video_data], processed=False)
+    return result['failed'] == 0
+
+def add_videos_bulk(videos, processed=True, chunk_size=BULK_INSERT_CHUNK_SIZE):
+    """Insert or update many videos with one upsert per chunk.
+    
+    Each chunk is committed in a single transaction. With processed=True the
+    videos are marked processed and enqueued for labeling in that same
+    transaction. Returns counts of inserted, updated and failed videos.
+    """
+    counts = {'inserted': 0, 'updated': 0, 'failed': 0}
+    chunk = {}
+    
+    for video_data in videos:
+        missing = [field for field in VIDEO_FIELDS if field not in video_data]
+        if missing or not video_data['video_id']:
+            logger.warning(f"Skipping video {video_data.get('video_id')}: missing {', '.join(missing) or 'video_id'}")
+            counts['failed'] += 1
+            continue
+        
+        # Later rows for the same video_id win, as with sequential add_video calls
+        chunk[video_data['video_id']] = video_data
+        if len(chunk) >= chunk_size:
+            _upsert_video_chunk(list(chunk.values()), processed, counts)
+            chunk = {}
+    
+    if chunk:
+        _upsert_video_chunk(list(chunk.values()), processed, counts)
+    
+    return counts
+
+def _upsert_video_chunk(chunk, processed, counts):
+    video_ids = [video_data['video_id'] for video_data in chunk]
+
+    try:
+        with write_transaction() as conn:
+            # One bound parameter however large the chunk (SQLite caps them)
+            existing = conn.execute('''
+                SELECT COUNT(*) AS count FROM json_each(?) AS ids
+                CROSS JOIN videos v ON v.video_id = ids.value
+            ''', (json.dumps(video_ids),)).fetchone()['count']
             
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        try:
-            # Check if video already exists
-            existing = cursor.execute(
-                "SELECT id FROM videos WHERE video_id = ?", 
-                (video_data['video_id'],)
-            ).fetchone()
+            # Hot row: identity and processing state
+            conn.executemany('''
+                INSERT INTO videos (video_id, processed) VALUES (?, ?)
+                ON CONFLICT(video_id) DO UPDATE SET 
+                    processed = MAX(videos.processed, excluded.processed)
+            ''', [
+                (video_data['video_id'], 1 if processed else 0)
+                for video_data in chunk
+            ])
             
-            if existing:
-                # Update existing record
-                cursor.execute('''
-                UPDATE videos SET 
-                    title = ?,
-                    description = ?,
-                    view_count = ?,
-                    like_count = ?,
-                    thumbnail_url = ?,
-                    local_thumbnail_path = ?,
-                    duration = ?,
-                    upload_date = ?,
-                    channel_id = ?,
-                    channel_name = ?,
-                    video_url = ?
-                WHERE video_id = ?
-                ''', (
-                    video_data['title'],
-                    video_data['description'],
-                    video_data['view_count'],
-                    video_data['like_count'],
-                    video_data['thumbnail_url'],
-                    video_data['local_thumbnail_path'],
-                    video_data['duration'],
-                    video_data['upload_date'],
-                    video_data['channel_id'],
-                    video_data['channel_name'],
-                    video_data['video_url'],
-                    video_data['video_id']
-                ))
-            else:
-                # Insert new record
-                cursor.execute('''
-                INSERT INTO videos 
+            # Cold row: descriptive metadata
+            conn.executemany('''
+                INSERT INTO video_metadata 
                 (video_id, title, description, view_count, like_count, 
                  thumbnail_url, local_thumbnail_path, duration, upload_date,
                  channel_id, channel_name, video_url)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                VALUES ((SELECT id FROM videos WHERE video_id = ?), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(video_id) DO UPDATE SET 
+                    title = excluded.title,
+                    description = excluded.description,
+                    view_count = excluded.view_count,
+                    like_count = excluded.like_count,
+                    thumbnail_url = excluded.thumbnail_url,
+                    -- A row without a stored thumbnail keeps the one already recorded
+                    local_thumbnail_path = COALESCE(excluded.local_thumbnail_path, video_metadata.local_thumbnail_path),
+                    duration = excluded.duration,
+                    upload_date = excluded.upload_date,
+                    channel_id = excluded.channel_id,
+                    channel_name = excluded.channel_name,
+                    video_url = excluded.video_url
+            ''', [
+                (
                     video_data['video_id'],
                     video_data['title'],
                     video_data['description'],
                     video_data['view_count'],
                     video_data['like_count'],
                     video_data['thumbnail_url'],
-                    video_data['local_thumbnail_path'],
+                    video_data.get('local_thumbnail_path'),
                     video_data['duration'],
                     video_data['upload_date'],
                     video_data['channel_id'],
                     video_data['channel_name'],
                     video_data['video_url']
-                ))
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"Error adding video: {e}")
-            return False
+                )
+                for video_data in chunk
+            ])
+            
+            if processed:
+                label_queue.enqueue_videos(conn, video_ids)
+        
+        counts['updated'] += existing
+        counts['inserted'] += len(chunk) - existing
+    except Exception as e:
+        logger.error(f"Error adding {len(chunk)} videos: {e}")
+        counts['failed'] += len(chunk)
+
+def add_pending_videos(videos):
+    """Queue videos for the processing worker, leaving videos already known untouched.
+    
+    `videos` are dicts with video_id and video_url, optionally title and
+    channel_name; the worker fills in the rest. Returns the number added.
+    """
+    videos = list(videos)
+    if not videos:
+        return 0
+    with write_transaction() as conn:
+        existing = conn.execute('''
+            SELECT COUNT(*) AS count FROM json_each(?) AS ids
+            CROSS JOIN videos v ON v.video_id = ids.value
+        ''', (json.dumps([video['video_id'] for video in videos]),)).fetchone()['count']
+        conn.executemany('''
+            INSERT INTO videos (video_id, processed) VALUES (?, 0)
+            ON CONFLICT(video_id) DO NOTHING
+        ''', [(video['video_id'],) for video in videos])
+        conn.executemany('''
+            INSERT INTO video_metadata (video_id, title, channel_name, video_url)
+            VALUES ((SELECT id FROM videos WHERE video_id = ?), ?, ?, ?)
+            ON CONFLICT(video_id) DO NOTHING
+        ''', [
+            (video['video_id'], video.get('title', ''), video.get('channel_name', ''), video['video_url'])
+            for video in videos
+        ])
+    return len({video['video_id'] for video in videos}) - existing
+
+def get_processed_video_ids(video_ids):
+    """Return the subset of `video_ids` already processed, in one query"""
+    with get_db_connection() as conn:
+        # CROSS JOIN keeps json_each as the outer loop: one index probe per ID
+        rows = conn.execute('''
+            SELECT v.video_id FROM json_each(?) AS ids
+            CROSS JOIN videos v ON v.video_id = ids.value
+            WHERE v.processed = 1
+        ''', (json.dumps(list(video_ids)),)).fetchall()
+        return {row['video_id'] for row in rows}
 
 def get_unlabeled_video_for_user(user_id):
     """Get an unlabeled video and assign it to a user"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        # First check if the user already has an assigned video
-        assigned_video = cursor.execute('''
-            SELECT * FROM videos 
-            WHERE assigned_to = ? 
-            AND id NOT IN (SELECT video_id FROM labels WHERE user_id = ?)
-            AND id NOT IN (SELECT video_id FROM skipped_videos WHERE user_id = ?)
-            LIMIT 1
-        ''', (user_id, user_id, user_id)).fetchone()
-        
-        if assigned_video:
-            return dict(assigned_video)
-        
-        # Get a video that hasn't been labeled by this user, hasn't been skipped,
-        # and isn't assigned to anyone
-        current_time = datetime.datetime.now().isoformat()
-        video = cursor.execute('''
-            SELECT * FROM videos 
-            WHERE processed = 1 
-            AND (assigned_to IS NULL OR 
-                (julianday(?) - julianday(assigned_at)) * 24 * 60 > 15)
-            AND id NOT IN (SELECT video_id FROM labels)
-            AND id NOT IN (SELECT video_id FROM skipped_videos WHERE user_id = ?)
-            LIMIT 1
-        ''', (current_time, user_id)).fetchone()
-        
-        if video:
-            # Assign the video to this user
-            cursor.execute('''
-                UPDATE videos 
-                SET assigned_to = ?, assigned_at = ? 
-                WHERE id = ?
-            ''', (user_id, current_time, video['id']))
-            conn.commit()
-            return dict(video)
-        
-        return None
+    return label_queue.claim_video(user_id)
+
+def get_video_batch_for_user(user_id, size=LABEL_BATCH_SIZE):
+    """Lease a block of unlabeled videos to a user (see app.label_queue.LeaseBatch)"""
+    return label_queue.claim_batch(user_id, size)
+
+def release_video_leases(user_id):
+    """Return all videos leased to a user to the labeling queue"""
+    label_queue.release_leases(user_id)
 
 def save_label(video_id, user_id, is_clickbait, confidence_level):
-    """Save a user's label for a video and update daily stats"""
+    """Save a user's label for a video and update daily stats.
+
+    Returns False, saving nothing, if the user no longer holds the video's
+    lease (it expired and was claimed by someone else, or was labeled).
+    """
     current_date = datetime.date.today().isoformat()
-    
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Save the label with confidence level
-        cursor.execute('''
-            INSERT INTO labels (video_id, user_id, is_clickbait, confidence_level) 
-            VALUES (?, ?, ?, ?)
-        ''', (video_id, user_id, is_clickbait, confidence_level))
-        
-        # Update daily stats
-        cursor.execute('''
-            INSERT INTO daily_stats (user_id, date, contribution_count) 
-            VALUES (?, ?, 1)
-            ON CONFLICT(user_id, date) 
-            DO UPDATE SET contribution_count = contribution_count + 1
-        ''', (user_id, current_date))
-        
-        # Clear assignment
-        cursor.execute('''
-            UPDATE videos 
-            SET assigned_to = NULL, assigned_at = NULL 
-            WHERE id = ?
-        ''', (video_id,))
-        
-        conn.commit()
-        return True
+
+    try:
+        with write_transaction() as conn:
+            cursor = conn.cursor()
+
+            # Take the video out of the labeling queue; raises without the lease
+            label_queue.complete_video(conn, video_id, user_id)
+
+            # Save the label with confidence level
+            cursor.execute('''
+                INSERT INTO labels (video_id, user_id, is_clickbait, confidence_level)
+                VALUES (?, ?, ?, ?)
+            ''', (video_id, user_id, is_clickbait, confidence_level))
+
+            # Update daily stats
+            cursor.execute('''
+                INSERT INTO daily_stats (user_id, date, contribution_count)
+                VALUES (?, ?, 1)
+                ON CONFLICT(user_id, date)
+                DO UPDATE SET contribution_count = contribution_count + 1
+            ''', (user_id, current_date))
+    except label_queue.LeaseLost as e:
+        logger.warning(f"Label not saved: {e}")
+        return False
+
+    invalidate_user_stats(user_id)
+    return True
 
 def skip_video(video_id, user_id):
     """Record a skipped video and clear its assignment"""
@@ -390,12 +360,8 @@ def skip_video(video_id, user_id):
                 VALUES (?, ?)
             ''', (video['id'], user_id))
             
-            # Clear the assignment
-            cursor.execute('''
-                UPDATE videos 
-                SET assigned_to = NULL, assigned_at = NULL 
-                WHERE video_id = ?
-            ''', (video_id,))
+            # Release the lease so other labelers can pick it up
+            label_queue.release_video(conn, video['id'], user_id)
             
             conn.commit()
             return True
@@ -403,91 +369,142 @@ def skip_video(video_id, user_id):
             # Video was already skipped by this user
             return False
 
-def get_user_stats(user_id):
-    """Get user contribution statistics"""
+# Per-user stats cache: (user_id, window) -> (expires_at, stats)
+_user_stats_cache = {}
+_user_stats_lock = threading.Lock()
+
+def invalidate_user_stats(user_id):
+    """Drop cached statistics for a user"""
+    with _user_stats_lock:
+        for key in [key for key in _user_stats_cache if key[0] == user_id]:
+            del _user_stats_cache[key]
+
+def get_user_stats(user_id, days=7, start_date=None, end_date=None, hourly=False):
+    """Get user contribution statistics for a window of days.
+    
+    The window is the last `days` days, or start_date..end_date when given
+    (dates or ISO strings). Returns the total, a gap-filled daily breakdown
+    (newest first), current and longest streaks and, with hourly=True,
+    per-hour label counts over the window.
+    """
+    end = _as_date(end_date) if end_date else datetime.date.today()
+    start = _as_date(start_date) if start_date else end - datetime.timedelta(days=days - 1)
+    key = (user_id, start, end, hourly)
+    
+    with _user_stats_lock:
+        cached = _user_stats_cache.get(key)
+        if cached and cached[0] > time.time():
+            return cached[1]
+    
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        # Get total contributions
         total = cursor.execute('''
-            SELECT COUNT(*) as count FROM labels WHERE user_id = ?
-        ''', (user_id,)).fetchone()['count']
-        
-        # Get daily breakdown for the past 7 days
-        today = datetime.date.today()
-        daily_stats = []
-        
-        for i in range(7):
-            date = (today - datetime.timedelta(days=i)).isoformat()
-            stat = cursor.execute('''
-                SELECT contribution_count FROM daily_stats 
-                WHERE user_id = ? AND date = ?
-            ''', (user_id, date)).fetchone()
-            
-            daily_stats.append({
-                'date': date,
-                'count': stat['contribution_count'] if stat else 0
-            })
-        
-        return {
-            'total': total,
-            'daily': daily_stats
+            SELECT contribution_count FROM user_contributions WHERE user_id = ?
+        ''', (user_id,)).fetchone()
+        
+        # Every active day up to the end of the window, in one range scan;
+        # days before the window are only needed for the streaks
+        active_days = {
+            row['date']: row['contribution_count']
+            for row in cursor.execute('''
+                SELECT date, contribution_count FROM daily_stats 
+                WHERE user_id = ? AND date <= ? AND contribution_count > 0
+                ORDER BY date
+            ''', (user_id, end.isoformat()))
         }
-
-def get_all_labeled_data():
-    """Get all labeled data for export"""
-    with get_db_connection() as conn:
-        query = '''
-        SELECT 
-            v.video_id, v.title, v.description, v.view_count, 
-            v.like_count, v.thumbnail_url, v.duration, v.upload_date,
-            v.channel_id, v.channel_name, v.video_url,
-            l.is_clickbait, l.confidence_level, u.username as labeled_by, l.labeled_at
-        FROM 
-            labels l
-        JOIN 
-            videos v ON l.video_id = v.id
-        JOIN 
-            users u ON l.user_id = u.id
-        ORDER BY 
-            l.labeled_at DESC
-        '''
         
-        df = pd.read_sql_query(query, conn)
+        hourly_stats = None
+        if hourly:
+            hourly_stats = [
+                {'hour': row['hour'], 'count': row['count']}
+                for row in cursor.execute('''
+                    SELECT strftime('%Y-%m-%d %H:00', labeled_at) AS hour, COUNT(*) AS count
+                    FROM labels
+                    WHERE user_id = ? AND labeled_at >= ? AND labeled_at < ?
+                    GROUP BY hour
+                    ORDER BY hour
+                ''', (user_id, start.isoformat(), (end + datetime.timedelta(days=1)).isoformat()))
+            ]
+    
+    # Fill the gaps in memory
+    daily_stats = []
+    date = end
+    while date >= start:
+        daily_stats.append({
+            'date': date.isoformat(),
+            'count': active_days.get(date.isoformat(), 0)
+        })
+        date -= datetime.timedelta(days=1)
+    
+    stats = {
+        'total': total['contribution_count'] if total else 0,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'daily': daily_stats,
+        'window_total': sum(day['count'] for day in daily_stats),
+        'current_streak': _current_streak(active_days, end),
+        'longest_streak': _longest_streak(active_days),
+    }
+    if hourly:
+        stats['hourly'] = hourly_stats
+    
+    with _user_stats_lock:
+        _user_stats_cache[key] = (time.time() + USER_STATS_CACHE_SECONDS, stats)
+    return stats
+
+def _as_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(value)
+
+def _current_streak(active_days, end):
+    """Consecutive active days ending at `end` (or the day before, if `end` has none yet)"""
+    date = end
+    if date.isoformat() not in active_days:
+        date -= datetime.timedelta(days=1)
+    streak = 0
+    while date.isoformat() in active_days:
+        streak += 1
+        date -= datetime.timedelta(days=1)
+    return streak
+
+def _longest_streak(active_days):
+    longest = streak = 0
+    previous = None
+    for day in sorted(active_days):
+        date = datetime.date.fromisoformat(day)
+        streak = streak + 1 if previous and date - previous == datetime.timedelta(days=1) else 1
+        longest = max(longest, streak)
+        previous = date
+    return longest
+
+def get_all_labeled_data(since=None, until=None):
+    """Get labeled data for export, optionally only labels after the `since` cursor"""
+    query, params = build_labeled_data_query(since, until)
+    with get_replica_connection() as conn:
+        df = pd.read_sql_query(query, conn, params=params)
         return df
 
+DASHBOARD_COUNTERS = ['total_videos', 'processed_videos', 'labeled_videos', 'total_users']
+
 def get_admin_dashboard_stats():
-    """Get statistics for the admin dashboard"""
+    """Get statistics for the admin dashboard from the trigger-maintained counters"""
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        # Total videos in system
-        total_videos = cursor.execute(
-            "SELECT COUNT(*) as count FROM videos"
-        ).fetchone()['count']
-        
-        # Processed videos
-        processed_videos = cursor.execute(
-            "SELECT COUNT(*) as count FROM videos WHERE processed = 1"
-        ).fetchone()['count']
-        
-        # Labeled videos
-        labeled_videos = cursor.execute(
-            "SELECT COUNT(DISTINCT video_id) as count FROM labels"
-        ).fetchone()['count']
-        
-        # Total users
-        total_users = cursor.execute(
-            "SELECT COUNT(*) as count FROM users WHERE is_admin = 0"
-        ).fetchone()['count']
+        counters = {
+            row['name']: row['value']
+            for row in cursor.execute("SELECT name, value FROM stats_counters")
+        }
         
         # Top contributors
         top_contributors = cursor.execute('''
-            SELECT u.username, COUNT(*) as contribution_count
-            FROM labels l
-            JOIN users u ON l.user_id = u.id
-            GROUP BY l.user_id
-            ORDER BY contribution_count DESC
+            SELECT u.username, c.contribution_count
+            FROM user_contributions c
+            JOIN users u ON c.user_id = u.id
+            WHERE c.contribution_count > 0
+            ORDER BY c.contribution_count DESC
             LIMIT 5
         ''').fetchall()
         
@@ -496,13 +513,63 @@ def get_admin_dashboard_stats():
             for row in top_contributors
         ]
         
-        return {
-            'total_videos': total_videos,
-            'processed_videos': processed_videos,
-            'labeled_videos': labeled_videos,
-            'total_users': total_users,
-            'top_contributors': top_contributors
+        stats = {name: counters.get(name, 0) for name in DASHBOARD_COUNTERS}
+        stats['top_contributors'] = top_contributors
+        return stats
+
+def rebuild_dashboard_stats():
+    """Recount the dashboard counters from the base tables.
+    
+    Returns {name: (stored, actual)} for every counter that had drifted.
+    """
+    with write_transaction() as conn:
+        cursor = conn.cursor()
+        
+        stored = {
+            row['name']: row['value']
+            for row in cursor.execute("SELECT name, value FROM stats_counters")
+        }
+        actual = {
+            'total_videos': cursor.execute(
+                "SELECT COUNT(*) as count FROM videos"
+            ).fetchone()['count'],
+            'processed_videos': cursor.execute(
+                "SELECT COUNT(*) as count FROM videos WHERE processed = 1"
+            ).fetchone()['count'],
+            'labeled_videos': cursor.execute(
+                "SELECT COUNT(DISTINCT video_id) as count FROM labels"
+            ).fetchone()['count'],
+            'total_users': cursor.execute(
+                "SELECT COUNT(*) as count FROM users WHERE is_admin = 0"
+            ).fetchone()['count'],
+        }
+        
+        cursor.executemany(
+            "INSERT OR REPLACE INTO stats_counters (name, value) VALUES (?, ?)",
+            list(actual.items())
+        )
+        
+        # Per-user contribution tally
+        contributions_before = cursor.execute(
+            "SELECT COALESCE(SUM(contribution_count), 0) as count FROM user_contributions"
+        ).fetchone()['count']
+        cursor.execute("DELETE FROM user_contributions")
+        cursor.execute('''
+            INSERT INTO user_contributions (user_id, contribution_count)
+            SELECT user_id, COUNT(*) FROM labels GROUP BY user_id
+        ''')
+        contributions_after = cursor.execute(
+            "SELECT COALESCE(SUM(contribution_count), 0) as count FROM user_contributions"
+        ).fetchone()['count']
+        
+        drift = {
+            name: (stored.get(name), value)
+            for name, value in actual.items()
+            if stored.get(name) != value
         }
+        if contributions_before != contributions_after:
+            drift['user_contributions'] = (contributions_before, contributions_after)
+        return drift
 
 # Mark videos as processed after background processing
 def mark_video_processed(video_id):
@@ -512,20 +579,23 @@ def mark_video_processed(video_id):
             "UPDATE videos SET processed = 1 WHERE video_id = ?", 
             (video_id,)
         )
+        label_queue.enqueue_videos(conn, [video_id])
         conn.commit()
         return True
 
-# Global variable to store labeling instructions
-_labeling_instructions = """Default labeling instructions:
-1. Watch the video title and thumbnail carefully
-2. Determine if it's clickbait based on misleading content
-3. Rate your confidence level from 1-4"""
+def update_thumbnail_paths(paths):
+    """Record downloaded thumbnails, given {video_id: local path}"""
+    with write_transaction() as conn:
+        conn.executemany('''
+            UPDATE video_metadata SET local_thumbnail_path = ?
+            WHERE video_id = (SELECT id FROM videos WHERE video_id = ?)
+        ''', [(path, video_id) for video_id, path in paths.items() if path])
 
+# Labeling instructions are stored in app_settings and cached per process
 def save_instructions(instructions):
-    """Save labeling instructions to memory"""
-    global _labeling_instructions
-    _labeling_instructions = instructions
+    """Save labeling instructions to the database"""
+    settings.set('labeling_instructions', instructions)
 
 def get_instructions():
-    """Get current labeling instructions from memory"""
-    return _labeling_instructions
\ No newline at end of file
+    """Get current labeling instructions (cached, revalidated periodically)"""
+    return settings.get('labeling_instructions', '')
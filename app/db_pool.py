@@ -0,0 +1,185 @@
+import sqlite3
+import threading
+import time
+import logging
+from contextlib import contextmanager
+
+from config import (
+    DATABASE_PATH,
+    DB_POOL_MAX_IDLE,
+    DB_BUSY_TIMEOUT_MS,
+    DB_SYNCHRONOUS,
+    DB_CACHE_SIZE_KB,
+    DB_MMAP_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionManager:
+    """Pool of persistent, WAL-mode SQLite connections.
+
+    Connections are checked out for the duration of a ``with`` block and
+    returned to an idle list afterwards instead of being closed, so the
+    Streamlit sessions, the API and the worker scripts stop paying the
+    connect/close cost on every query.
+    """
+
+    def __init__(self, database_path=DATABASE_PATH, max_idle=DB_POOL_MAX_IDLE,
+                 read_only=False):
+        self.database_path = database_path
+        self.max_idle = max_idle
+        self.read_only = read_only
+        self._idle = []
+        self._generation = 0
+        self._conn_generations = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'connections_opened': 0,
+            'pool_hits': 0,
+            'pool_misses': 0,
+            'connections_closed': 0,
+            'lock_waits': 0,
+            'lock_errors': 0,
+        }
+
+    def _connect(self):
+        if self.read_only:
+            conn = sqlite3.connect(
+                f"file:{self.database_path}?mode=ro", uri=True,
+                timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False
+            )
+        else:
+            conn = sqlite3.connect(
+                self.database_path,
+                timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False
+            )
+        conn.row_factory = sqlite3.Row
+        if not self.read_only:
+            conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(f"PRAGMA synchronous = {DB_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size = -{int(DB_CACHE_SIZE_KB)}")
+        conn.execute(f"PRAGMA mmap_size = {int(DB_MMAP_SIZE)}")
+        conn.execute(f"PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT_MS)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        with self._lock:
+            self._stats['connections_opened'] += 1
+            self._conn_generations[id(conn)] = self._generation
+        return conn
+
+    def acquire(self):
+        """Check out a connection, reusing an idle one when available"""
+        with self._lock:
+            if self._idle:
+                self._stats['pool_hits'] += 1
+                return self._idle.pop()
+            self._stats['pool_misses'] += 1
+        return self._connect()
+
+    def release(self, conn):
+        """Return a connection to the idle list, discarding any open transaction"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+
+        with self._lock:
+            current = self._conn_generations.get(id(conn)) == self._generation
+            if current and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        self._discard(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._stats['connections_closed'] += 1
+            self._conn_generations.pop(id(conn), None)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        started = time.monotonic()
+        try:
+            yield conn
+        except sqlite3.OperationalError as e:
+            if 'locked' in str(e) or 'busy' in str(e):
+                with self._lock:
+                    self._stats['lock_errors'] += 1
+                logger.warning(
+                    f"Database lock not acquired after "
+                    f"{time.monotonic() - started:.2f}s: {e}"
+                )
+            raise
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def write_transaction(self):
+        """Open an immediate (write-locked) transaction and commit it on success.
+
+        Taking the write lock up front means a busy database shows up as a
+        wait on BEGIN rather than a failure half way through the statements.
+        """
+        with self.connection() as conn:
+            started = time.monotonic()
+            conn.execute("BEGIN IMMEDIATE")
+            waited = time.monotonic() - started
+            if waited > 0.01:
+                with self._lock:
+                    self._stats['lock_waits'] += 1
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def close_all(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._discard(conn)
+
+    def reset(self):
+        """Retire every connection, e.g. after the database file was replaced.
+
+        Idle connections are closed now; connections in use are closed when
+        they are returned.
+        """
+        with self._lock:
+            self._generation += 1
+        self.close_all()
+
+    def get_stats(self):
+        """Return pool counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['idle_connections'] = len(self._idle)
+        return stats
+
+
+# Shared manager for the main database, used by the Streamlit app, the API
+# and the background scripts alike.
+db_manager = ConnectionManager()
+
+
+def get_db_connection():
+    """Borrow a pooled connection to the main database"""
+    return db_manager.connection()
+
+
+def write_transaction():
+    """Borrow a pooled connection inside an immediate write transaction"""
+    return db_manager.write_transaction()
+
+
+def get_pool_stats():
+    """Get connection pool counters (hits, misses, lock waits)"""
+    return db_manager.get_stats()
@@ -0,0 +1,273 @@
+"""Streaming exports of the labeled dataset.
+
+Rows are read with ``fetchmany`` from a single cursor and encoded chunk
+by chunk, so memory use does not depend on the size of the dataset and
+the first bytes can be sent before the query has finished. Exports read
+from the read replica, so they never compete with labelers' writes.
+
+Exports can be incremental: a cursor marks the newest label (by
+``labeled_at`` then ``id``) included in an export, and passing it back as
+``since`` returns only labels added after it. Every export is bounded by
+the watermark taken when it starts, which is also the cursor to use next.
+"""
+
+import base64
+import csv
+import io
+import json
+import zlib
+
+from config import EXPORT_CHUNK_SIZE
+from app.replica import get_replica_connection
+
+LABELED_DATA_COLUMNS = [
+    'video_id', 'title', 'description', 'view_count',
+    'like_count', 'thumbnail_url', 'duration', 'upload_date',
+    'channel_id', 'channel_name', 'video_url',
+    'is_clickbait', 'confidence_level', 'labeled_by', 'labeled_at'
+]
+
+# Reads come from the replica's denormalized labels table; see app.replica
+LABELED_DATA_SELECT = '''
+SELECT
+    l.video_id, l.title, l.description, l.view_count,
+    l.like_count, l.thumbnail_url, l.duration, l.upload_date,
+    l.channel_id, l.channel_name, l.video_url,
+    l.is_clickbait, l.confidence_level, l.labeled_by, l.labeled_at
+FROM
+    labels_enriched l
+'''
+
+
+def encode_cursor(labeled_at, label_id):
+    """Build an opaque export cursor from a label's position"""
+    raw = f"{labeled_at}|{label_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Parse an export cursor into (labeled_at, label_id); raises ValueError"""
+    try:
+        labeled_at, label_id = base64.urlsafe_b64decode(
+            cursor.encode('ascii')
+        ).decode('utf-8').rsplit('|', 1)
+        return labeled_at, int(label_id)
+    except Exception:
+        raise ValueError(f"Invalid export cursor: {cursor!r}")
+
+
+def get_export_watermark():
+    """Cursor of the newest label, or None when there are no labels"""
+    with get_replica_connection() as conn:
+        row = conn.execute('''
+            SELECT labeled_at, id FROM labels_enriched
+            ORDER BY labeled_at DESC, id DESC
+            LIMIT 1
+        ''').fetchone()
+    return encode_cursor(row['labeled_at'], row['id']) if row else None
+
+
+def build_labeled_data_query(since=None, until=None):
+    """Labeled data query restricted to labels in the (since, until] cursor range"""
+    conditions = []
+    params = []
+    if since:
+        conditions.append("(l.labeled_at, l.id) > (?, ?)")
+        params.extend(decode_cursor(since))
+    if until:
+        conditions.append("(l.labeled_at, l.id) <= (?, ?)")
+        params.extend(decode_cursor(until))
+
+    query = LABELED_DATA_SELECT
+    if conditions:
+        query += "WHERE " + " AND ".join(conditions)
+    query += '''
+ORDER BY
+    l.labeled_at DESC, l.id DESC
+'''
+    return query, params
+
+
+def has_labeled_data():
+    """Check whether any label exists without counting them"""
+    with get_replica_connection() as conn:
+        return conn.execute("SELECT 1 FROM labels_enriched LIMIT 1").fetchone() is not None
+
+
+def iter_labeled_rows(since=None, until=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield lists of labeled data rows, `chunk_size` rows at a time"""
+    query, params = build_labeled_data_query(since, until)
+    with get_replica_connection() as conn:
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+
+
+def iter_csv(since=None, until=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the labeled dataset as CSV text, one chunk of rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+
+    writer.writerow(LABELED_DATA_COLUMNS)
+    for rows in iter_labeled_rows(since, until, chunk_size):
+        writer.writerows(tuple(row) for row in rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    # Header only, when there are no rows
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_ndjson(since=None, until=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the labeled dataset as newline-delimited JSON objects"""
+    for rows in iter_labeled_rows(since, until, chunk_size):
+        lines = []
+        for row in rows:
+            record = dict(zip(LABELED_DATA_COLUMNS, row))
+            record['is_clickbait'] = bool(record['is_clickbait'])
+            lines.append(json.dumps(record, ensure_ascii=False))
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ('video_id', pa.string()),
+        ('title', pa.string()),
+        ('description', pa.string()),
+        ('view_count', pa.int64()),
+        ('like_count', pa.int64()),
+        ('thumbnail_url', pa.string()),
+        ('duration', pa.int64()),
+        ('upload_date', pa.string()),
+        ('channel_id', pa.string()),
+        ('channel_name', pa.string()),
+        ('video_url', pa.string()),
+        ('is_clickbait', pa.bool_()),
+        ('confidence_level', pa.int8()),
+        ('labeled_by', pa.string()),
+        ('labeled_at', pa.timestamp('s')),
+    ])
+
+
+def _iter_record_batches(since, until, chunk_size):
+    import pyarrow as pa
+
+    schema = _arrow_schema()
+    for rows in iter_labeled_rows(since, until, chunk_size):
+        columns = list(zip(*rows))
+        arrays = []
+        for field, values in zip(schema, columns):
+            if field.name == 'is_clickbait':
+                values = [None if v is None else bool(v) for v in values]
+            if pa.types.is_timestamp(field.type):
+                arrays.append(pa.array(values, pa.string()).cast(field.type))
+            else:
+                arrays.append(pa.array(values, field.type))
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after each write batch"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_arrow(since=None, until=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the labeled dataset as a zstd-compressed Arrow IPC stream"""
+    import pyarrow as pa
+
+    sink = _ChunkSink()
+    options = pa.ipc.IpcWriteOptions(compression='zstd')
+    with pa.ipc.new_stream(sink, _arrow_schema(), options=options) as writer:
+        for batch in _iter_record_batches(since, until, chunk_size):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_parquet(since=None, until=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the labeled dataset as a zstd-compressed Parquet file, one row group per chunk"""
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, _arrow_schema(), compression='zstd') as writer:
+        for batch in _iter_record_batches(since, until, chunk_size):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+# name -> (writer, media type, file extension, gzip applies)
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv', 'csv', True),
+    'ndjson': (iter_ndjson, 'application/x-ndjson', 'ndjson', True),
+    'parquet': (iter_parquet, 'application/vnd.apache.parquet', 'parquet', False),
+    'arrow': (iter_arrow, 'application/vnd.apache.arrow.stream', 'arrows', False),
+}
+
+
+def export_labeled_data(export_format='csv', since=None, compress=False,
+                        chunk_size=EXPORT_CHUNK_SIZE):
+    """Start an export of labels newer than `since`.
+
+    Returns (chunks, media_type, extension, next_cursor). `chunks` is a lazy
+    iterator of bytes; `next_cursor` is the cursor to pass as `since` next
+    time. Raises ValueError for an unknown format or a malformed cursor.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unknown export format {export_format!r}; "
+            f"choose from {', '.join(EXPORT_FORMATS)}"
+        )
+    if since:
+        decode_cursor(since)
+
+    writer, media_type, extension, compressible = EXPORT_FORMATS[export_format]
+    until = get_export_watermark()
+    next_cursor = until or since
+
+    if until is None or until == since:
+        # Nothing new; keep the range empty rather than unbounded
+        until = since = since or encode_cursor('', 0)
+
+    chunks = writer(since=since, until=until, chunk_size=chunk_size)
+    if compress and compressible:
+        chunks = gzip_stream(chunks)
+        media_type = 'application/gzip'
+        extension += '.gz'
+    return chunks, media_type, extension, next_cursor
+
+
+def gzip_stream(chunks):
+    """Gzip-compress a stream of byte chunks on the fly"""
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,217 @@
+"""Concurrent, rate-limited metadata extraction.
+
+A pool of worker threads shares one token bucket, so the request rate to
+YouTube is set by configuration rather than by the number of workers or
+by sleeps between videos. When YouTube answers with a throttling error,
+the bucket halves its rate and every worker pauses; each success then
+raises the rate again in small steps, up to the configured rate.
+
+Results are yielded as each extraction finishes, so callers can write
+them to the database while the rest are still in flight.
+
+Worker threads are shared by all runs with the same worker count and
+live as long as the process, so per-thread state such as the warm yt-dlp
+instances of app.ydl_pool survives from one run to the next.
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from config import (
+    EXTRACTION_WORKERS,
+    EXTRACTION_RATE_PER_SECOND,
+    EXTRACTION_BURST,
+    EXTRACTION_MIN_RATE_PER_SECOND,
+    EXTRACTION_THROTTLE_PAUSE_SECONDS,
+    EXTRACTION_THROTTLE_RETRIES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Long-lived worker pools, keyed by worker count
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(workers):
+    """The process-wide worker pool for this worker count"""
+    with _executors_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            executor = _executors[workers] = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix=f'extract-{workers}'
+            )
+        return executor
+
+# Error message fragments YouTube/yt-dlp use when a client is rate limited.
+# yt-dlp messages include the video ID, so bare codes like '429' would also
+# match IDs that happen to contain them
+THROTTLE_MARKERS = (
+    'http error 429',
+    'too many requests',
+    "confirm you're not a bot",
+    'confirm you’re not a bot',
+)
+
+
+def _http_status(error):
+    """HTTP status behind a yt-dlp error (DownloadError wraps ExtractorError wraps HTTPError)"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        status = getattr(error, 'status', None) or getattr(error, 'code', None)
+        if isinstance(status, int):
+            return status
+        exc_info = getattr(error, 'exc_info', None)
+        error = (
+            getattr(error, 'cause', None)
+            or (exc_info[1] if exc_info else None)
+            or error.__cause__
+        )
+    return None
+
+
+def is_throttling_error(error):
+    """Check whether an extraction error means we are being rate limited"""
+    if _http_status(error) == 429:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in THROTTLE_MARKERS)
+
+
+class TokenBucket:
+    """Thread-safe token bucket with adaptive (AIMD) rate control"""
+
+    def __init__(self, rate=EXTRACTION_RATE_PER_SECOND, burst=EXTRACTION_BURST,
+                 min_rate=EXTRACTION_MIN_RATE_PER_SECOND,
+                 pause_seconds=EXTRACTION_THROTTLE_PAUSE_SECONDS):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min(min_rate, rate)
+        self.pause_seconds = pause_seconds
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def acquire(self):
+        """Block until a request may be made"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def throttled(self):
+        """Halve the rate and pause all workers after a throttling response"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                # Workers that were already in flight report the same episode
+                return
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            self._paused_until = now + self.pause_seconds
+            self._updated = self._paused_until
+        logger.warning(
+            f"Throttled by YouTube; pausing {self.pause_seconds}s, "
+            f"rate lowered to {self.rate:.2f}/s"
+        )
+
+    def succeeded(self):
+        """Recover the rate gradually after a successful request"""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class ExtractionResult:
+    """Outcome of extracting one item"""
+
+    def __init__(self, item, data=None, error=None, throttled=False):
+        self.item = item
+        self.data = data
+        self.error = error
+        self.throttled = throttled
+
+    @property
+    def ok(self):
+        return self.data is not None
+
+
+class ExtractionEngine:
+    """Run an extraction function over many items with a shared rate limit.
+
+    `extract(item)` must return the extracted data (None for "nothing
+    found") and raise on errors, so throttling can be told apart from
+    other failures.
+    """
+
+    def __init__(self, extract, workers=EXTRACTION_WORKERS, bucket=None,
+                 throttle_retries=EXTRACTION_THROTTLE_RETRIES):
+        self.extract = extract
+        self.workers = max(1, workers)
+        self.bucket = bucket or TokenBucket()
+        self.throttle_retries = throttle_retries
+
+    def _run_one(self, item):
+        attempts = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                data = self.extract(item)
+            except Exception as e:
+                if not is_throttling_error(e):
+                    return ExtractionResult(item, error=e)
+                self.bucket.throttled()
+                attempts += 1
+                if attempts > self.throttle_retries:
+                    return ExtractionResult(item, error=e, throttled=True)
+                continue
+            self.bucket.succeeded()
+            return ExtractionResult(item, data=data)
+
+    def run(self, items):
+        """Yield an ExtractionResult for each item, in completion order"""
+        items = iter(items)
+        # Keep a bounded number of items in flight so huge inputs are not
+        # turned into futures all at once
+        max_in_flight = self.workers * 2
+        executor = get_executor(self.workers)
+        in_flight = set()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(in_flight) < max_in_flight:
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    in_flight.add(executor.submit(self._run_one, item))
+                if not in_flight:
+                    return
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            # The pool outlives the run; drop work a caller abandoned
+            for future in in_flight:
+                future.cancel()
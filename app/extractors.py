@@ -0,0 +1,300 @@
+"""Extractor backends: where video metadata and thumbnails come from.
+
+The ingestion path (scraper, thumbnail downloads, source syncs) talks to
+YouTube only through an ``Extractor``:
+
+- ``LiveExtractor`` uses yt-dlp (through the warm instance pool) and a
+  pooled HTTP session for thumbnails.
+- ``ReplayExtractor`` serves recorded info dicts and thumbnails from a
+  local fixture corpus, with configurable latency and injected failures
+  and throttling. The whole pipeline can then be load-tested and
+  benchmarked offline and reproducibly.
+
+The backend is chosen with EXTRACTOR_BACKEND; ``set_extractor`` swaps it
+at runtime.
+
+A corpus directory holds ``info/<video_id>.json.gz`` (the info cache
+format), ``thumbnails/<video_id>.jpg`` and, optionally, ``sources.json``
+mapping channel/playlist URLs to lists of video IDs.
+"""
+
+import os
+import abc
+import gzip
+import json
+import time
+import random
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import (
+    EXTRACTOR_BACKEND,
+    REPLAY_CORPUS_DIR,
+    REPLAY_LATENCY_MS,
+    REPLAY_LATENCY_JITTER_MS,
+    REPLAY_FAILURE_RATE,
+    REPLAY_THROTTLE_RATE,
+    REPLAY_SEED,
+    THUMBNAIL_CONNECT_TIMEOUT,
+    THUMBNAIL_READ_TIMEOUT,
+    THUMBNAIL_RETRIES,
+    THUMBNAIL_WORKERS,
+)
+from app.video_urls import extract_video_id
+from app.ydl_pool import ydl_pool
+
+logger = logging.getLogger(__name__)
+
+
+class Extractor(abc.ABC):
+    """Interface of an extractor backend"""
+
+    name = None
+
+    @abc.abstractmethod
+    def extract_info(self, video_url):
+        """Full, JSON-serialisable info dict of a video; raises on failure"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def list_entries(self, url, limit=None):
+        """Yield flat entries (`id`, `title`, `channel`) of a channel or playlist, lazily"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def open_thumbnail(self, url, headers=None):
+        """Start a streaming thumbnail request.
+
+        Returns a response usable as a context manager, with `status_code`,
+        `headers` and `iter_content(chunk_size)`.
+        """
+        raise NotImplementedError
+
+
+class LiveExtractor(Extractor):
+    """yt-dlp for metadata and a keep-alive session for thumbnails"""
+
+    name = 'live'
+
+    def __init__(self, cookies_file='./cookies.txt'):
+        self.cookies_file = cookies_file
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def get_session(self):
+        """Shared HTTP session with pooled keep-alive connections and retries"""
+        with self._session_lock:
+            if self._session is None:
+                retry = Retry(
+                    total=THUMBNAIL_RETRIES,
+                    backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=('GET',),
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=THUMBNAIL_WORKERS,
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session = session
+            return self._session
+
+    def extract_info(self, video_url):
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': False,
+            'skip_download': True,
+            'cookiefile': self.cookies_file,
+        }
+        with ydl_pool.extractor(ydl_opts) as ydl:
+            return ydl.sanitize_info(ydl.extract_info(video_url, download=False))
+
+    def list_entries(self, url, limit=None):
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': 'in_playlist',
+            'cookiefile': self.cookies_file,
+        }
+        # No ignoreerrors: a failed page must raise, not end the listing early
+        with ydl_pool.extractor(ydl_opts) as ydl:
+            # process=False keeps `entries` a lazy generator
+            info = ydl.extract_info(url, download=False, process=False)
+            # Playlist URLs resolve through a redirect to the tab extractor
+            for _ in range(3):
+                if not info or info.get('_type') not in ('url', 'url_transparent'):
+                    break
+                info = ydl.extract_info(
+                    info['url'], download=False, process=False, ie_key=info.get('ie_key')
+                )
+            if not info:
+                raise ValueError(f"No listing returned for {url}")
+
+            channel = info.get('channel') or info.get('uploader') or ''
+            count = 0
+            for entry in info.get('entries') or []:
+                if not entry or not entry.get('id'):
+                    continue
+                yield {'id': entry['id'], 'title': entry.get('title') or '', 'channel': channel}
+                count += 1
+                if limit and count >= limit:
+                    return
+
+    def open_thumbnail(self, url, headers=None):
+        return self.get_session().get(
+            url, headers=headers or {}, stream=True,
+            timeout=(THUMBNAIL_CONNECT_TIMEOUT, THUMBNAIL_READ_TIMEOUT)
+        )
+
+
+class ReplayError(Exception):
+    """Failure raised by the replay backend (missing fixture or injected)"""
+
+
+class _ReplayResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._content = content
+
+    def iter_content(self, chunk_size=64 * 1024):
+        for i in range(0, len(self._content), chunk_size):
+            yield self._content[i:i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class ReplayExtractor(Extractor):
+    """Recorded fixtures with simulated latency, failures and throttling"""
+
+    name = 'replay'
+    THUMBNAIL_SCHEME = 'replay://'
+    PAGE_SIZE = 30  # Entries per simulated listing page
+
+    def __init__(self, corpus_dir=REPLAY_CORPUS_DIR, latency_ms=REPLAY_LATENCY_MS,
+                 jitter_ms=REPLAY_LATENCY_JITTER_MS, failure_rate=REPLAY_FAILURE_RATE,
+                 throttle_rate=REPLAY_THROTTLE_RATE, seed=REPLAY_SEED):
+        self.corpus_dir = corpus_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.throttle_rate = throttle_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._sources = None
+
+    def info_path(self, video_id):
+        return os.path.join(self.corpus_dir, 'info', f"{video_id}.json.gz")
+
+    def thumbnail_path(self, video_id):
+        return os.path.join(self.corpus_dir, 'thumbnails', f"{video_id}.jpg")
+
+    def video_ids(self):
+        """IDs of every recorded video, sorted"""
+        info_dir = os.path.join(self.corpus_dir, 'info')
+        if not os.path.isdir(info_dir):
+            return []
+        return sorted(
+            name[:-len('.json.gz')] for name in os.listdir(info_dir) if name.endswith('.json.gz')
+        )
+
+    def _simulate(self, inject_failures=True):
+        with self._random_lock:
+            delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            roll = self._random.random()
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if not inject_failures:
+            return
+        if roll < self.throttle_rate:
+            raise ReplayError("HTTP Error 429: Too Many Requests (injected)")
+        if roll < self.throttle_rate + self.failure_rate:
+            raise ReplayError("Injected extraction failure")
+
+    def extract_info(self, video_url):
+        self._simulate()
+        video_id = extract_video_id(video_url)
+        if not video_id or not os.path.exists(self.info_path(video_id)):
+            raise ReplayError(f"Video unavailable (not in corpus): {video_url}")
+        with gzip.open(self.info_path(video_id), 'rt', encoding='utf-8') as f:
+            info = json.load(f)
+        info['thumbnail'] = (
+            self.THUMBNAIL_SCHEME + video_id
+            if os.path.exists(self.thumbnail_path(video_id)) else ''
+        )
+        return info
+
+    def list_entries(self, url, limit=None):
+        if self._sources is None:
+            sources_path = os.path.join(self.corpus_dir, 'sources.json')
+            if os.path.exists(sources_path):
+                with open(sources_path, encoding='utf-8') as f:
+                    self._sources = json.load(f)
+            else:
+                self._sources = {}
+
+        video_ids = self._sources.get(url) or self.video_ids()
+        if limit:
+            video_ids = video_ids[:limit]
+        for i, video_id in enumerate(video_ids):
+            if i % self.PAGE_SIZE == 0:
+                self._simulate(inject_failures=False)
+            yield {'id': video_id, 'title': '', 'channel': ''}
+
+    def open_thumbnail(self, url, headers=None):
+        self._simulate(inject_failures=False)
+        if not url.startswith(self.THUMBNAIL_SCHEME):
+            return _ReplayResponse(404)
+        path = self.thumbnail_path(url[len(self.THUMBNAIL_SCHEME):])
+        if not os.path.exists(path):
+            return _ReplayResponse(404)
+
+        stat = os.stat(path)
+        etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+        if (headers or {}).get('If-None-Match') == etag:
+            return _ReplayResponse(304, headers={'ETag': etag})
+        with open(path, 'rb') as f:
+            return _ReplayResponse(200, f.read(), headers={'ETag': etag})
+
+
+EXTRACTORS = {
+    'live': LiveExtractor,
+    'replay': ReplayExtractor,
+}
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_extractor():
+    """The process-wide extractor, created from EXTRACTOR_BACKEND on first use"""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            if EXTRACTOR_BACKEND not in EXTRACTORS:
+                raise ValueError(
+                    f"Unknown EXTRACTOR_BACKEND {EXTRACTOR_BACKEND!r}; "
+                    f"choose from {', '.join(EXTRACTORS)}"
+                )
+            _extractor = EXTRACTORS[EXTRACTOR_BACKEND]()
+            logger.info(f"Using the {_extractor.name} extractor backend")
+        return _extractor
+
+
+def set_extractor(extractor):
+    """Replace the process-wide extractor (benchmarks, tests)"""
+    global _extractor
+    with _extractor_lock:
+        _extractor = extractor
@@ -0,0 +1,106 @@
+"""On-disk cache of raw yt-dlp info dicts.
+
+Each video's info dict is stored as gzip-compressed JSON under
+``INFO_CACHE_DIR/<shard>/<video_id>.json.gz``. The shard is derived from a
+hash of the ID, which keeps directories small. Entries older than
+INFO_CACHE_TTL_SECONDS count as missing.
+
+Every live extraction writes its info dict here, but extraction does not
+read it back by default: view counts and other metadata go stale, and a
+retried or requeued video should be fetched fresh. The cache is read when
+asked for explicitly (``process_videos.py --use-info-cache``) and keeps
+the raw metadata around, so video rows can be re-derived offline when the
+schema or the derivation changes.
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+import tempfile
+
+from config import INFO_CACHE_DIR, INFO_CACHE_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class InfoDictCache:
+    """Compressed, TTL'd info dict files keyed by video ID"""
+
+    def __init__(self, root=INFO_CACHE_DIR, ttl=INFO_CACHE_TTL_SECONDS):
+        self.root = root
+        self.ttl = ttl
+
+    def path(self, video_id):
+        shard = hashlib.md5(video_id.encode('utf-8')).hexdigest()[:2]
+        return os.path.join(self.root, shard, f"{video_id}.json.gz")
+
+    def _is_fresh(self, path):
+        try:
+            return time.time() - os.stat(path).st_mtime < self.ttl
+        except FileNotFoundError:
+            return False
+
+    def get(self, video_id, max_age=None):
+        """Cached info dict of a video, or None if missing or expired.
+
+        `max_age` overrides the TTL, e.g. `float('inf')` for offline
+        reprocessing of whatever is on disk.
+        """
+        path = self.path(video_id)
+        max_age = self.ttl if max_age is None else max_age
+        try:
+            if time.time() - os.stat(path).st_mtime >= max_age:
+                return None
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable info cache entry for {video_id}: {e}")
+            return None
+
+    def put(self, video_id, info):
+        """Store an info dict (must be JSON-serialisable, see YoutubeDL.sanitize_info)"""
+        path = self.path(video_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as raw, \
+                    gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as f:
+                f.write(json.dumps(info, ensure_ascii=False).encode('utf-8'))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def video_ids(self):
+        """IDs of every video with an entry on disk, expired or not"""
+        if not os.path.isdir(self.root):
+            return
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith('.json.gz'):
+                    yield name[:-len('.json.gz')]
+
+    def prune(self):
+        """Delete expired entries and abandoned temp files; returns files deleted"""
+        deleted = 0
+        if not os.path.isdir(self.root):
+            return deleted
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                if not self._is_fresh(path):
+                    try:
+                        os.remove(path)
+                        deleted += 1
+                    except FileNotFoundError:
+                        pass
+        logger.info(f"Info cache: {deleted} expired entries deleted")
+        return deleted
+
+
+info_cache = InfoDictCache()
@@ -0,0 +1,121 @@
+"""Keyset-paginated, filtered reads of labeled data.
+
+Pages are ordered newest first by ``(labeled_at, id)`` and continue from
+a cursor (the position of the last label returned), so fetching page N
+costs the same as fetching page 1: SQLite seeks straight to the cursor in
+the labels index instead of skipping OFFSET rows. Filters become WHERE
+clauses, and ``fields`` limits the columns selected, which lets clients
+avoid reading descriptions at all.
+"""
+
+from app.db_pool import get_db_connection
+from app.exporter import decode_cursor, encode_cursor
+
+# Public field name -> SQL expression
+LABEL_FIELDS = {
+    'label_id': 'l.id',
+    'video_id': 'v.video_id',
+    'title': 'm.title',
+    'description': 'm.description',
+    'view_count': 'm.view_count',
+    'like_count': 'm.like_count',
+    'thumbnail_url': 'm.thumbnail_url',
+    'duration': 'm.duration',
+    'upload_date': 'm.upload_date',
+    'channel_id': 'm.channel_id',
+    'channel_name': 'm.channel_name',
+    'video_url': 'm.video_url',
+    'is_clickbait': 'l.is_clickbait',
+    'confidence_level': 'l.confidence_level',
+    'labeled_by': 'u.username',
+    'labeled_at': 'l.labeled_at',
+}
+
+DEFAULT_FIELDS = [field for field in LABEL_FIELDS if field != 'description']
+
+MAX_PAGE_SIZE = 1000
+
+
+def get_labels_page(cursor=None, limit=100, fields=None, username=None,
+                    labeled_from=None, labeled_to=None, is_clickbait=None,
+                    confidence_level=None, channel=None):
+    """Fetch one page of labels, newest first.
+
+    `labeled_from`/`labeled_to` are inclusive dates or timestamps (ISO
+    strings); `channel` matches channel_name or channel_id exactly.
+    Returns {'labels': [...], 'next_cursor': str or None}. Raises
+    ValueError for unknown fields or a malformed cursor.
+    """
+    fields = list(fields) if fields else DEFAULT_FIELDS
+    unknown = [field for field in fields if field not in LABEL_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(unknown)}; "
+            f"choose from {', '.join(LABEL_FIELDS)}"
+        )
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+    conditions = []
+    params = []
+    if cursor:
+        conditions.append("(l.labeled_at, l.id) < (?, ?)")
+        params.extend(decode_cursor(cursor))
+    if username:
+        conditions.append("l.user_id = (SELECT id FROM users WHERE username = ?)")
+        params.append(username)
+    if labeled_from:
+        conditions.append("l.labeled_at >= ?")
+        params.append(str(labeled_from))
+    if labeled_to:
+        labeled_to = str(labeled_to)
+        if len(labeled_to) == 10:
+            # A bare date includes the whole day
+            conditions.append("l.labeled_at < date(?, '+1 day')")
+        else:
+            conditions.append("l.labeled_at <= ?")
+        params.append(labeled_to)
+    if is_clickbait is not None:
+        conditions.append("l.is_clickbait = ?")
+        params.append(1 if is_clickbait else 0)
+    if confidence_level is not None:
+        conditions.append("l.confidence_level = ?")
+        params.append(confidence_level)
+    if channel:
+        conditions.append("(m.channel_name = ? OR m.channel_id = ?)")
+        params.extend([channel, channel])
+
+    # Only join what the selected fields and filters need
+    needed = ' '.join([LABEL_FIELDS[field] for field in fields] + conditions)
+    joins = ["JOIN videos v ON v.id = l.video_id"] if 'v.' in needed or 'm.' in needed else []
+    if 'm.' in needed:
+        joins.append("LEFT JOIN video_metadata m ON m.video_id = v.id")
+    if 'u.' in needed:
+        joins.append("JOIN users u ON u.id = l.user_id")
+
+    select = ', '.join(f"{LABEL_FIELDS[field]} AS {field}" for field in fields)
+    query = f'''
+        SELECT {select}, l.labeled_at AS _cursor_at, l.id AS _cursor_id
+        FROM labels l
+        {' '.join(joins)}
+        {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        ORDER BY l.labeled_at DESC, l.id DESC
+        LIMIT ?
+    '''
+    params.append(limit + 1)
+
+    with get_db_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+
+    labels = []
+    for row in rows[:limit]:
+        label = {field: row[field] for field in fields}
+        if label.get('is_clickbait') is not None:
+            label['is_clickbait'] = bool(label['is_clickbait'])
+        labels.append(label)
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last['_cursor_at'], last['_cursor_id'])
+
+    return {'labels': labels, 'next_cursor': next_cursor}
@@ -0,0 +1,186 @@
+"""Lease-based labeling work queue.
+
+Processed videos that still need a label live in ``label_queue``. A
+labeler claims a block of them with a single ``UPDATE ... RETURNING``
+statement, so the pick and the reservation happen atomically and two users
+can never be handed the same video. The block is then served from the
+user's session, paying the claim cost once per block rather than once per
+label. Leases expire after ``LABEL_LEASE_MINUTES`` unless renewed, and the
+videos become claimable again.
+"""
+
+import time
+
+from config import LABEL_LEASE_MINUTES, LABEL_BATCH_SIZE
+from app.db_pool import get_db_connection, write_transaction
+
+LEASE_SECONDS = LABEL_LEASE_MINUTES * 60
+
+
+class LeaseLost(Exception):
+    """The user no longer holds the lease on a video they are labeling"""
+
+
+class LeaseBatch:
+    """A block of videos leased to one user, handed out one at a time"""
+
+    # Renew once less than this fraction of the lease time is left
+    RENEW_FRACTION = 1 / 3
+
+    def __init__(self, user_id, videos, expires_at):
+        self.user_id = user_id
+        self.videos = list(videos)
+        self.expires_at = expires_at
+
+    def current(self):
+        """The video to show next, or None when the batch is used up"""
+        return self.videos[0] if self.videos else None
+
+    def advance(self):
+        """Drop the current video after it was labeled or skipped"""
+        if self.videos:
+            self.videos.pop(0)
+
+    def discard(self, video_id):
+        """Drop a video (internal id) from the batch, wherever it is"""
+        self.videos = [video for video in self.videos if video['id'] != video_id]
+
+    def is_exhausted(self):
+        return not self.videos
+
+    def is_expired(self, now=None):
+        return (now or time.time()) >= self.expires_at
+
+    def needs_renewal(self, now=None):
+        remaining = self.expires_at - (now or time.time())
+        return remaining < LEASE_SECONDS * self.RENEW_FRACTION
+
+    def renew(self):
+        """Extend the leases still held; videos lost to other users are dropped"""
+        kept, self.expires_at = renew_leases(
+            self.user_id, [video['id'] for video in self.videos]
+        )
+        self.videos = [video for video in self.videos if video['id'] in kept]
+
+    def release(self):
+        """Return the unused videos to the queue"""
+        release_leases(self.user_id)
+        self.videos = []
+
+
+def enqueue_videos(conn, video_ids):
+    """Make processed videos (by YouTube video_id) available for labeling"""
+    conn.executemany('''
+        INSERT OR IGNORE INTO label_queue (video_id)
+        SELECT v.id FROM videos v
+        WHERE v.video_id = ? AND v.processed = 1 AND v.label_count = 0
+    ''', [(video_id,) for video_id in video_ids])
+
+
+def complete_video(conn, video_id, user_id):
+    """Remove a labeled video (internal id) from the queue.
+
+    Raises LeaseLost, so the caller's transaction is rolled back, unless
+    the user still holds the video's lease.
+    """
+    completed = conn.execute('''
+        DELETE FROM label_queue WHERE video_id = ? AND leased_to = ?
+        RETURNING video_id
+    ''', (video_id, user_id)).fetchone()
+    if completed is None:
+        raise LeaseLost(f"Video {video_id} is no longer leased to user {user_id}")
+
+
+def release_video(conn, video_id, user_id):
+    """Give up a user's lease on a video (internal id) so others can claim it"""
+    conn.execute('''
+        UPDATE label_queue SET leased_to = NULL, lease_expires_at = 0
+        WHERE video_id = ? AND leased_to = ?
+    ''', (video_id, user_id))
+
+
+def _get_videos(conn, video_ids):
+    if not video_ids:
+        return []
+    placeholders = ','.join('?' * len(video_ids))
+    rows = conn.execute(
+        f"SELECT * FROM video_details WHERE id IN ({placeholders}) ORDER BY id",
+        list(video_ids)
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def claim_batch(user_id, size=LABEL_BATCH_SIZE):
+    """Lease up to `size` videos to the user.
+
+    If the user still holds live leases (e.g. after a page reload) those are
+    returned instead of claiming more.
+    """
+    now = time.time()
+
+    with get_db_connection() as conn:
+        held = conn.execute('''
+            SELECT video_id, lease_expires_at FROM label_queue
+            WHERE leased_to = ? AND lease_expires_at >= ?
+            ORDER BY video_id
+        ''', (user_id, now)).fetchall()
+        if held:
+            return LeaseBatch(
+                user_id,
+                _get_videos(conn, [row['video_id'] for row in held]),
+                min(row['lease_expires_at'] for row in held)
+            )
+
+    expires_at = now + LEASE_SECONDS
+    with write_transaction() as conn:
+        claimed = conn.execute('''
+            UPDATE label_queue
+            SET leased_to = ?, lease_expires_at = ?
+            WHERE video_id IN (
+                SELECT q.video_id FROM label_queue q
+                WHERE q.lease_expires_at < ?
+                AND NOT EXISTS (
+                    SELECT 1 FROM skipped_videos s
+                    WHERE s.user_id = ? AND s.video_id = q.video_id
+                )
+                ORDER BY q.lease_expires_at
+                LIMIT ?
+            )
+            RETURNING video_id
+        ''', (user_id, expires_at, now, user_id, size)).fetchall()
+
+        videos = _get_videos(conn, [row['video_id'] for row in claimed])
+    return LeaseBatch(user_id, videos, expires_at)
+
+
+def claim_video(user_id):
+    """Return a video leased to the user, leasing a new one if needed"""
+    return claim_batch(user_id, size=1).current()
+
+
+def renew_leases(user_id, video_ids):
+    """Extend the user's leases on the given videos.
+
+    Returns the set of video ids still held and the new expiry time.
+    """
+    if not video_ids:
+        return set(), time.time()
+
+    expires_at = time.time() + LEASE_SECONDS
+    placeholders = ','.join('?' * len(video_ids))
+    with write_transaction() as conn:
+        renewed = conn.execute(f'''
+            UPDATE label_queue SET lease_expires_at = ?
+            WHERE leased_to = ? AND video_id IN ({placeholders})
+            RETURNING video_id
+        ''', [expires_at, user_id, *video_ids]).fetchall()
+    return {row['video_id'] for row in renewed}, expires_at
+
+
+def release_leases(user_id):
+    """Return every video leased to the user to the queue"""
+    with write_transaction() as conn:
+        conn.execute('''
+            UPDATE label_queue SET leased_to = NULL, lease_expires_at = 0
+            WHERE leased_to = ?
+        ''', (user_id,))
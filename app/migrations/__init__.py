@@ -0,0 +1,95 @@
+"""Versioned schema migrations.
+
+Each migration is a module in this package named ``mNNNN_description.py``
+that defines an ``upgrade(conn)`` function. Migrations run in version
+order, each inside its own write transaction, and the applied version is
+recorded in the ``schema_version`` table.
+"""
+
+import re
+import time
+import pkgutil
+import logging
+import importlib
+
+from app.db_pool import get_db_connection, write_transaction
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_NAME_RE = re.compile(r'^m(\d{4})_(\w+)$')
+
+
+def discover_migrations():
+    """List available migrations as (version, module_name) tuples in order"""
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = MIGRATION_NAME_RE.match(module_info.name)
+        if match:
+            migrations.append((int(match.group(1)), module_info.name))
+    return sorted(migrations)
+
+
+def get_latest_version():
+    """Get the highest migration version shipped with the code"""
+    migrations = discover_migrations()
+    return migrations[-1][0] if migrations else 0
+
+
+def get_current_version(conn):
+    """Get the schema version recorded in the database (0 if unversioned)"""
+    try:
+        row = conn.execute(
+            "SELECT MAX(version) AS version FROM schema_version"
+        ).fetchone()
+    except Exception:
+        # schema_version table doesn't exist yet
+        return 0
+    return row['version'] or 0
+
+
+def get_pending_migrations():
+    """List migrations that have not been applied yet"""
+    with get_db_connection() as conn:
+        current = get_current_version(conn)
+    return [(v, name) for v, name in discover_migrations() if v > current]
+
+
+def apply_migrations(target_version=None):
+    """Apply pending migrations up to target_version (default: latest)"""
+    applied = []
+    for version, name in get_pending_migrations():
+        if target_version is not None and version > target_version:
+            break
+
+        module = importlib.import_module(f"{__name__}.{name}")
+        started = time.monotonic()
+        with write_transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            # Another process may have applied it while we waited for the lock
+            if get_current_version(conn) >= version:
+                continue
+            module.upgrade(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                (version, name)
+            )
+        logger.info(
+            f"Applied migration {name} in {time.monotonic() - started:.2f}s"
+        )
+        applied.append(name)
+    return applied
+
+
+def ensure_schema():
+    """Bring the database up to date; a single version check when it already is"""
+    with get_db_connection() as conn:
+        current = get_current_version(conn)
+    if current >= get_latest_version():
+        return []
+    return apply_migrations()
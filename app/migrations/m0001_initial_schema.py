@@ -0,0 +1,106 @@
+"""Initial schema (previously created by init_db on every start)"""
+
+import sqlite3
+
+
+def upgrade(conn):
+    cursor = conn.cursor()
+
+    # Users table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        is_admin BOOLEAN DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    # Reset tokens table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS reset_tokens (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        token TEXT NOT NULL,
+        expires_at TIMESTAMP NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    ''')
+
+    # Videos table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS videos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        video_id TEXT UNIQUE NOT NULL,
+        title TEXT,
+        description TEXT,
+        view_count INTEGER,
+        like_count INTEGER,
+        thumbnail_url TEXT,
+        local_thumbnail_path TEXT,
+        duration INTEGER,
+        upload_date TEXT,
+        channel_id TEXT,
+        channel_name TEXT,
+        video_url TEXT,
+        processed BOOLEAN DEFAULT 0,
+        assigned_to INTEGER DEFAULT NULL,
+        assigned_at TIMESTAMP DEFAULT NULL,
+        FOREIGN KEY (assigned_to) REFERENCES users (id)
+    )
+    ''')
+
+    # Labels table (for user contributions)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS labels (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        video_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        is_clickbait BOOLEAN NOT NULL,
+        confidence_level INTEGER NOT NULL CHECK(confidence_level BETWEEN 1 AND 4),
+        labeled_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (video_id) REFERENCES videos (id),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    ''')
+
+    # Databases created before confidence levels existed lack the column
+    try:
+        cursor.execute('ALTER TABLE labels ADD COLUMN confidence_level INTEGER NOT NULL DEFAULT 3 CHECK(confidence_level BETWEEN 1 AND 4)')
+    except sqlite3.OperationalError:
+        # Column already exists
+        pass
+
+    # Daily stats table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS daily_stats (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        contribution_count INTEGER DEFAULT 0,
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        UNIQUE (user_id, date)
+    )
+    ''')
+
+    # Skipped videos table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS skipped_videos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        video_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        skipped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (video_id) REFERENCES videos (id),
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        UNIQUE(video_id, user_id)
+    )
+    ''')
+
+    # Create default admin user if it doesn't exist
+    from app.database import hash_password
+    cursor.execute('''
+    INSERT OR IGNORE INTO users (username, email, password_hash, is_admin)
+    VALUES (?, ?, ?, 1)
+    ''', ('admin', 'admin@example.com', hash_password('admin123')))
@@ -0,0 +1,24 @@
+"""Secondary indexes for the labeling, dashboard and reset-token queries"""
+
+
+def upgrade(conn):
+    cursor = conn.cursor()
+
+    # get_unlabeled_video_for_user: per-user label/skip exclusion and the
+    # assigned/unassigned video lookups
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_labels_user_video ON labels (user_id, video_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_skipped_user_video ON skipped_videos (user_id, video_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_videos_assigned_to ON videos (assigned_to)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_videos_processed_assigned ON videos (processed, assigned_to)')
+
+    # get_admin_dashboard_stats: COUNT(DISTINCT video_id) and NOT IN over labels
+    # are answered from this index alone
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_labels_video_id ON labels (video_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_is_admin ON users (is_admin)')
+
+    # validate_reset_token / create_reset_token
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_reset_tokens_token ON reset_tokens (token)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_reset_tokens_user_id ON reset_tokens (user_id)')
+
+    # Refresh planner statistics so the new indexes are picked up
+    cursor.execute('ANALYZE')
@@ -0,0 +1,27 @@
+"""Dedicated labeling queue with explicit, indexed lease records"""
+
+
+def upgrade(conn):
+    cursor = conn.cursor()
+
+    # One row per processed, not yet labeled video. lease_expires_at is a
+    # unix timestamp; 0 means the video is free to claim.
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS label_queue (
+        video_id INTEGER PRIMARY KEY,
+        leased_to INTEGER DEFAULT NULL,
+        lease_expires_at REAL NOT NULL DEFAULT 0,
+        FOREIGN KEY (video_id) REFERENCES videos (id),
+        FOREIGN KEY (leased_to) REFERENCES users (id)
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_label_queue_expiry ON label_queue (lease_expires_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_label_queue_leased_to ON label_queue (leased_to, lease_expires_at)')
+
+    # Seed the queue with everything that is currently labelable
+    cursor.execute('''
+    INSERT OR IGNORE INTO label_queue (video_id)
+    SELECT v.id FROM videos v
+    WHERE v.processed = 1
+    AND NOT EXISTS (SELECT 1 FROM labels l WHERE l.video_id = v.id)
+    ''')
@@ -0,0 +1,5 @@
+"""Index labels by (labeled_at, id) so exports stream in order without a sort"""
+
+
+def upgrade(conn):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_labels_labeled_at ON labels (labeled_at, id)')
@@ -0,0 +1,113 @@
+"""Trigger-maintained counters for the admin dashboard"""
+
+COUNTER_TRIGGERS = [
+    # Videos: total and processed
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_videos_insert AFTER INSERT ON videos
+    BEGIN
+        UPDATE stats_counters SET value = value + 1 WHERE name = 'total_videos';
+        UPDATE stats_counters SET value = value + 1
+        WHERE name = 'processed_videos' AND NEW.processed = 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_videos_delete AFTER DELETE ON videos
+    BEGIN
+        UPDATE stats_counters SET value = value - 1 WHERE name = 'total_videos';
+        UPDATE stats_counters SET value = value - 1
+        WHERE name = 'processed_videos' AND OLD.processed = 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_videos_processed AFTER UPDATE OF processed ON videos
+    WHEN (OLD.processed = 1) IS NOT (NEW.processed = 1)
+    BEGIN
+        UPDATE stats_counters
+        SET value = value + CASE WHEN NEW.processed = 1 THEN 1 ELSE -1 END
+        WHERE name = 'processed_videos';
+    END
+    ''',
+    # Labels: distinct labeled videos and per-user contributions
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_labels_insert AFTER INSERT ON labels
+    BEGIN
+        UPDATE stats_counters SET value = value + 1
+        WHERE name = 'labeled_videos'
+        AND NOT EXISTS (
+            SELECT 1 FROM labels WHERE video_id = NEW.video_id AND id != NEW.id
+        );
+        INSERT INTO user_contributions (user_id, contribution_count)
+        VALUES (NEW.user_id, 1)
+        ON CONFLICT(user_id) DO UPDATE SET contribution_count = contribution_count + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_labels_delete AFTER DELETE ON labels
+    BEGIN
+        UPDATE stats_counters SET value = value - 1
+        WHERE name = 'labeled_videos'
+        AND NOT EXISTS (SELECT 1 FROM labels WHERE video_id = OLD.video_id);
+        UPDATE user_contributions SET contribution_count = contribution_count - 1
+        WHERE user_id = OLD.user_id;
+    END
+    ''',
+    # Users: non-admin accounts
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_users_insert AFTER INSERT ON users
+    WHEN NEW.is_admin = 0
+    BEGIN
+        UPDATE stats_counters SET value = value + 1 WHERE name = 'total_users';
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_users_delete AFTER DELETE ON users
+    WHEN OLD.is_admin = 0
+    BEGIN
+        UPDATE stats_counters SET value = value - 1 WHERE name = 'total_users';
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_stats_users_admin AFTER UPDATE OF is_admin ON users
+    WHEN (OLD.is_admin = 0) IS NOT (NEW.is_admin = 0)
+    BEGIN
+        UPDATE stats_counters
+        SET value = value + CASE WHEN NEW.is_admin = 0 THEN 1 ELSE -1 END
+        WHERE name = 'total_users';
+    END
+    ''',
+]
+
+
+def upgrade(conn):
+    cursor = conn.cursor()
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS stats_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS user_contributions (
+        user_id INTEGER PRIMARY KEY,
+        contribution_count INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_contributions_count ON user_contributions (contribution_count)')
+
+    # Seed from the current data
+    cursor.execute('''
+    INSERT OR REPLACE INTO stats_counters (name, value)
+    SELECT 'total_videos', COUNT(*) FROM videos
+    UNION ALL SELECT 'processed_videos', COUNT(*) FROM videos WHERE processed = 1
+    UNION ALL SELECT 'labeled_videos', COUNT(DISTINCT video_id) FROM labels
+    UNION ALL SELECT 'total_users', COUNT(*) FROM users WHERE is_admin = 0
+    ''')
+    cursor.execute('''
+    INSERT OR REPLACE INTO user_contributions (user_id, contribution_count)
+    SELECT user_id, COUNT(*) FROM labels GROUP BY user_id
+    ''')
+
+    for trigger in COUNTER_TRIGGERS:
+        cursor.execute(trigger)
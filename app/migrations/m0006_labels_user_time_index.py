@@ -0,0 +1,5 @@
+"""Index labels by (user_id, labeled_at) for per-user hourly activity"""
+
+
+def upgrade(conn):
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_labels_user_labeled_at ON labels (user_id, labeled_at)')
@@ -0,0 +1,12 @@
+"""Revoked API bearer tokens"""
+
+
+def upgrade(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS api_token_revocations (
+        jti TEXT PRIMARY KEY,
+        expires_at REAL NOT NULL,
+        revoked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_api_token_revocations_expiry ON api_token_revocations (expires_at)')
@@ -0,0 +1,22 @@
+"""Persistent, versioned admin settings (labeling instructions etc.)"""
+
+DEFAULT_INSTRUCTIONS = """Default labeling instructions:
+1. Watch the video title and thumbnail carefully
+2. Determine if it's clickbait based on misleading content
+3. Rate your confidence level from 1-4"""
+
+
+def upgrade(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS app_settings (
+        key TEXT PRIMARY KEY,
+        value TEXT,
+        version INTEGER NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_app_settings_version ON app_settings (version)')
+    conn.execute('''
+    INSERT OR IGNORE INTO app_settings (key, value, version)
+    VALUES ('labeling_instructions', ?, 1)
+    ''', (DEFAULT_INSTRUCTIONS,))
@@ -0,0 +1,95 @@
+"""Split videos into a narrow hot table and a cold metadata table.
+
+``videos`` keeps only what the queue, the worker and the counters touch
+(id, video_id, processed, label_count); titles, descriptions, URLs and
+channel data move to ``video_metadata``, keyed by the same id. The
+``video_details`` view joins the two back together under the old column
+names for readers that need everything.
+"""
+
+from app.migrations.m0005_stats_counters import COUNTER_TRIGGERS
+
+METADATA_COLUMNS = [
+    'title', 'description', 'view_count', 'like_count', 'thumbnail_url',
+    'local_thumbnail_path', 'duration', 'upload_date', 'channel_id',
+    'channel_name', 'video_url'
+]
+
+
+def upgrade(conn):
+    cursor = conn.cursor()
+    columns = ', '.join(METADATA_COLUMNS)
+
+    cursor.execute('''
+    CREATE TABLE video_metadata (
+        video_id INTEGER PRIMARY KEY,
+        title TEXT,
+        description TEXT,
+        view_count INTEGER,
+        like_count INTEGER,
+        thumbnail_url TEXT,
+        local_thumbnail_path TEXT,
+        duration INTEGER,
+        upload_date TEXT,
+        channel_id TEXT,
+        channel_name TEXT,
+        video_url TEXT,
+        FOREIGN KEY (video_id) REFERENCES videos (id)
+    )
+    ''')
+    cursor.execute(f'''
+    INSERT INTO video_metadata (video_id, {columns})
+    SELECT id, {columns} FROM videos
+    ''')
+
+    # Rebuild videos without the metadata and the unused assignment columns
+    cursor.execute('''
+    CREATE TABLE videos_hot (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        video_id TEXT UNIQUE NOT NULL,
+        processed BOOLEAN DEFAULT 0,
+        label_count INTEGER NOT NULL DEFAULT 0
+    )
+    ''')
+    cursor.execute('''
+    INSERT INTO videos_hot (id, video_id, processed, label_count)
+    SELECT v.id, v.video_id, v.processed,
+        (SELECT COUNT(*) FROM labels l WHERE l.video_id = v.id)
+    FROM videos v
+    ''')
+    cursor.execute('DROP TABLE videos')
+    cursor.execute('ALTER TABLE videos_hot RENAME TO videos')
+
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_videos_processed ON videos (processed)')
+
+    # Dropping the table dropped its counter triggers
+    for trigger in COUNTER_TRIGGERS:
+        if 'ON videos' in trigger:
+            cursor.execute(trigger)
+
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_videos_delete_metadata AFTER DELETE ON videos
+    BEGIN
+        DELETE FROM video_metadata WHERE video_id = OLD.id;
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_videos_label_count_insert AFTER INSERT ON labels
+    BEGIN
+        UPDATE videos SET label_count = label_count + 1 WHERE id = NEW.video_id;
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_videos_label_count_delete AFTER DELETE ON labels
+    BEGIN
+        UPDATE videos SET label_count = label_count - 1 WHERE id = OLD.video_id;
+    END
+    ''')
+
+    cursor.execute(f'''
+    CREATE VIEW IF NOT EXISTS video_details AS
+    SELECT v.id, v.video_id, {', '.join('m.' + c for c in METADATA_COLUMNS)},
+        v.processed, v.label_count
+    FROM videos v
+    LEFT JOIN video_metadata m ON m.video_id = v.id
+    ''')
@@ -0,0 +1,40 @@
+"""FTS5 full-text index over video titles, descriptions and channel names"""
+
+
+def upgrade(conn):
+    cursor = conn.cursor()
+
+    # External-content table: the text lives in video_metadata only
+    cursor.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS video_search USING fts5(
+        title, description, channel_name,
+        content='video_metadata', content_rowid='video_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    ''')
+    cursor.execute("INSERT INTO video_search (video_search) VALUES ('rebuild')")
+
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_video_search_insert AFTER INSERT ON video_metadata
+    BEGIN
+        INSERT INTO video_search (rowid, title, description, channel_name)
+        VALUES (NEW.video_id, NEW.title, NEW.description, NEW.channel_name);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_video_search_delete AFTER DELETE ON video_metadata
+    BEGIN
+        INSERT INTO video_search (video_search, rowid, title, description, channel_name)
+        VALUES ('delete', OLD.video_id, OLD.title, OLD.description, OLD.channel_name);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_video_search_update
+    AFTER UPDATE OF title, description, channel_name ON video_metadata
+    BEGIN
+        INSERT INTO video_search (video_search, rowid, title, description, channel_name)
+        VALUES ('delete', OLD.video_id, OLD.title, OLD.description, OLD.channel_name);
+        INSERT INTO video_search (rowid, title, description, channel_name)
+        VALUES (NEW.video_id, NEW.title, NEW.description, NEW.channel_name);
+    END
+    ''')
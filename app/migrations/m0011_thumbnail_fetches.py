@@ -0,0 +1,13 @@
+"""HTTP validators of downloaded thumbnails, for conditional re-fetches"""
+
+
+def upgrade(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS thumbnail_fetches (
+        video_id TEXT PRIMARY KEY,
+        url TEXT NOT NULL,
+        etag TEXT,
+        last_modified TEXT,
+        fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
@@ -0,0 +1,53 @@
+"""Content-addressed thumbnail store: blobs with reference counts and the video -> blob mapping"""
+
+REFCOUNT_TRIGGERS = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_video_thumbnails_insert AFTER INSERT ON video_thumbnails
+    BEGIN
+        UPDATE thumbnail_blobs SET refcount = refcount + 1 WHERE hash = NEW.hash;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_video_thumbnails_delete AFTER DELETE ON video_thumbnails
+    BEGIN
+        UPDATE thumbnail_blobs SET refcount = refcount - 1 WHERE hash = OLD.hash;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_video_thumbnails_update AFTER UPDATE OF hash ON video_thumbnails
+    WHEN OLD.hash IS NOT NEW.hash
+    BEGIN
+        UPDATE thumbnail_blobs SET refcount = refcount - 1 WHERE hash = OLD.hash;
+        UPDATE thumbnail_blobs SET refcount = refcount + 1 WHERE hash = NEW.hash;
+    END
+    ''',
+    # A deleted video releases its thumbnail
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_videos_delete_thumbnail AFTER DELETE ON videos
+    BEGIN
+        DELETE FROM video_thumbnails WHERE video_id = OLD.video_id;
+    END
+    ''',
+]
+
+
+def upgrade(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS thumbnail_blobs (
+        hash TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        refcount INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS video_thumbnails (
+        video_id TEXT PRIMARY KEY,
+        hash TEXT NOT NULL REFERENCES thumbnail_blobs (hash)
+    )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_video_thumbnails_hash ON video_thumbnails (hash)')
+    # Garbage collection only looks at unreferenced blobs
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_thumbnail_blobs_orphans ON thumbnail_blobs (hash) WHERE refcount <= 0')
+    for trigger in REFCOUNT_TRIGGERS:
+        conn.execute(trigger)
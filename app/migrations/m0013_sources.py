@@ -0,0 +1,34 @@
+"""Tracked channels and playlists with sync watermarks and per-sync stats"""
+
+
+def upgrade(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS sources (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source_type TEXT NOT NULL CHECK (source_type IN ('channel', 'playlist')),
+        url TEXT UNIQUE NOT NULL,
+        sync_interval_minutes INTEGER NOT NULL,
+        last_seen_ids TEXT NOT NULL DEFAULT '[]',
+        last_synced_at TIMESTAMP,
+        next_sync_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_error TEXT,
+        videos_found INTEGER NOT NULL DEFAULT 0,
+        videos_new INTEGER NOT NULL DEFAULT 0,
+        sync_count INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_sources_next_sync ON sources (next_sync_at)')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS source_syncs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source_id INTEGER NOT NULL REFERENCES sources (id) ON DELETE CASCADE,
+        started_at TIMESTAMP NOT NULL,
+        duration_seconds REAL NOT NULL,
+        videos_found INTEGER NOT NULL,
+        videos_new INTEGER NOT NULL,
+        full_sync INTEGER NOT NULL DEFAULT 0,
+        error TEXT
+    )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_source_syncs_source ON source_syncs (source_id, started_at)')
@@ -0,0 +1,40 @@
+"""Per-video retry state for failed extractions and a dead-letter table"""
+
+
+def upgrade(conn):
+    # The epoch default makes new and existing pending videos due at once;
+    # NULL parks a video that was moved to the dead-letter table
+    conn.execute("ALTER TABLE videos ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+    conn.execute("ALTER TABLE videos ADD COLUMN next_attempt_at TIMESTAMP DEFAULT '1970-01-01 00:00:00'")
+    conn.execute("ALTER TABLE videos ADD COLUMN last_error_class TEXT")
+    conn.execute("ALTER TABLE videos ADD COLUMN last_error TEXT")
+
+    # The worker's pick: pending videos in due order, straight from the index.
+    # It also serves every lookup by `processed` alone
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_videos_due ON videos (processed, next_attempt_at)')
+    conn.execute('DROP INDEX IF EXISTS idx_videos_processed')
+
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS dead_letter_videos (
+        video_id INTEGER PRIMARY KEY REFERENCES videos (id),
+        attempts INTEGER NOT NULL,
+        error_class TEXT NOT NULL,
+        last_error TEXT,
+        dead_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_dead_letter_class ON dead_letter_videos (error_class, dead_at)')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_videos_delete_dead_letter AFTER DELETE ON videos
+    BEGIN
+        DELETE FROM dead_letter_videos WHERE video_id = OLD.id;
+    END
+    ''')
+    # A video processed by other means (e.g. added again by an admin) leaves the dead letters
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_videos_processed_dead_letter AFTER UPDATE OF processed ON videos
+    WHEN NEW.processed = 1
+    BEGIN
+        DELETE FROM dead_letter_videos WHERE video_id = NEW.id;
+    END
+    ''')
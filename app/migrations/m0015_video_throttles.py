@@ -0,0 +1,5 @@
+"""Per-video count of throttled attempts, so throttling cannot keep a video due forever"""
+
+
+def upgrade(conn):
+    conn.execute("ALTER TABLE videos ADD COLUMN throttles INTEGER NOT NULL DEFAULT 0")
@@ -0,0 +1,162 @@
+"""Read-only snapshot of the live database for exports and analytics.
+
+The replica is a consistent copy made with SQLite's online backup API,
+so long reads run against a separate file and never hold up labelers'
+writes. Each snapshot is also read-optimized: it carries
+``labels_enriched``, a denormalized labels-with-metadata table with its own
+indexes, so exports need no joins.
+
+``scripts/refresh_replica.py`` refreshes the snapshot on a schedule. A
+reader that finds the snapshot older than REPLICA_REFRESH_AFTER_SECONDS
+starts a refresh in a background thread and reads the current copy
+meanwhile. A snapshot older than REPLICA_MAX_STALENESS_SECONDS (or no
+snapshot at all) is never served: the reader waits for a fresh one, and
+a failed refresh raises rather than falling back to stale data.
+
+A snapshot's age counts from the moment its backup began, which is
+stored as the replica file's modification time.
+"""
+
+import os
+import time
+import fcntl
+import sqlite3
+import logging
+import threading
+
+from config import REPLICA_PATH, REPLICA_REFRESH_AFTER_SECONDS, REPLICA_MAX_STALENESS_SECONDS
+from app.db_pool import ConnectionManager, get_db_connection
+
+logger = logging.getLogger(__name__)
+
+replica_manager = ConnectionManager(REPLICA_PATH, read_only=True)
+
+# Identity of the replica file the pooled connections were opened on
+_replica_identity = None
+_identity_lock = threading.Lock()
+
+# At most one background refresh per process
+_refresh_thread = None
+_refresh_lock = threading.Lock()
+
+
+def _build_read_optimizations(conn):
+    """Denormalize labels and add analytics indexes to a fresh snapshot"""
+    cursor = conn.cursor()
+    cursor.execute('''
+    CREATE TABLE labels_enriched AS
+    SELECT
+        l.id, l.user_id, v.video_id, m.title, m.description, m.view_count,
+        m.like_count, m.thumbnail_url, m.duration, m.upload_date,
+        m.channel_id, m.channel_name, m.video_url,
+        l.is_clickbait, l.confidence_level, u.username AS labeled_by, l.labeled_at
+    FROM labels l
+    JOIN videos v ON l.video_id = v.id
+    LEFT JOIN video_metadata m ON m.video_id = v.id
+    JOIN users u ON l.user_id = u.id
+    ''')
+    cursor.execute('CREATE INDEX idx_labels_enriched_labeled_at ON labels_enriched (labeled_at, id)')
+    cursor.execute('CREATE INDEX idx_labels_enriched_labeled_by ON labels_enriched (labeled_by, labeled_at)')
+    cursor.execute('CREATE INDEX idx_labels_enriched_channel ON labels_enriched (channel_name)')
+    cursor.execute('CREATE INDEX idx_labels_enriched_label ON labels_enriched (is_clickbait, confidence_level)')
+    cursor.execute('ANALYZE')
+
+
+def refresh_replica(wait=False, max_age=None):
+    """Snapshot the live database into the replica file.
+
+    Only one process refreshes at a time; returns False without doing
+    anything if another refresh is running and `wait` is False. With
+    `max_age`, a snapshot that is still younger than that once the lock
+    is held (another process just refreshed it) is kept.
+    """
+    with open(REPLICA_PATH + '.lock', 'w') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+        except BlockingIOError:
+            return False
+        if max_age is not None and replica_age() <= max_age:
+            return True
+
+        snapshot_at = time.time()
+        started = time.monotonic()
+        tmp_path = REPLICA_PATH + '.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        snapshot = sqlite3.connect(tmp_path)
+        try:
+            # A single-step backup reads the source in one transaction,
+            # giving a consistent snapshot without blocking writers (WAL)
+            with get_db_connection() as conn:
+                conn.backup(snapshot)
+            snapshot.execute("PRAGMA journal_mode = DELETE")
+            _build_read_optimizations(snapshot)
+            snapshot.commit()
+        finally:
+            snapshot.close()
+
+        # The data is as old as the start of the backup, not its end
+        os.utime(tmp_path, (snapshot_at, snapshot_at))
+        os.replace(tmp_path, REPLICA_PATH)
+        logger.info(f"Refreshed read replica in {time.monotonic() - started:.2f}s")
+    return True
+
+
+def replica_age():
+    """Age in seconds of the replica's data (infinity if there is none)"""
+    try:
+        return time.time() - os.stat(REPLICA_PATH).st_mtime
+    except FileNotFoundError:
+        return float('inf')
+
+
+def _refresh_in_background():
+    global _refresh_thread
+
+    def run():
+        try:
+            refresh_replica()
+        except Exception as e:
+            logger.error(f"Background replica refresh failed: {e}")
+
+    with _refresh_lock:
+        if _refresh_thread is None or not _refresh_thread.is_alive():
+            _refresh_thread = threading.Thread(target=run, name='replica-refresh', daemon=True)
+            _refresh_thread.start()
+
+
+def get_replica_connection(max_staleness=REPLICA_MAX_STALENESS_SECONDS,
+                           refresh_after=REPLICA_REFRESH_AFTER_SECONDS):
+    """Borrow a read-only connection to a replica no older than `max_staleness`.
+
+    A replica older than `refresh_after` is still served, and refreshed in
+    the background for later readers. Raises if a needed refresh fails.
+    """
+    global _replica_identity
+
+    age = replica_age()
+    if age > max_staleness:
+        # Too old (or missing): take a fresh snapshot, or wait for the
+        # one another process is taking
+        refresh_replica(wait=True, max_age=max_staleness)
+    elif age > refresh_after:
+        _refresh_in_background()
+
+    stat = os.stat(REPLICA_PATH)
+    identity = (stat.st_ino, stat.st_mtime_ns)
+    with _identity_lock:
+        if identity != _replica_identity:
+            # The file was replaced; pooled connections point at the old one
+            replica_manager.reset()
+            _replica_identity = identity
+
+    return replica_manager.connection()
+
+
+def get_replica_stats():
+    """Replica age (None before the first refresh) and connection pool counters"""
+    stats = replica_manager.get_stats()
+    age = replica_age()
+    stats['age_seconds'] = age if age != float('inf') else None
+    return stats
@@ -0,0 +1,230 @@
+"""Retry scheduling for failed video extractions.
+
+A failed extraction is classified, counted on the video's row and
+scheduled again after an exponential backoff with jitter
+(RETRY_BASE_DELAY_SECONDS doubling up to RETRY_MAX_DELAY_SECONDS). The
+worker only picks pending videos whose ``next_attempt_at`` has passed,
+through the index ``idx_videos_due``.
+
+After RETRY_MAX_ATTEMPTS failures, or at once for errors that retrying
+cannot fix (removed, private or restricted videos), a video moves to
+``dead_letter_videos``. It stays there, unprocessed and out of the
+labeling queue, until an admin requeues it. Throttling is usually not
+the video's fault: the first RETRY_FREE_THROTTLES throttled attempts are
+recorded but not counted, and the video stays due. Later ones count as
+ordinary failures, so no video can stay due forever.
+"""
+
+import json
+import random
+import logging
+import datetime
+
+from config import (
+    RETRY_MAX_ATTEMPTS,
+    RETRY_BASE_DELAY_SECONDS,
+    RETRY_MAX_DELAY_SECONDS,
+    RETRY_FREE_THROTTLES,
+)
+from app.db_pool import get_db_connection, write_transaction
+from app.extraction import is_throttling_error
+from app.video_urls import canonical_video_url
+
+logger = logging.getLogger(__name__)
+
+# (error class, lowercase message fragments), checked in order
+ERROR_MARKERS = [
+    ('unavailable', (
+        'video unavailable', 'private video', 'has been removed', 'been terminated',
+        'no longer available', 'is not available', 'does not exist',
+    )),
+    ('restricted', (
+        'sign in to confirm your age', 'members-only', 'join this channel',
+        'not made this video available in your country', 'inappropriate for some users',
+    )),
+    ('network', (
+        'timed out', 'timeout', 'connection', 'name resolution', 'urlopen error',
+        'incompleteread', 'http error 5', 'unable to download',
+    )),
+]
+# Retrying these cannot succeed; they are dead-lettered on the first failure
+PERMANENT_ERROR_CLASSES = {'unavailable', 'restricted'}
+
+_MAX_ERROR_LENGTH = 1000
+
+
+def classify_error(error):
+    """Error class of an extraction failure: unavailable, restricted, throttled, network or error"""
+    message = str(error).lower()
+    # A removed video stays removed, whatever else the message says
+    for error_class, markers in ERROR_MARKERS:
+        if error_class in PERMANENT_ERROR_CLASSES and any(marker in message for marker in markers):
+            return error_class
+    if is_throttling_error(error):
+        return 'throttled'
+    for error_class, markers in ERROR_MARKERS:
+        if any(marker in message for marker in markers):
+            return error_class
+    return 'error'
+
+
+def backoff_delay(attempts):
+    """Seconds to wait after the given number of failed attempts.
+
+    The delay doubles with each attempt up to the cap; the jitter keeps
+    between half and all of it, so videos that failed together spread out.
+    """
+    delay = min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _timestamp(moment):
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def get_due_videos(limit=None):
+    """Pending videos whose next attempt is due, longest waiting first, as (video_id, video_url)"""
+    with get_db_connection() as conn:
+        rows = conn.execute('''
+            SELECT v.video_id, m.video_url
+            FROM videos v
+            LEFT JOIN video_metadata m ON m.video_id = v.id
+            WHERE v.processed = 0 AND v.next_attempt_at <= ?
+            ORDER BY v.next_attempt_at
+            LIMIT ?
+        ''', (_timestamp(datetime.datetime.utcnow()), limit or -1)).fetchall()
+        return [
+            (row['video_id'], row['video_url'] or canonical_video_url(row['video_id']))
+            for row in rows
+        ]
+
+
+def record_failures(failures):
+    """Schedule retries for failed videos, given (video_id, error) pairs.
+
+    Returns counts of videos scheduled for a retry, dead-lettered and throttled.
+    """
+    counts = {'retrying': 0, 'dead': 0, 'throttled': 0}
+    now = datetime.datetime.utcnow()
+    with write_transaction() as conn:
+        for video_id, error in failures:
+            error_class = classify_error(error)
+            message = str(error)[:_MAX_ERROR_LENGTH]
+
+            row = conn.execute(
+                "SELECT id, attempts, throttles FROM videos WHERE video_id = ?", (video_id,)
+            ).fetchone()
+            if row is None:
+                continue
+
+            if error_class == 'throttled':
+                if row['throttles'] < RETRY_FREE_THROTTLES:
+                    # Stays due for the next run without using up an attempt
+                    conn.execute('''
+                        UPDATE videos SET throttles = throttles + 1,
+                            last_error_class = ?, last_error = ?
+                        WHERE id = ?
+                    ''', (error_class, message, row['id']))
+                    counts['throttled'] += 1
+                    continue
+
+            attempts = row['attempts'] + 1
+
+            if attempts >= RETRY_MAX_ATTEMPTS or error_class in PERMANENT_ERROR_CLASSES:
+                conn.execute('''
+                    UPDATE videos SET attempts = ?, next_attempt_at = NULL,
+                        last_error_class = ?, last_error = ?
+                    WHERE id = ?
+                ''', (attempts, error_class, message, row['id']))
+                conn.execute('''
+                    INSERT INTO dead_letter_videos (video_id, attempts, error_class, last_error)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(video_id) DO UPDATE SET
+                        attempts = excluded.attempts,
+                        error_class = excluded.error_class,
+                        last_error = excluded.last_error,
+                        dead_at = CURRENT_TIMESTAMP
+                ''', (row['id'], attempts, error_class, message))
+                logger.warning(f"Video {video_id} dead-lettered after {attempts} attempts ({error_class})")
+                counts['dead'] += 1
+            else:
+                next_attempt_at = now + datetime.timedelta(seconds=backoff_delay(attempts))
+                conn.execute('''
+                    UPDATE videos SET attempts = ?, next_attempt_at = ?,
+                        last_error_class = ?, last_error = ?
+                    WHERE id = ?
+                ''', (attempts, _timestamp(next_attempt_at), error_class, message, row['id']))
+                counts['retrying'] += 1
+    return counts
+
+
+def get_dead_letters(error_class=None, limit=100, offset=0):
+    """Dead-lettered videos, most recent first, optionally of one error class"""
+    with get_db_connection() as conn:
+        rows = conn.execute('''
+            SELECT v.video_id, m.video_url, m.title, d.attempts, d.error_class,
+                   d.last_error, d.dead_at
+            FROM dead_letter_videos d
+            JOIN videos v ON v.id = d.video_id
+            LEFT JOIN video_metadata m ON m.video_id = d.video_id
+            WHERE ? IS NULL OR d.error_class = ?
+            ORDER BY d.dead_at DESC, d.video_id DESC
+            LIMIT ? OFFSET ?
+        ''', (error_class, error_class, limit, offset)).fetchall()
+        return [dict(row) for row in rows]
+
+
+def requeue_dead_letters(video_ids=None, error_class=None):
+    """Move dead-lettered videos back to the worker with a fresh attempt count.
+
+    Requeues the given YouTube video IDs, or every dead letter (of
+    `error_class`, if given). Returns the number of videos requeued.
+    """
+    with write_transaction() as conn:
+        if video_ids is not None:
+            rows = conn.execute('''
+                SELECT d.video_id FROM json_each(?) AS ids
+                CROSS JOIN videos v ON v.video_id = ids.value
+                JOIN dead_letter_videos d ON d.video_id = v.id
+                WHERE ? IS NULL OR d.error_class = ?
+            ''', (json.dumps(list(video_ids)), error_class, error_class)).fetchall()
+        else:
+            rows = conn.execute('''
+                SELECT video_id FROM dead_letter_videos
+                WHERE ? IS NULL OR error_class = ?
+            ''', (error_class, error_class)).fetchall()
+
+        ids = json.dumps([row['video_id'] for row in rows])
+        conn.execute('''
+            UPDATE videos SET attempts = 0, throttles = 0, next_attempt_at = CURRENT_TIMESTAMP
+            WHERE id IN (SELECT value FROM json_each(?))
+        ''', (ids,))
+        conn.execute('''
+            DELETE FROM dead_letter_videos
+            WHERE video_id IN (SELECT value FROM json_each(?))
+        ''', (ids,))
+    logger.info(f"Requeued {len(rows)} dead-lettered videos")
+    return len(rows)
+
+
+def get_retry_stats():
+    """Counts of pending videos due now, waiting for a retry, and dead-lettered by class"""
+    now = _timestamp(datetime.datetime.utcnow())
+    with get_db_connection() as conn:
+        pending = conn.execute('''
+            SELECT COALESCE(SUM(next_attempt_at <= ?), 0) AS due,
+                   COALESCE(SUM(next_attempt_at > ?), 0) AS waiting
+            FROM videos
+            WHERE processed = 0 AND next_attempt_at IS NOT NULL
+        ''', (now, now)).fetchone()
+        dead = conn.execute('''
+            SELECT error_class, COUNT(*) AS count
+            FROM dead_letter_videos
+            GROUP BY error_class
+        ''').fetchall()
+    return {
+        'due': pending['due'],
+        'waiting': pending['waiting'],
+        'dead': sum(row['count'] for row in dead),
+        'dead_by_class': {row['error_class']: row['count'] for row in dead},
+    }
@@ -0,0 +1,86 @@
+"""Ranked full-text search over video metadata (FTS5).
+
+The ``video_search`` index covers titles, descriptions and channel names
+and is kept in sync with ``video_metadata`` by triggers. Label filters
+are applied in the same query, and results are ordered by bm25 rank.
+"""
+
+from app.db_pool import get_db_connection
+
+SEARCH_COLUMNS = [
+    'video_id', 'title', 'channel_name', 'snippet', 'video_url',
+    'is_clickbait', 'confidence_level', 'labeled_by', 'labeled_at', 'rank'
+]
+
+
+def _quote(text):
+    """Quote user input as FTS5 strings so punctuation can't break the query"""
+    return ' '.join('"' + token.replace('"', '""') + '"' for token in text.split())
+
+
+def build_match_expression(query=None, channel=None):
+    """Combine a free-text query and a channel filter into one MATCH expression"""
+    parts = []
+    if query and query.strip():
+        parts.append(f"({_quote(query)})")
+    if channel and channel.strip():
+        parts.append(f"channel_name : ({_quote(channel)})")
+    return ' AND '.join(parts)
+
+
+def search_videos(query=None, channel=None, is_clickbait=None, confidence_level=None,
+                  labeled_only=False, page=1, page_size=20):
+    """Search videos by text and/or channel, optionally filtered by label.
+
+    Returns {'results': [...], 'page', 'page_size', 'has_more'}. Raises
+    ValueError if neither a query nor a channel is given.
+    """
+    match = build_match_expression(query, channel)
+    if not match:
+        raise ValueError("A search query or channel is required")
+
+    conditions = ["video_search MATCH ?"]
+    params = [match]
+    if is_clickbait is not None:
+        conditions.append("l.is_clickbait = ?")
+        params.append(1 if is_clickbait else 0)
+    if confidence_level is not None:
+        conditions.append("l.confidence_level = ?")
+        params.append(confidence_level)
+    if labeled_only or is_clickbait is not None or confidence_level is not None:
+        conditions.append("l.id IS NOT NULL")
+
+    page = max(1, int(page))
+    page_size = max(1, min(int(page_size), 200))
+    # One extra row tells whether another page exists
+    params.extend([page_size + 1, (page - 1) * page_size])
+
+    with get_db_connection() as conn:
+        rows = conn.execute(f'''
+            SELECT
+                v.video_id, m.title, m.channel_name,
+                snippet(video_search, 1, '[', ']', '...', 16) AS snippet,
+                m.video_url, l.is_clickbait, l.confidence_level,
+                u.username AS labeled_by, l.labeled_at,
+                video_search.rank AS rank
+            FROM video_search
+            JOIN video_metadata m ON m.video_id = video_search.rowid
+            JOIN videos v ON v.id = m.video_id
+            LEFT JOIN labels l ON l.video_id = v.id
+            LEFT JOIN users u ON u.id = l.user_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY video_search.rank
+            LIMIT ? OFFSET ?
+        ''', params).fetchall()
+
+    results = [dict(row) for row in rows[:page_size]]
+    for result in results:
+        if result['is_clickbait'] is not None:
+            result['is_clickbait'] = bool(result['is_clickbait'])
+
+    return {
+        'results': results,
+        'page': page,
+        'page_size': page_size,
+        'has_more': len(rows) > page_size,
+    }
@@ -0,0 +1,61 @@
+"""Admin settings stored in the database with a per-process cache.
+
+Every write bumps a global version number. Each process keeps all
+settings in memory and, at most once every SETTINGS_REFRESH_SECONDS,
+compares its cached version with ``MAX(version)`` in the database (an
+index lookup), reloading only when it changed. Reads in between are plain
+dictionary lookups, and an edit made in any process reaches every other
+process within the refresh interval.
+"""
+
+import time
+import threading
+
+from config import SETTINGS_REFRESH_SECONDS
+from app.db_pool import get_db_connection, write_transaction
+
+
+class SettingsCache:
+    def __init__(self, refresh_seconds=SETTINGS_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._values = {}
+        self._version = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Get a setting, revalidating the cache if the refresh interval passed"""
+        if time.monotonic() - self._checked_at >= self.refresh_seconds:
+            self._revalidate()
+        return self._values.get(key, default)
+
+    def set(self, key, value):
+        """Persist a setting and bump the settings version"""
+        with write_transaction() as conn:
+            conn.execute('''
+                INSERT INTO app_settings (key, value, version, updated_at)
+                VALUES (?, ?, (SELECT COALESCE(MAX(version), 0) + 1 FROM app_settings), CURRENT_TIMESTAMP)
+                ON CONFLICT(key) DO UPDATE SET
+                    value = excluded.value,
+                    version = excluded.version,
+                    updated_at = excluded.updated_at
+            ''', (key, value))
+        # Make the edit visible in this process immediately
+        self._revalidate()
+
+    def _revalidate(self):
+        with self._lock:
+            with get_db_connection() as conn:
+                version = conn.execute(
+                    "SELECT MAX(version) AS version FROM app_settings"
+                ).fetchone()['version']
+                if version != self._version:
+                    self._values = {
+                        row['key']: row['value']
+                        for row in conn.execute("SELECT key, value FROM app_settings")
+                    }
+                    self._version = version
+            self._checked_at = time.monotonic()
+
+
+settings = SettingsCache()
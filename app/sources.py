@@ -0,0 +1,168 @@
+"""Tracked channels and playlists, kept current by incremental syncs.
+
+A source remembers the newest SOURCE_WATERMARK_SIZE video IDs it has
+seen. A sync enumerates the source lazily, newest first, and stops at
+the first remembered ID, so yt-dlp only requests the pages that hold new
+videos rather than re-crawling the whole channel. New videos are queued
+as unprocessed rows for ``scripts/process_videos.py`` to extract. A failed
+sync records its error and leaves the watermark where it was.
+
+Only a source's first sync (and a full sync) is capped at
+SOURCE_INITIAL_SYNC_LIMIT entries. Incremental syncs read everything down to the watermark, since moving
+the watermark past a capped read would skip the videos in between.
+
+Playlists are read in playlist order. Videos appended to the end of a
+long playlist are therefore only picked up by a full sync
+(``sync_source(..., full=True)``), which reads up to
+SOURCE_INITIAL_SYNC_LIMIT entries and ignores the watermark.
+"""
+
+import json
+import time
+import logging
+import datetime
+
+from config import (
+    SOURCE_SYNC_INTERVAL_MINUTES,
+    SOURCE_INITIAL_SYNC_LIMIT,
+    SOURCE_WATERMARK_SIZE,
+)
+from app.db_pool import get_db_connection, write_transaction
+from app.database import add_pending_videos
+from app.video_urls import VIDEO_ID_PATTERN, canonical_source_url, canonical_video_url
+from app.extractors import get_extractor
+
+logger = logging.getLogger(__name__)
+
+
+def add_source(source_type, url, sync_interval_minutes=SOURCE_SYNC_INTERVAL_MINUTES):
+    """Start tracking a channel or playlist; returns its id. Raises ValueError for bad URLs"""
+    url = canonical_source_url(source_type, url)
+    with write_transaction() as conn:
+        conn.execute('''
+            INSERT INTO sources (source_type, url, sync_interval_minutes)
+            VALUES (?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET sync_interval_minutes = excluded.sync_interval_minutes
+        ''', (source_type, url, sync_interval_minutes))
+        return conn.execute("SELECT id FROM sources WHERE url = ?", (url,)).fetchone()['id']
+
+
+def remove_source(source_id):
+    """Stop tracking a source (videos already queued are kept)"""
+    with write_transaction() as conn:
+        conn.execute("DELETE FROM source_syncs WHERE source_id = ?", (source_id,))
+        conn.execute("DELETE FROM sources WHERE id = ?", (source_id,))
+
+
+def get_sources():
+    """All sources with their totals and the duration of their last sync"""
+    with get_db_connection() as conn:
+        rows = conn.execute('''
+            SELECT s.id, s.source_type, s.url, s.sync_interval_minutes,
+                   s.last_synced_at, s.next_sync_at, s.last_error,
+                   s.videos_found, s.videos_new, s.sync_count,
+                   (SELECT duration_seconds FROM source_syncs
+                    WHERE source_id = s.id ORDER BY started_at DESC, id DESC LIMIT 1)
+                       AS last_sync_seconds
+            FROM sources s
+            ORDER BY s.id
+        ''').fetchall()
+        return [dict(row) for row in rows]
+
+
+def get_source_syncs(source_id, limit=20):
+    """Most recent syncs of a source, newest first"""
+    with get_db_connection() as conn:
+        rows = conn.execute('''
+            SELECT started_at, duration_seconds, videos_found, videos_new, full_sync, error
+            FROM source_syncs
+            WHERE source_id = ?
+            ORDER BY started_at DESC, id DESC
+            LIMIT ?
+        ''', (source_id, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+
+def iter_source_entries(url):
+    """Yield (video_id, title, channel_name) for a source, newest first, fetching pages lazily"""
+    for entry in get_extractor().list_entries(url):
+        if VIDEO_ID_PATTERN.fullmatch(entry['id']):
+            yield entry['id'], entry['title'], entry['channel']
+
+
+def sync_source(source_id, full=False):
+    """Enumerate a source up to its watermark and queue the new videos; returns stats"""
+    with get_db_connection() as conn:
+        source = conn.execute("SELECT * FROM sources WHERE id = ?", (source_id,)).fetchone()
+    if source is None:
+        raise ValueError(f"Unknown source: {source_id}")
+
+    watermark = json.loads(source['last_seen_ids'])
+    known = set() if full else set(watermark)
+    limit = None if known else SOURCE_INITIAL_SYNC_LIMIT
+    started_at = datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    started = time.monotonic()
+    seen = []
+    videos = []
+    error = None
+
+    try:
+        for video_id, title, channel_name in iter_source_entries(source['url']):
+            if video_id in known:
+                break
+            seen.append(video_id)
+            videos.append({
+                'video_id': video_id,
+                'video_url': canonical_video_url(video_id),
+                'title': title,
+                'channel_name': channel_name,
+            })
+            if limit and len(seen) >= limit:
+                break
+        new_count = add_pending_videos(videos)
+    except Exception as e:
+        logger.error(f"Error syncing source {source['url']}: {e}")
+        error = str(e)
+        new_count = 0
+
+    duration = time.monotonic() - started
+    if error is None:
+        # Newest IDs first; keep earlier ones so a deleted video cannot
+        # make the next sync run past the watermark
+        merged = list(dict.fromkeys(seen + watermark))[:SOURCE_WATERMARK_SIZE]
+    else:
+        merged = watermark
+
+    with write_transaction() as conn:
+        conn.execute('''
+            UPDATE sources SET
+                last_seen_ids = ?,
+                last_synced_at = ?,
+                next_sync_at = datetime('now', '+' || sync_interval_minutes || ' minutes'),
+                last_error = ?,
+                videos_found = videos_found + ?,
+                videos_new = videos_new + ?,
+                sync_count = sync_count + 1
+            WHERE id = ?
+        ''', (json.dumps(merged), started_at, error, len(seen), new_count, source_id))
+        conn.execute('''
+            INSERT INTO source_syncs
+            (source_id, started_at, duration_seconds, videos_found, videos_new, full_sync, error)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (source_id, started_at, duration, len(seen), new_count, 1 if full else 0, error))
+
+    logger.info(
+        f"Synced {source['url']}: {len(seen)} found, {new_count} new in {duration:.1f}s"
+    )
+    return {'found': len(seen), 'new': new_count, 'duration_seconds': duration, 'error': error}
+
+
+def sync_due_sources(full=False):
+    """Sync every source whose next sync time has passed; returns {source_id: stats}"""
+    with get_db_connection() as conn:
+        due = [row['id'] for row in conn.execute('''
+            SELECT id FROM sources
+            WHERE next_sync_at <= datetime('now')
+            ORDER BY next_sync_at
+        ''')]
+    return {source_id: sync_source(source_id, full=full) for source_id in due}
@@ -0,0 +1,191 @@
+"""Resized WebP variants of stored thumbnails.
+
+Each variant in THUMBNAIL_VARIANTS is rendered once per thumbnail blob and
+stored under ``THUMBNAIL_DERIVATIVES_DIR/<variant>/ab/cd/<hash>.webp``.
+Since blobs are content-addressed, a derivative never changes once
+written, and clients can cache it indefinitely.
+
+New thumbnails are rendered by a background process pool, so downloads
+never wait on image resizing. Nothing renders inline: the public
+thumbnail route and the labeling UI serve finished files, queue anything
+missing for the pool (the UI shows the original image meanwhile), and
+``scripts/build_thumbnail_derivatives.py`` catches up on the rest.
+"""
+
+import os
+import atexit
+import functools
+import logging
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from config import (
+    THUMBNAIL_DERIVATIVES_DIR,
+    THUMBNAIL_VARIANTS,
+    THUMBNAIL_WEBP_QUALITY,
+    THUMBNAIL_DERIVATIVE_WORKERS,
+)
+from app.db_pool import get_db_connection
+from app.thumbnail_store import thumbnail_store
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+# Blobs with a render in the pool, so repeated requests queue it only once
+_queued = set()
+
+
+def derivative_path(digest, variant):
+    """Where a thumbnail blob's variant is stored"""
+    return os.path.join(
+        THUMBNAIL_DERIVATIVES_DIR, variant, digest[:2], digest[2:4], f"{digest}.webp"
+    )
+
+
+def _missing_targets(digest, variants=None):
+    targets = []
+    for variant in (variants or THUMBNAIL_VARIANTS):
+        path = derivative_path(digest, variant)
+        if not os.path.exists(path):
+            targets.append((path, THUMBNAIL_VARIANTS[variant]))
+    return targets
+
+
+def render_derivatives(blob_path, targets):
+    """Resize one image into each (path, (max width, max height)) target.
+
+    Runs in worker processes, so it is given every path it needs.
+    """
+    from PIL import Image
+
+    with Image.open(blob_path) as source:
+        source = source.convert('RGB')
+        for path, size in targets:
+            image = source.copy()
+            image.thumbnail(size, Image.LANCZOS)
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    image.save(f, 'WEBP', quality=THUMBNAIL_WEBP_QUALITY, method=4)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+    return len(targets)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned, not forked: callers (Streamlit, the extraction engine)
+            # are multi-threaded
+            _pool = ProcessPoolExecutor(
+                max_workers=THUMBNAIL_DERIVATIVE_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+            atexit.register(_pool.shutdown, wait=True)
+        return _pool
+
+
+def wait_for_renders():
+    """Shut down the background pool once its queued renders are done"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def _render_done(digest, future):
+    with _pool_lock:
+        _queued.discard(digest)
+    error = future.exception()
+    if error is not None:
+        logger.error(f"Error rendering thumbnail derivatives: {error}")
+
+
+def queue_derivatives(digests):
+    """Render the missing variants of these blobs in the background"""
+    for digest in set(digests):
+        targets = _missing_targets(digest)
+        if not targets:
+            continue
+        with _pool_lock:
+            if digest in _queued:
+                continue
+            _queued.add(digest)
+        _get_pool().submit(
+            render_derivatives, thumbnail_store.blob_path(digest), targets
+        ).add_done_callback(functools.partial(_render_done, digest))
+
+
+def build_derivatives(digests, workers=THUMBNAIL_DERIVATIVE_WORKERS):
+    """Render the missing variants of many blobs in a process pool and wait.
+
+    Returns the number of files written.
+    """
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for digest in digests:
+            targets = _missing_targets(digest)
+            if targets:
+                future = pool.submit(render_derivatives, thumbnail_store.blob_path(digest), targets)
+                futures[future] = digest
+        for future, digest in futures.items():
+            try:
+                written += future.result()
+            except Exception as e:
+                logger.error(f"Error rendering derivatives of {digest}: {e}")
+    return written
+
+
+def thumbnail_variant_path(video_id, variant='ui'):
+    """Local path of a video's thumbnail variant, or None if it has no stored thumbnail.
+
+    A variant not rendered yet is queued for the background pool, and the
+    original stored image is returned meanwhile.
+    """
+    digest = thumbnail_store.lookup([video_id]).get(video_id)
+    if digest is None:
+        return None
+    path = derivative_path(digest, variant)
+    if os.path.exists(path):
+        return path
+    blob_path = thumbnail_store.blob_path(digest)
+    if not os.path.exists(blob_path):
+        return None
+    queue_derivatives([digest])
+    return blob_path
+
+
+def gc_derivatives():
+    """Delete derivatives whose blob is no longer stored; returns files deleted"""
+    deleted = 0
+    if not os.path.isdir(THUMBNAIL_DERIVATIVES_DIR):
+        return deleted
+    for directory, _, files in os.walk(THUMBNAIL_DERIVATIVES_DIR):
+        digests = {name[:-5]: name for name in files if name.endswith('.webp')}
+        if not digests:
+            continue
+        placeholders = ','.join('?' for _ in digests)
+        with get_db_connection() as conn:
+            known = {row['hash'] for row in conn.execute(
+                f"SELECT hash FROM thumbnail_blobs WHERE hash IN ({placeholders})",
+                list(digests)
+            )}
+        for digest, name in digests.items():
+            if digest not in known:
+                try:
+                    os.remove(os.path.join(directory, name))
+                    deleted += 1
+                except FileNotFoundError:
+                    pass
+    logger.info(f"Thumbnail derivative GC: {deleted} files deleted")
+    return deleted
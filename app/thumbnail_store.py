@@ -0,0 +1,193 @@
+"""Content-addressed thumbnail storage.
+
+Each distinct image is stored once, named by the SHA-256 of its bytes and
+sharded into two levels of directories (``ab/cd/abcd....jpg``), so no
+directory grows past a few thousand entries and identical thumbnails
+(re-uploads, YouTube's default image) share one file.
+
+``video_thumbnails`` maps a video ID to a blob and ``thumbnail_blobs``
+counts references through triggers. Garbage collection removes blobs
+nothing refers to. A blob is touched whenever it is stored again, and
+GC leaves alone any file changed within THUMBNAIL_GC_GRACE_SECONDS, so a
+download that has not been assigned to its video yet is never collected.
+"""
+
+import os
+import time
+import hashlib
+import logging
+import tempfile
+
+from config import THUMBNAIL_STORE_DIR, THUMBNAIL_GC_GRACE_SECONDS
+from app.db_pool import get_db_connection, write_transaction
+
+logger = logging.getLogger(__name__)
+
+# Video IDs or hashes per IN (...) lookup (stays under SQLite's variable limit)
+_LOOKUP_CHUNK_SIZE = 500
+
+
+def _chunks(items, size=_LOOKUP_CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class ThumbnailStore:
+    """Sharded, deduplicated thumbnail files plus their database mapping"""
+
+    def __init__(self, root=THUMBNAIL_STORE_DIR):
+        self.root = root
+        self.tmp_dir = os.path.join(root, 'tmp')
+
+    def blob_path(self, digest):
+        """Where the blob with this hash is stored"""
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.jpg")
+
+    def temp_file(self):
+        """Open a temporary file on the store's filesystem; returns (file, path)"""
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.tmp_dir, suffix='.part')
+        return os.fdopen(fd, 'wb'), path
+
+    def add_file(self, tmp_path, digest):
+        """Move a fully written temp file into the store under its hash"""
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            # Already stored; refresh its mtime so GC keeps it
+            os.remove(tmp_path)
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        return path
+
+    def import_file(self, source_path):
+        """Copy an existing image into the store; returns (hash, size)"""
+        digest = hashlib.sha256()
+        f, tmp_path = self.temp_file()
+        try:
+            with f, open(source_path, 'rb') as source:
+                while True:
+                    block = source.read(64 * 1024)
+                    if not block:
+                        break
+                    digest.update(block)
+                    f.write(block)
+            size = os.path.getsize(tmp_path)
+            self.add_file(tmp_path, digest.hexdigest())
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest.hexdigest(), size
+
+    def assign(self, assignments):
+        """Point videos at blobs, given (video_id, hash, size) tuples"""
+        if not assignments:
+            return
+        with write_transaction() as conn:
+            conn.executemany('''
+                INSERT INTO thumbnail_blobs (hash, size) VALUES (?, ?)
+                ON CONFLICT(hash) DO NOTHING
+            ''', [(digest, size) for _, digest, size in assignments])
+            conn.executemany('''
+                INSERT INTO video_thumbnails (video_id, hash) VALUES (?, ?)
+                ON CONFLICT(video_id) DO UPDATE SET hash = excluded.hash
+            ''', [(video_id, digest) for video_id, digest, _ in assignments])
+
+    def lookup(self, video_ids):
+        """Map video IDs to the hashes of their stored thumbnails"""
+        video_ids = list(video_ids)
+        hashes = {}
+        with get_db_connection() as conn:
+            for chunk in _chunks(video_ids):
+                placeholders = ','.join('?' for _ in chunk)
+                rows = conn.execute(
+                    f"SELECT video_id, hash FROM video_thumbnails WHERE video_id IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                hashes.update((row['video_id'], row['hash']) for row in rows)
+        return hashes
+
+    def resolve(self, video_ids):
+        """Map video IDs to local thumbnail paths, for thumbnails present on disk"""
+        paths = {}
+        for video_id, digest in self.lookup(video_ids).items():
+            path = self.blob_path(digest)
+            if os.path.exists(path):
+                paths[video_id] = path
+        return paths
+
+    def resolve_one(self, video_id):
+        """Local thumbnail path of one video, or None"""
+        return self.resolve([video_id]).get(video_id)
+
+    def _is_settled(self, path, cutoff):
+        try:
+            return os.stat(path).st_mtime < cutoff
+        except FileNotFoundError:
+            return False
+
+    def gc(self, grace_seconds=THUMBNAIL_GC_GRACE_SECONDS):
+        """Delete unreferenced blobs and stray files; returns counts"""
+        cutoff = time.time() - grace_seconds
+        result = {'blobs_deleted': 0, 'files_deleted': 0, 'bytes_freed': 0}
+
+        def remove(path):
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                return
+            result['files_deleted'] += 1
+            result['bytes_freed'] += size
+
+        # Unreferenced blobs
+        with write_transaction() as conn:
+            orphans = [row['hash'] for row in conn.execute(f'''
+                DELETE FROM thumbnail_blobs
+                WHERE refcount <= 0 AND created_at < datetime('now', '-{int(grace_seconds)} seconds')
+                RETURNING hash
+            ''')]
+        result['blobs_deleted'] = len(orphans)
+        for digest in orphans:
+            path = self.blob_path(digest)
+            # A file touched since the cutoff is being stored again
+            if self._is_settled(path, cutoff):
+                remove(path)
+
+        # Files with no blob row (interrupted downloads, rows deleted above
+        # whose files were still settling) and abandoned temp files
+        if not os.path.isdir(self.root):
+            return result
+        for directory, _, files in os.walk(self.root):
+            if directory == self.tmp_dir:
+                for name in files:
+                    path = os.path.join(directory, name)
+                    if self._is_settled(path, cutoff):
+                        remove(path)
+                continue
+            digests = [name[:-4] for name in files if name.endswith('.jpg')]
+            if not digests:
+                continue
+            known = set()
+            with get_db_connection() as conn:
+                for chunk in _chunks(digests):
+                    placeholders = ','.join('?' for _ in chunk)
+                    known.update(row['hash'] for row in conn.execute(
+                        f"SELECT hash FROM thumbnail_blobs WHERE hash IN ({placeholders})",
+                        chunk
+                    ))
+            for digest in digests:
+                path = os.path.join(directory, f"{digest}.jpg")
+                if digest not in known and self._is_settled(path, cutoff):
+                    remove(path)
+
+        logger.info(
+            f"Thumbnail GC: {result['blobs_deleted']} blobs released, "
+            f"{result['files_deleted']} files deleted ({result['bytes_freed']} bytes)"
+        )
+        return result
+
+
+thumbnail_store = ThumbnailStore()
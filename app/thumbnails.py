@@ -0,0 +1,170 @@
+"""Thumbnail downloads.
+
+Requests go through the extractor backend (app.extractors); the live
+one shares a keep-alive session whose connection pool and retry policy
+are set in config. Images are streamed to a temporary file, hashed on
+the way, and moved into the content-addressed store (app.thumbnail_store)
+once complete, so a reader never sees a partial image.
+
+A video whose thumbnail is already stored is not downloaded again unless
+a refresh is asked for. A refresh sends the ETag and Last-Modified values
+saved from the previous download, so an unchanged image costs a 304
+response. New images are queued for resizing (app.thumbnail_derivatives).
+"""
+
+import os
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from config import THUMBNAIL_WORKERS
+from app.db_pool import get_db_connection, write_transaction
+from app.thumbnail_store import thumbnail_store
+from app.thumbnail_derivatives import queue_derivatives
+from app.extractors import get_extractor
+
+logger = logging.getLogger(__name__)
+
+# Video IDs per validator lookup (stays under SQLite's variable limit)
+_LOOKUP_CHUNK_SIZE = 500
+
+
+def _load_validators(video_ids):
+    validators = {}
+    with get_db_connection() as conn:
+        for i in range(0, len(video_ids), _LOOKUP_CHUNK_SIZE):
+            chunk = video_ids[i:i + _LOOKUP_CHUNK_SIZE]
+            placeholders = ','.join('?' for _ in chunk)
+            rows = conn.execute(f'''
+                SELECT video_id, url, etag, last_modified
+                FROM thumbnail_fetches
+                WHERE video_id IN ({placeholders})
+            ''', chunk).fetchall()
+            validators.update((row['video_id'], row) for row in rows)
+    return validators
+
+
+def _save_validators(fetched):
+    with write_transaction() as conn:
+        conn.executemany('''
+            INSERT INTO thumbnail_fetches (video_id, url, etag, last_modified, fetched_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(video_id) DO UPDATE SET
+                url = excluded.url,
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                fetched_at = excluded.fetched_at
+        ''', fetched)
+
+
+def _store_response(response):
+    """Stream a response body into the store; returns (hash, size)"""
+    digest = hashlib.sha256()
+    size = 0
+    f, tmp_path = thumbnail_store.temp_file()
+    try:
+        with f:
+            for block in response.iter_content(chunk_size=64 * 1024):
+                digest.update(block)
+                f.write(block)
+                size += len(block)
+        thumbnail_store.add_file(tmp_path, digest.hexdigest())
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return digest.hexdigest(), size
+
+
+def _download(video_id, url, current_hash, validators):
+    """Fetch one thumbnail.
+
+    Returns (hash or None, size, row for thumbnail_fetches or None); size is
+    None when the stored thumbnail is still current.
+    """
+    headers = {}
+    if current_hash and validators is not None and validators['url'] == url:
+        if validators['etag']:
+            headers['If-None-Match'] = validators['etag']
+        if validators['last_modified']:
+            headers['If-Modified-Since'] = validators['last_modified']
+
+    try:
+        response = get_extractor().open_thumbnail(url, headers)
+        with response:
+            if response.status_code == 304:
+                return current_hash, None, (
+                    video_id, url, validators['etag'], validators['last_modified']
+                )
+            if response.status_code != 200:
+                logger.warning(f"Thumbnail for {video_id} returned HTTP {response.status_code}")
+                return current_hash, None, None
+            digest, size = _store_response(response)
+            return digest, size, (
+                video_id, url,
+                response.headers.get('ETag'), response.headers.get('Last-Modified')
+            )
+    except (requests.RequestException, OSError) as e:
+        logger.error(f"Error downloading thumbnail for {video_id}: {e}")
+        return current_hash, None, None
+
+
+def fetch_thumbnails(thumbnails, refresh=False, workers=THUMBNAIL_WORKERS):
+    """Download thumbnails concurrently into the thumbnail store.
+
+    `thumbnails` is an iterable of (video_id, url) pairs. Videos whose
+    thumbnail is already stored are skipped unless `refresh` is set, in which
+    case they are revalidated with a conditional request. Returns
+    {video_id: local path}, with None for thumbnails that could not be fetched.
+    """
+    thumbnails = list(thumbnails)
+    stored = thumbnail_store.resolve(video_id for video_id, _ in thumbnails)
+    current = thumbnail_store.lookup(stored) if refresh else {}
+
+    paths = {}
+    to_fetch = []
+    for video_id, url in thumbnails:
+        if not url or (not refresh and video_id in stored):
+            paths[video_id] = stored.get(video_id)
+        else:
+            to_fetch.append((video_id, url))
+
+    if not to_fetch:
+        return paths
+
+    validators = _load_validators([video_id for video_id, _ in to_fetch]) if refresh else {}
+
+    def download(item):
+        video_id, url = item
+        return video_id, _download(
+            video_id, url, current.get(video_id), validators.get(video_id)
+        )
+
+    if len(to_fetch) == 1:
+        results = [download(to_fetch[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(to_fetch)),
+                                thread_name_prefix='thumbnail') as executor:
+            results = list(executor.map(download, to_fetch))
+
+    assignments = []
+    fetched = []
+    for video_id, (digest, size, row) in results:
+        paths[video_id] = thumbnail_store.blob_path(digest) if digest else None
+        if size is not None:
+            assignments.append((video_id, digest, size))
+        if row is not None:
+            fetched.append(row)
+    thumbnail_store.assign(assignments)
+    if assignments:
+        queue_derivatives(digest for _, digest, _ in assignments)
+    if fetched:
+        _save_validators(fetched)
+    return paths
+
+
+def fetch_thumbnail(url, video_id, refresh=False):
+    """Download a single thumbnail; returns its local path or None"""
+    return fetch_thumbnails([(video_id, url)], refresh=refresh)[video_id]
@@ -3,9 +3,11 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.image as mpimg
 import os
+import datetime
+import numpy as np
 
 from app.database import (
-    get_unlabeled_video_for_user, 
+    get_video_batch_for_user, 
     save_label, 
     get_user_stats, 
     get_db_connection, 
@@ -13,6 +15,7 @@ from app.database import (
     skip_video
 )
 from app.auth import logout_user
+from app.thumbnail_derivatives import thumbnail_variant_path
 
 def render_user_panel():
     """Render the user panel"""
@@ -29,6 +32,31 @@ def render_user_panel():
     with tabs[1]:
         render_user_stats()
 
+def get_current_video(user_id):
+    """Get the next video from the user's leased batch, claiming a new batch when needed"""
+    batch = st.session_state.get('lease_batch')
+    
+    if batch is None or batch.is_exhausted() or batch.is_expired():
+        batch = get_video_batch_for_user(user_id)
+        st.session_state['lease_batch'] = batch
+    elif batch.needs_renewal():
+        batch.renew()
+        if batch.is_exhausted():
+            batch = get_video_batch_for_user(user_id)
+            st.session_state['lease_batch'] = batch
+    
+    return batch.current()
+
+def thumbnail_source(video):
+    """Image to show for a video: the resized local copy, else YouTube's image.
+
+    Files from before the thumbnail store are used at their recorded path.
+    """
+    path = thumbnail_variant_path(video['video_id'], 'ui')
+    if path is None and video['local_thumbnail_path'] and os.path.exists(video['local_thumbnail_path']):
+        path = video['local_thumbnail_path']
+    return path or video['thumbnail_url']
+
 def render_labeling_interface():
     """Render interface for labeling videos"""
     user_id = st.session_state['user_id']
@@ -38,18 +66,25 @@ def render_labeling_interface():
     with st.expander("Labeling Instructions", expanded=False):
         st.markdown(instructions)
     
-    video = get_unlabeled_video_for_user(user_id)
+    # The video shown on the previous run is the one a clicked button
+    # refers to, even if the batch changed under it since (e.g. the lease
+    # expired and a new batch was claimed on this rerun)
+    shown = st.session_state.get('shown_video')
+    
+    video = get_current_video(user_id)
     
     if not video:
+        st.session_state['shown_video'] = None
         st.info("No more videos available for labeling at the moment!")
         return
+    st.session_state['shown_video'] = {'id': video['id'], 'video_id': video['video_id']}
 
     # Display video details
     st.markdown(f"### {video['title']}")
     
     col1, col2 = st.columns([1, 2])
     with col1:
-        st.image(video['thumbnail_url'])
+        st.image(thumbnail_source(video))
     with col2:
         st.write(video['description'][:500] + "..." if len(video['description']) > 500 else video['description'])
         st.write(f"Views: {video['view_count']} | Likes: {video['like_count']}")
@@ -85,50 +120,120 @@ def render_labeling_interface():
     
     with decision_cols[0]:
         if st.button("Yes, it's clickbait", disabled=not st.session_state['confidence_level']):
-            save_label(video['id'], user_id, True, st.session_state['confidence_level'])
-            st.session_state['confidence_level'] = 0
-            st.success("Response recorded!")
-            st.experimental_rerun()
+            record_label(user_id, shown, True)
     
     with decision_cols[1]:
         if st.button("No, it's not clickbait", disabled=not st.session_state['confidence_level']):
-            save_label(video['id'], user_id, False, st.session_state['confidence_level'])
-            st.session_state['confidence_level'] = 0
-            st.success("Response recorded!")
-            st.experimental_rerun()
+            record_label(user_id, shown, False)
             
     with decision_cols[2]:
-        if st.button("Skip this video"):
-            if skip_video(video['video_id'], user_id):
+        if st.button("Skip this video") and shown:
+            if skip_video(shown['video_id'], user_id):
+                st.session_state['lease_batch'].discard(shown['id'])
+                st.session_state['shown_video'] = None
                 st.success("Video skipped successfully!")
                 st.experimental_rerun()
             else:
                 st.error("Failed to skip video. You may have already skipped this video before.")
 
+def record_label(user_id, shown, is_clickbait):
+    """Save the label for the video the user was shown, if they still hold its lease"""
+    if not shown:
+        return
+    saved = save_label(shown['id'], user_id, is_clickbait, st.session_state['confidence_level'])
+    st.session_state['lease_batch'].discard(shown['id'])
+    st.session_state['shown_video'] = None
+    st.session_state['confidence_level'] = 0
+    if saved:
+        st.success("Response recorded!")
+    else:
+        st.warning("Your reservation of that video expired and it was not saved. Here is the next one.")
+    st.experimental_rerun()
+
 def render_user_stats():
     """Render user statistics"""
     st.header("My Contribution Statistics")
     
     user_id = st.session_state['user_id']
-    stats = get_user_stats(user_id)
     
-    # Display total contributions
-    st.metric("Total Contributions", stats['total'])
+    window = st.radio(
+        "Time window",
+        ["Last 7 days", "Last 30 days", "Last 365 days", "Custom range"],
+        horizontal=True
+    )
+    show_hourly = st.checkbox("Show hourly activity")
+    
+    if window == "Custom range":
+        today = datetime.date.today()
+        date_range = st.date_input(
+            "Date range",
+            value=(today - datetime.timedelta(days=29), today),
+            max_value=today
+        )
+        if len(date_range) != 2:
+            st.info("Select a start and an end date.")
+            return
+        stats = get_user_stats(
+            user_id, start_date=date_range[0], end_date=date_range[1], hourly=show_hourly
+        )
+    else:
+        days = int(window.split()[1])
+        stats = get_user_stats(user_id, days=days, hourly=show_hourly)
+    
+    # Display summary metrics
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Contributions", stats['total'])
+    with col2:
+        st.metric("In Selected Window", stats['window_total'])
+    with col3:
+        st.metric("Current Streak (days)", stats['current_streak'])
+    with col4:
+        st.metric("Longest Streak (days)", stats['longest_streak'])
     
     # Display daily contributions chart
-    st.subheader("Daily Contributions (Last 7 Days)")
+    st.subheader(f"Daily Contributions ({stats['start']} to {stats['end']})")
     
     daily_data = pd.DataFrame(stats['daily'])
     
     # Create a bar chart
-    if not daily_data.empty:
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.bar(daily_data['date'], daily_data['count'])
-        ax.set_xlabel('Date')
-        ax.set_ylabel('Number of Contributions')
-        ax.set_title('Your Daily Contributions')
-        plt.xticks(rotation=45, ha='right')
-        
-        st.pyplot(fig)
+    if not daily_data.empty and daily_data['count'].sum() > 0:
+        if len(daily_data) > 60:
+            render_contribution_heatmap(daily_data)
+        else:
+            fig, ax = plt.subplots(figsize=(10, 6))
+            ax.bar(daily_data['date'], daily_data['count'])
+            ax.set_xlabel('Date')
+            ax.set_ylabel('Number of Contributions')
+            ax.set_title('Your Daily Contributions')
+            plt.xticks(rotation=45, ha='right')
+            
+            st.pyplot(fig)
     else:
-        st.write("No contribution data available yet.")
\ No newline at end of file
+        st.write("No contribution data available yet.")
+    
+    if show_hourly:
+        st.subheader("Hourly Activity (UTC)")
+        hourly_data = pd.DataFrame(stats['hourly'])
+        if not hourly_data.empty:
+            st.bar_chart(hourly_data.set_index('hour')['count'])
+        else:
+            st.write("No labels in this window.")
+
+def render_contribution_heatmap(daily_data):
+    """Render daily counts as a weekday-by-week heatmap"""
+    dates = pd.to_datetime(daily_data['date'])
+    first_monday = dates.min() - pd.to_timedelta(dates.min().weekday(), unit='D')
+    weeks = ((dates - first_monday).dt.days // 7).astype(int)
+    
+    grid = np.zeros((7, weeks.max() + 1))
+    grid[dates.dt.weekday.values, weeks.values] = daily_data['count'].values
+    
+    fig, ax = plt.subplots(figsize=(12, 3))
+    ax.imshow(grid, aspect='auto', cmap='Greens')
+    ax.set_yticks(range(7))
+    ax.set_yticklabels(['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'])
+    ax.set_xlabel('Week')
+    ax.set_title('Your Daily Contributions')
+    
+    st.pyplot(fig)
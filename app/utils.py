@@ -4,7 +4,8 @@ import hashlib
 import logging
 from datetime import datetime
 
-from config import THUMBNAILS_DIR
+from app.db_pool import get_db_connection
+from app.thumbnail_store import thumbnail_store
 
 # Set up logging
 logging.basicConfig(
@@ -28,14 +29,23 @@ def zip_directory(directory_name, zip_name):
         return False
 
 def get_thumbnail_zip(timestamp=None):
-    """Create and return a zip of thumbnails"""
+    """Create and return a zip of thumbnails, one `{video_id}.jpg` per video"""
     if timestamp is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
     zip_path = f"thumbnails_{timestamp}.zip"
-    if zip_directory(THUMBNAILS_DIR, zip_path):
+    try:
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf, \
+                get_db_connection() as conn:
+            for row in conn.execute("SELECT video_id, hash FROM video_thumbnails ORDER BY video_id"):
+                blob_path = thumbnail_store.blob_path(row['hash'])
+                if os.path.exists(blob_path):
+                    zipf.write(blob_path, f"{row['video_id']}.jpg")
+        logger.info(f"{zip_path} created successfully")
         return zip_path
-    return None
+    except Exception as e:
+        logger.error(f"Error creating zip file: {e}")
+        return None
 
 def secure_filename(filename):
     """Generate a secure version of a filename"""
@@ -0,0 +1,100 @@
+"""YouTube URL normalisation for videos, channels and playlists.
+
+The same video can be linked as ``youtu.be/ID``, ``watch?v=ID&t=10``,
+``/shorts/ID``, ``/embed/ID`` and more. Everything that fetches videos
+reduces links to the video ID first and uses one canonical watch URL, so
+duplicates are recognised before any network call.
+"""
+
+import re
+from urllib.parse import urlparse, parse_qs
+
+VIDEO_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{11}')
+
+_YOUTUBE_HOSTS = {
+    'youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com',
+    'youtube-nocookie.com', 'www.youtube-nocookie.com',
+}
+_PATH_PREFIXES = ('shorts', 'embed', 'live', 'v', 'e')
+
+
+def extract_video_id(url):
+    """Return the video ID a link points to, or None if it is not a video link"""
+    if not url:
+        return None
+    url = url.strip()
+    if VIDEO_ID_PATTERN.fullmatch(url):
+        return url
+    if '://' not in url:
+        url = 'https://' + url
+
+    parsed = urlparse(url)
+    host = (parsed.hostname or '').lower()
+    parts = [part for part in parsed.path.split('/') if part]
+
+    candidate = None
+    if host in ('youtu.be', 'www.youtu.be'):
+        candidate = parts[0] if parts else None
+    elif host in _YOUTUBE_HOSTS:
+        if parts and parts[0] == 'watch':
+            candidate = parse_qs(parsed.query).get('v', [None])[0]
+        elif len(parts) >= 2 and parts[0] in _PATH_PREFIXES:
+            candidate = parts[1]
+
+    if candidate and VIDEO_ID_PATTERN.fullmatch(candidate):
+        return candidate
+    return None
+
+
+def canonical_video_url(video_id):
+    """The one URL used for a video everywhere"""
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def canonicalize_video_urls(urls):
+    """Map links to {video_id: canonical URL}, dropping duplicates and non-video links.
+
+    Order follows the first occurrence of each video.
+    """
+    videos = {}
+    for url in urls:
+        video_id = extract_video_id(url)
+        if video_id and video_id not in videos:
+            videos[video_id] = canonical_video_url(video_id)
+    return videos
+
+
+def canonical_source_url(source_type, url):
+    """Canonical URL of a channel's uploads tab or of a playlist; raises ValueError"""
+    url = (url or '').strip()
+    if source_type == 'playlist':
+        if '://' not in url and '/' not in url and 'list=' not in url:
+            playlist_id = url
+        else:
+            if '://' not in url:
+                url = 'https://' + url
+            playlist_id = parse_qs(urlparse(url).query).get('list', [None])[0]
+        if not playlist_id or not re.fullmatch(r'[A-Za-z0-9_-]+', playlist_id):
+            raise ValueError(f"Not a playlist URL: {url!r}")
+        return f"https://www.youtube.com/playlist?list={playlist_id}"
+
+    if source_type == 'channel':
+        if url.startswith('@'):
+            url = 'youtube.com/' + url
+        if '://' not in url:
+            url = 'https://' + url
+        parsed = urlparse(url)
+        parts = [part for part in parsed.path.split('/') if part]
+        if (parsed.hostname or '').lower() in _YOUTUBE_HOSTS and parts:
+            if parts[0].startswith('@'):
+                base = parts[0]
+            elif parts[0] in ('channel', 'c', 'user') and len(parts) >= 2:
+                base = f"{parts[0]}/{parts[1]}"
+            else:
+                base = None
+            if base:
+                # The uploads tab lists videos newest first
+                return f"https://www.youtube.com/{base}/videos"
+        raise ValueError(f"Not a channel URL: {url!r}")
+
+    raise ValueError(f"Unknown source type: {source_type!r}")
@@ -0,0 +1,135 @@
+"""Warm, reusable yt-dlp instances.
+
+Building a ``YoutubeDL`` loads the extractor registry, parses the cookie
+file and starts with no open HTTP connections, which costs more than many
+of the metadata fetches it is used for. The pool keeps one instance per
+thread for each set of options and hands the same instance back on every
+call from that thread. YoutubeDL objects are not thread-safe, so
+instances are never shared between threads.
+
+An instance is recycled after YDL_POOL_MAX_USES extractions, after
+YDL_POOL_MAX_AGE_SECONDS, or after an unexpected exception that may have
+left its session in a bad state. Ordinary extraction failures (yt-dlp's
+DownloadError and ExtractorError, e.g. for an unavailable video) keep
+the instance. Instances owned by threads that have exited are closed the
+next time an instance is created; the extraction engine's threads are
+long-lived, so their instances stay warm across runs.
+"""
+
+import atexit
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+from yt_dlp import YoutubeDL
+from yt_dlp.utils import DownloadError, ExtractorError
+
+from config import YDL_POOL_MAX_USES, YDL_POOL_MAX_AGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledExtractor:
+    def __init__(self, options):
+        self.ydl = YoutubeDL(dict(options))
+        self.owner = threading.current_thread()
+        self.created = time.monotonic()
+        self.uses = 0
+        self.broken = False
+
+
+class YoutubeDLPool:
+    """Per-thread cache of configured YoutubeDL instances"""
+
+    def __init__(self, max_uses=YDL_POOL_MAX_USES, max_age=YDL_POOL_MAX_AGE_SECONDS):
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self._local = threading.local()
+        self._all = set()
+        self._lock = threading.Lock()
+        # Closing an instance writes the cookie file back; one at a time
+        self._close_lock = threading.Lock()
+        self._stats = {'created': 0, 'reused': 0, 'recycled': 0}
+
+    def _is_healthy(self, extractor):
+        return (
+            not extractor.broken
+            and extractor.uses < self.max_uses
+            and time.monotonic() - extractor.created < self.max_age
+        )
+
+    def _prune(self):
+        """Close instances left behind by threads that have exited"""
+        with self._lock:
+            orphans = [e for e in self._all if not e.owner.is_alive()]
+        for extractor in orphans:
+            self._close(extractor)
+
+    def _close(self, extractor):
+        with self._lock:
+            self._all.discard(extractor)
+        try:
+            with self._close_lock:
+                # Same as leaving a `with YoutubeDL(...)` block (saves cookies)
+                extractor.ydl.__exit__(None, None, None)
+        except Exception as e:
+            logger.warning(f"Error closing yt-dlp instance: {e}")
+
+    @contextmanager
+    def extractor(self, options):
+        """Borrow this thread's YoutubeDL configured with `options`"""
+        key = tuple(sorted(options.items()))
+        extractors = getattr(self._local, 'extractors', None)
+        if extractors is None:
+            extractors = self._local.extractors = {}
+
+        extractor = extractors.get(key)
+        if extractor is not None and not self._is_healthy(extractor):
+            del extractors[key]
+            self._close(extractor)
+            with self._lock:
+                self._stats['recycled'] += 1
+            extractor = None
+
+        if extractor is None:
+            self._prune()
+            extractor = extractors[key] = _PooledExtractor(options)
+            with self._lock:
+                self._all.add(extractor)
+                self._stats['created'] += 1
+        else:
+            with self._lock:
+                self._stats['reused'] += 1
+
+        extractor.uses += 1
+        try:
+            yield extractor.ydl
+        except (DownloadError, ExtractorError):
+            # The video failed, not the instance
+            raise
+        except Exception:
+            # The error may come from a dropped connection or stale cookies;
+            # start the next call from a fresh instance
+            extractor.broken = True
+            raise
+
+    def close_all(self):
+        """Close every instance, saving cookies; threads create new ones on next use"""
+        with self._lock:
+            extractors = list(self._all)
+        for extractor in extractors:
+            extractor.broken = True
+            self._close(extractor)
+
+    def get_stats(self):
+        """Return pool counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['open_instances'] = len(self._all)
+        return stats
+
+
+# Shared by the scraper, the worker threads and the module-level helpers
+ydl_pool = YoutubeDLPool()
+atexit.register(ydl_pool.close_all)
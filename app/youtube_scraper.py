@@ -1,18 +1,23 @@
 import os
-import time
 import pandas as pd
-import requests
-from yt_dlp import YoutubeDL
 import logging
-from config import THUMBNAILS_DIR
-from app.database import add_video, mark_video_processed
+from config import THUMBNAILS_DIR, EXTRACTION_FLUSH_SIZE
+from app.database import add_videos_bulk, get_processed_video_ids
+from app.extraction import ExtractionEngine, ExtractionResult
+from app.extractors import get_extractor
+from app.thumbnails import fetch_thumbnail
+from app.thumbnail_store import thumbnail_store
+from app.info_cache import info_cache
+from app.video_urls import extract_video_id, canonical_video_url, canonicalize_video_urls
 
 logger = logging.getLogger(__name__)
 
 class YouTubeDataScraper:
-    def __init__(self, save_dir=THUMBNAILS_DIR):
+    def __init__(self, save_dir=THUMBNAILS_DIR, use_info_cache=False):
         self.save_dir = save_dir
         self.cookies_file = './cookies.txt'  # Path to cookies file
+        # Reuse cached info dicts instead of extracting again (offline reprocessing)
+        self.use_info_cache = use_info_cache
         self.create_directories()
 
     def create_directories(self):
@@ -20,56 +25,66 @@ class YouTubeDataScraper:
             os.makedirs(self.save_dir)
 
     def download_thumbnail(self, url, video_id):
-        try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                file_path = os.path.join(self.save_dir, f"{video_id}.jpg")
-                with open(file_path, 'wb') as f:
-                    f.write(response.content)
-                return file_path
-        except Exception as e:
-            logger.error(f"Error downloading thumbnail: {e}")
-        return None
+        return fetch_thumbnail(url, video_id)
+
+    def extract_video_data(self, video_url):
+        """Fetch a video's metadata and thumbnail; raises on extraction errors"""
+        info = get_extractor().extract_info(video_url)
+        info_cache.put(info['id'], info)
+        
+        video_data = self.video_data_from_info(info)
+        logger.info(f"Successfully processed video: {info['title']}")
+        return video_data
+
+    def _cached_results(self, video_urls, misses):
+        """Yield results for the URLs with a fresh cached info dict; the rest go to `misses`"""
+        for video_url in video_urls:
+            video_id = extract_video_id(video_url)
+            info = info_cache.get(video_id) if video_id else None
+            if info is None:
+                misses.append(video_url)
+                continue
+            try:
+                # Offline: only a thumbnail already in the store is used
+                result = ExtractionResult(
+                    video_url, data=self.video_data_from_info(info, download_thumbnail=False)
+                )
+            except Exception as e:
+                result = ExtractionResult(video_url, error=e)
+            yield result
+
+    def video_data_from_info(self, info, download_thumbnail=True):
+        """Build a video row from a raw yt-dlp info dict.
+
+        With `download_thumbnail` off, only an already stored thumbnail is
+        used, so cached info dicts can be reprocessed offline.
+        """
+        video_id = info['id']
+        thumbnail_url = info.get('thumbnail', '')
+        if download_thumbnail:
+            thumbnail_path = self.download_thumbnail(thumbnail_url, video_id)
+        else:
+            thumbnail_path = thumbnail_store.resolve_one(video_id)
+        
+        return {
+            'video_id': video_id,
+            'title': info.get('title', ''),
+            'description': info.get('description', ''),
+            'view_count': info.get('view_count', 0),
+            'like_count': info.get('like_count', 0),
+            'dislike_count': info.get('dislike_count', 0),
+            'thumbnail_url': thumbnail_url,
+            'local_thumbnail_path': thumbnail_path,
+            'duration': info.get('duration', 0),
+            'upload_date': info.get('upload_date', ''),
+            'channel_id': info.get('channel_id', ''),
+            'channel_name': info.get('channel', ''),
+            'video_url': canonical_video_url(video_id)
+        }
 
     def get_video_data(self, video_url):
         try:
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': False,
-                'skip_download': True,
-                'cookiefile': self.cookies_file,  # Added cookies
-            }
-            with YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(video_url, download=False)
-                video_id = info['id']
-                thumbnail_url = info.get('thumbnail', '')
-                thumbnail_path = self.download_thumbnail(thumbnail_url, video_id)
-                
-                video_data = {
-                    'video_id': video_id,
-                    'title': info.get('title', ''),
-                    'description': info.get('description', ''),
-                    'view_count': info.get('view_count', 0),
-                    'like_count': info.get('like_count', 0),
-                    'dislike_count': info.get('dislike_count', 0),
-                    'thumbnail_url': thumbnail_url,
-                    'local_thumbnail_path': thumbnail_path,
-                    'duration': info.get('duration', 0),
-                    'upload_date': info.get('upload_date', ''),
-                    'channel_id': info.get('channel_id', ''),
-                    'channel_name': info.get('channel', ''),
-                    'video_url': video_url
-                }
-                
-                logger.info(f"Successfully processed video: {info['title']}")
-                
-                # Add to database and mark as processed
-                add_video(video_data)
-                mark_video_processed(video_id)
-                
-                return video_data
-                
+            return self.extract_video_data(video_url)
         except Exception as e:
             logger.error(f"Error processing video {video_url}: {e}")
             return None
@@ -82,39 +97,73 @@ class YouTubeDataScraper:
                 playlist_url = f"https://www.youtube.com/{channel_username}/videos"
             else:
                 playlist_url = channel_url
-            
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': True,
-                'playlistend': number_of_videos,
-                'cookiefile': self.cookies_file,  # Added cookies
-            }
-    
-            with YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(playlist_url, download=False)
-                if 'entries' in info:
-                    video_urls = [entry['url'] for entry in info['entries'] if 'url' in entry]
-                    logger.info(f"Found {len(video_urls)} videos on the channel")
-                    return video_urls
-                else:
-                    logger.info("No videos found on the channel")
-                    return []
+
+            entries = get_extractor().list_entries(playlist_url, limit=number_of_videos)
+            video_urls = [canonical_video_url(entry['id']) for entry in entries]
+            if video_urls:
+                logger.info(f"Found {len(video_urls)} videos on the channel")
+            else:
+                logger.info("No videos found on the channel")
+            return video_urls
         except Exception as e:
             logger.error(f"Error fetching channel videos: {e}")
             return []
 
+    def extract_and_save(self, video_urls, engine=None, on_video=None):
+        """Extract videos concurrently, saving each batch of results as it completes.
+
+        Returns a dict with the IDs of the saved videos and the URLs that
+        failed, with throttled URLs (worth retrying later) listed apart, and
+        `errors` mapping each failed or throttled URL to its exception. The
+        video data itself is not kept; pass `on_video` to see each row.
+
+        With `use_info_cache`, videos with a fresh cached info dict are
+        built from it without waiting for the rate limiter.
+        """
+        engine = engine or ExtractionEngine(self.extract_video_data)
+        summary = {'video_ids': [], 'failed': [], 'throttled': [], 'errors': {}}
+        pending = []
+
+        def results():
+            urls = video_urls
+            if self.use_info_cache:
+                urls = []
+                yield from self._cached_results(video_urls, urls)
+                logger.info(f"Using cached metadata for {len(video_urls) - len(urls)} videos")
+            yield from engine.run(urls)
+
+        def flush():
+            if pending:
+                # Add to database and mark as processed in one pass
+                result = add_videos_bulk(pending, processed=True)
+                logger.info(
+                    f"Saved videos: {result['inserted']} inserted, "
+                    f"{result['updated']} updated, {result['failed']} failed"
+                )
+                pending.clear()
+
+        for result in results():
+            if result.ok:
+                summary['video_ids'].append(result.data['video_id'])
+                if on_video:
+                    on_video(result.data)
+                pending.append(result.data)
+                if len(pending) >= EXTRACTION_FLUSH_SIZE:
+                    flush()
+            elif result.throttled:
+                logger.warning(f"Gave up on throttled video {result.item}")
+                summary['throttled'].append(result.item)
+                summary['errors'][result.item] = result.error
+            else:
+                logger.error(f"Error processing video {result.item}: {result.error}")
+                summary['failed'].append(result.item)
+                summary['errors'][result.item] = result.error
+        flush()
+        return summary
+
     def process_videos(self, video_urls):
         video_data_list = []
-        for url in video_urls:
-            logger.info(f"Processing video: {url}")
-            video_data = self.get_video_data(url)
-            if video_data:
-                video_data_list.append(video_data)
-                logger.info("Data collected successfully")
-            else:
-                logger.info("Failed to collect data")
-            time.sleep(1)
+        self.extract_and_save(video_urls, on_video=video_data_list.append)
         
         if video_data_list:
             df = pd.DataFrame(video_data_list)
@@ -135,60 +184,44 @@ def get_playlist_video_urls(playlist_id):
             return []
 
     playlist_url = f'https://www.youtube.com/playlist?list={playlist_id}'
-    
-    ydl_opts = {
-        'quiet': True,
-        'no_warnings': True,
-        'extract_flat': True,
-        'force_generic_extractor': False,
-        'ignoreerrors': True,
-        'no_color': True,
-        'geo_bypass': True,
-        'cookiefile': 'cookies.txt',  # Added cookies
-        'format': 'best',
-    }
 
     try:
-        with YoutubeDL(ydl_opts) as ydl:
-            try:
-                playlist_info = ydl.extract_info(playlist_url, download=False)
-                
-                if not playlist_info:
-                    logger.error("Could not fetch playlist information")
-                    return []
-
-                if 'entries' not in playlist_info:
-                    logger.error("No entries found in playlist")
-                    return []
-
-                video_urls = []
-                for entry in playlist_info['entries']:
-                    if entry and entry.get('id'):
-                        video_url = f"https://www.youtube.com/watch?v={entry['id']}"
-                        video_urls.append(video_url)
-                
-                if not video_urls:
-                    logger.warning("No valid videos found in playlist")
-                    return []
-                
-                logger.info(f"Successfully found {len(video_urls)} videos in playlist")
-                return video_urls
-
-            except Exception as e:
-                logger.error(f"Error extracting playlist info: {str(e)}")
-                return []
-
+        video_urls = [
+            canonical_video_url(entry['id'])
+            for entry in get_extractor().list_entries(playlist_url)
+        ]
     except Exception as e:
-        logger.error(f"Error initializing YouTube downloader: {str(e)}")
+        logger.error(f"Error extracting playlist info: {str(e)}")
         return []
 
+    if not video_urls:
+        logger.warning("No valid videos found in playlist")
+        return []
+
+    logger.info(f"Successfully found {len(video_urls)} videos in playlist")
+    return video_urls
+
 
 class YouTubeVideoFetcher:
     def __init__(self, save_dir=THUMBNAILS_DIR):
         self.scraper = YouTubeDataScraper(save_dir=save_dir)
+        self.skipped = 0  # Videos left out of the last fetch as already processed
+
+    def filter_new_videos(self, video_urls):
+        """Canonicalise links and drop duplicates and already processed videos.
+
+        Returns the canonical URLs still to fetch; looks the IDs up in one query.
+        """
+        videos = canonicalize_video_urls(video_urls)
+        known = get_processed_video_ids(videos) if videos else set()
+        self.skipped = len(known)
+        if known:
+            logger.info(f"Skipping {len(known)} videos already in the database")
+        return [url for video_id, url in videos.items() if video_id not in known]
 
     def fetch_videos(self, source_type, url, no_of_videos=100):
         video_urls = []
+        self.skipped = 0
 
         if source_type == "playlist":
             video_urls = get_playlist_video_urls(url)
@@ -200,6 +233,7 @@ class YouTubeVideoFetcher:
             logger.error("Invalid source type. Choose from 'playlist', 'video', or 'channel'.")
             return None
 
+        video_urls = self.filter_new_videos(video_urls)
         if video_urls:
             df = self.scraper.process_videos(video_urls)
             
@@ -209,6 +243,9 @@ class YouTubeVideoFetcher:
             else:
                 logger.error("No data was collected.")
                 return None
+        elif self.skipped:
+            logger.info("All videos found are already in the database.")
+            return None
         else:
             logger.error("No videos found.")
-            return None
\ No newline at end of file
+            return None
@@ -12,6 +12,13 @@ DATABASE_DIR = os.path.join(BASE_DIR, "database")
 # Database
 DATABASE_PATH = os.path.join(DATABASE_DIR, "clickbait_db.sqlite3")
 
+# SQLite connection pool and pragma tuning
+DB_POOL_MAX_IDLE = 8  # Idle connections kept open for reuse
+DB_BUSY_TIMEOUT_MS = 5000  # How long a writer waits on a lock before failing
+DB_SYNCHRONOUS = "NORMAL"  # Safe with WAL, avoids an fsync per commit
+DB_CACHE_SIZE_KB = 65536  # Page cache per connection
+DB_MMAP_SIZE = 268435456  # 256 MB memory-mapped I/O
+
 # Ensure directories exist
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(THUMBNAILS_DIR, exist_ok=True)
@@ -29,4 +36,101 @@ EMAIL_HOST = "smtp.example.com"
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = "noreply@example.com"
-EMAIL_HOST_PASSWORD = "your-email-password"
\ No newline at end of file
+EMAIL_HOST_PASSWORD = "your-email-password"
+
+# Labeling queue: how long a claimed video stays reserved for a labeler
+LABEL_LEASE_MINUTES = 15
+LABEL_BATCH_SIZE = 20  # Videos leased to a labeler per queue claim
+
+# Rows per transaction for bulk video ingestion
+BULK_INSERT_CHUNK_SIZE = 500
+
+# Rows fetched per round trip when streaming exports
+EXPORT_CHUNK_SIZE = 1000
+
+# Seconds a user's statistics stay cached (also invalidated on every new label)
+USER_STATS_CACHE_SECONDS = 300
+
+# API bearer tokens
+API_TOKEN_TTL_MINUTES = 60
+API_TOKEN_CACHE_SECONDS = 60  # Revocations reach other processes within this delay
+API_TOKEN_CACHE_SIZE = 1024
+API_TOKEN_SECRET_FILE = os.path.join(DATA_DIR, "api_token_secret")
+API_TOKEN_SECRET = os.environ.get("API_TOKEN_SECRET")  # Falls back to a generated secret in API_TOKEN_SECRET_FILE
+
+# How often each process checks the database for changed admin settings
+SETTINGS_REFRESH_SECONDS = 5
+
+# API database work runs on one bounded thread pool per endpoint group:
+# (max concurrent requests = pool threads, timeout in seconds for waiting and
+# for each DB call). Groups not listed get a pool of API_DB_MAX_WORKERS threads
+API_DB_MAX_WORKERS = 8
+API_ENDPOINT_LIMITS = {
+    'auth': (4, 10),
+    'stats': (4, 10),
+    'export': (2, 60),
+    'search': (4, 10),
+    'labels': (4, 10),
+    'thumbnails': (8, 10),
+    'retries': (2, 10),
+}
+
+# Read replica for exports and analytics (snapshot of the live database)
+REPLICA_PATH = os.path.join(DATABASE_DIR, "clickbait_replica.sqlite3")
+REPLICA_REFRESH_AFTER_SECONDS = 300  # Older snapshots are served, but refreshed in the background
+REPLICA_MAX_STALENESS_SECONDS = 900  # Older snapshots are never served; readers wait for a fresh one
+
+# Concurrent metadata extraction (YouTubeDataScraper.process_videos)
+EXTRACTION_WORKERS = 8
+EXTRACTION_RATE_PER_SECOND = 2.0  # Requests to YouTube across all workers
+EXTRACTION_BURST = 4
+EXTRACTION_MIN_RATE_PER_SECOND = 0.1  # Floor for the adaptive backoff
+EXTRACTION_THROTTLE_PAUSE_SECONDS = 30  # All workers pause this long after a throttling response
+EXTRACTION_THROTTLE_RETRIES = 3
+EXTRACTION_FLUSH_SIZE = 25  # Results written to the database per transaction
+
+# Failed extractions are retried with exponential backoff and jitter (app.retries)
+RETRY_MAX_ATTEMPTS = 5  # Failures before a video moves to the dead-letter table
+RETRY_BASE_DELAY_SECONDS = 15 * 60  # Delay after the first failure; doubles with each attempt
+RETRY_MAX_DELAY_SECONDS = 24 * 3600
+RETRY_FREE_THROTTLES = 3  # Throttled attempts a video gets for free; later ones count as failures
+
+# Reusable yt-dlp instances (one per thread and option set)
+YDL_POOL_MAX_USES = 200  # Extractions before an instance is recycled
+YDL_POOL_MAX_AGE_SECONDS = 3600
+
+# Thumbnail downloads
+THUMBNAIL_CONNECT_TIMEOUT = 5  # Seconds
+THUMBNAIL_READ_TIMEOUT = 20
+THUMBNAIL_RETRIES = 3
+THUMBNAIL_WORKERS = 16  # Concurrent downloads in bulk fetches (also the connection pool size)
+THUMBNAIL_STORE_DIR = os.path.join(THUMBNAILS_DIR, "store")  # Content-addressed, sharded by hash
+THUMBNAIL_GC_GRACE_SECONDS = 3600  # Unreferenced blobs younger than this are kept
+
+# Resized WebP variants of stored thumbnails: name -> (max width, max height)
+THUMBNAIL_DERIVATIVES_DIR = os.path.join(THUMBNAILS_DIR, "derivatives")
+THUMBNAIL_VARIANTS = {
+    'ui': (480, 270),    # Labeling page
+    'grid': (240, 135),  # Tables and search results
+}
+THUMBNAIL_WEBP_QUALITY = 80
+THUMBNAIL_DERIVATIVE_WORKERS = 2  # Background processes resizing new thumbnails
+THUMBNAIL_CACHE_MAX_AGE = 31536000  # Derivative URLs are content-addressed, so cache for a year
+
+# Raw yt-dlp info dicts, gzip-compressed, for offline reprocessing (process_videos.py --use-info-cache)
+INFO_CACHE_DIR = os.path.join(DATA_DIR, "info_cache")
+INFO_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+# Extractor backend (app.extractors): 'live' talks to YouTube, 'replay' serves a recorded corpus
+EXTRACTOR_BACKEND = os.environ.get("EXTRACTOR_BACKEND", "live")
+REPLAY_CORPUS_DIR = os.environ.get("REPLAY_CORPUS_DIR", os.path.join(DATA_DIR, "replay_corpus"))
+REPLAY_LATENCY_MS = 300  # Simulated per-request latency
+REPLAY_LATENCY_JITTER_MS = 100  # Latency varies uniformly by up to this much either way
+REPLAY_FAILURE_RATE = 0.0  # Share of extractions failing with a generic error
+REPLAY_THROTTLE_RATE = 0.0  # Share of extractions failing with an HTTP 429
+REPLAY_SEED = None  # Set for repeatable latency and failure sequences
+
+# Tracked channels and playlists (app.sources)
+SOURCE_SYNC_INTERVAL_MINUTES = 360
+SOURCE_INITIAL_SYNC_LIMIT = 500  # Entries read on a source's first (or a full) sync
+SOURCE_WATERMARK_SIZE = 50  # Newest IDs remembered per source; a sync stops at the first of them
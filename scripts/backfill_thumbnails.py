@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config import THUMBNAILS_DIR, THUMBNAIL_WORKERS
+from app.database import init_db, get_db_connection, update_thumbnail_paths
+from app.thumbnails import fetch_thumbnails
+from app.thumbnail_store import thumbnail_store
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Videos handled per round of downloads and database updates
+BATCH_SIZE = 1000
+
+
+def import_legacy_thumbnails():
+    """Move flat `{video_id}.jpg` files from THUMBNAILS_DIR into the thumbnail store"""
+    legacy = [
+        name for name in os.listdir(THUMBNAILS_DIR)
+        if name.endswith('.jpg') and os.path.isfile(os.path.join(THUMBNAILS_DIR, name))
+    ]
+    if not legacy:
+        return
+
+    logger.info(f"Importing {len(legacy)} thumbnails into the thumbnail store")
+    for i in range(0, len(legacy), BATCH_SIZE):
+        assignments = []
+        for name in legacy[i:i + BATCH_SIZE]:
+            digest, size = thumbnail_store.import_file(os.path.join(THUMBNAILS_DIR, name))
+            assignments.append((name[:-4], digest, size))
+        thumbnail_store.assign(assignments)
+        update_thumbnail_paths({
+            video_id: thumbnail_store.blob_path(digest)
+            for video_id, digest, _ in assignments
+        })
+        # Only remove the originals once the store and mapping are in place
+        for name in legacy[i:i + BATCH_SIZE]:
+            os.remove(os.path.join(THUMBNAILS_DIR, name))
+
+
+def backfill_thumbnails(refresh=False, workers=THUMBNAIL_WORKERS, limit=None):
+    """Download missing thumbnails (and revalidate existing ones with `refresh`)"""
+    init_db()
+    import_legacy_thumbnails()
+
+    query = '''
+        SELECT video_id, thumbnail_url FROM video_details
+        WHERE thumbnail_url IS NOT NULL AND thumbnail_url != ''
+    '''
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    with get_db_connection() as conn:
+        videos = [(row['video_id'], row['thumbnail_url']) for row in conn.execute(query)]
+
+    logger.info(f"Checking thumbnails for {len(videos)} videos")
+    stored = 0
+    missing = 0
+    for i in range(0, len(videos), BATCH_SIZE):
+        paths = fetch_thumbnails(videos[i:i + BATCH_SIZE], refresh=refresh, workers=workers)
+        update_thumbnail_paths(paths)
+        stored += sum(1 for path in paths.values() if path)
+        missing += sum(1 for path in paths.values() if not path)
+        logger.info(f"Processed {min(i + BATCH_SIZE, len(videos))}/{len(videos)} videos")
+
+    logger.info(f"Thumbnail backfill completed: {stored} stored, {missing} unavailable")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download thumbnails missing from disk")
+    parser.add_argument("--refresh", action="store_true",
+                        help="revalidate thumbnails already on disk (conditional requests)")
+    parser.add_argument("--workers", type=int, default=THUMBNAIL_WORKERS,
+                        help="concurrent downloads")
+    parser.add_argument("--limit", type=int, help="only check this many videos")
+    args = parser.parse_args()
+    backfill_thumbnails(refresh=args.refresh, workers=args.workers, limit=args.limit)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Benchmark the ingestion pipeline offline against a recorded corpus.
+
+record: build a replay corpus from the info cache and the thumbnail store
+        (everything past live extractions left on disk).
+bench:  for each worker count, queue the corpus as pending videos in a
+        scratch database and run the extraction pipeline against the
+        replay backend, with simulated latency and injected failures.
+        Each configuration runs in its own process and scratch directory,
+        so runs are isolated and the live data is never touched.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import logging
+import tempfile
+import subprocess
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import config
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def record(corpus_dir, limit=None):
+    """Copy cached info dicts and their stored thumbnails into a replay corpus"""
+    from app.info_cache import info_cache
+    from app.thumbnail_store import thumbnail_store
+
+    os.makedirs(os.path.join(corpus_dir, 'info'), exist_ok=True)
+    os.makedirs(os.path.join(corpus_dir, 'thumbnails'), exist_ok=True)
+    videos = thumbnails = 0
+    for video_id in info_cache.video_ids():
+        if limit and videos >= limit:
+            break
+        shutil.copyfile(
+            info_cache.path(video_id),
+            os.path.join(corpus_dir, 'info', f"{video_id}.json.gz")
+        )
+        videos += 1
+        thumbnail_path = thumbnail_store.resolve_one(video_id)
+        if thumbnail_path and os.path.exists(thumbnail_path):
+            shutil.copyfile(thumbnail_path, os.path.join(corpus_dir, 'thumbnails', f"{video_id}.jpg"))
+            thumbnails += 1
+    logger.info(f"Recorded {videos} videos ({thumbnails} with thumbnails) into {corpus_dir}")
+
+def _isolate(scratch_dir):
+    """Point every data path at a scratch directory; must run before app modules are imported"""
+    thumbnails_dir = os.path.join(scratch_dir, 'thumbnails')
+    os.makedirs(thumbnails_dir, exist_ok=True)
+    config.DATA_DIR = scratch_dir
+    config.DATABASE_PATH = os.path.join(scratch_dir, 'bench.sqlite3')
+    config.REPLICA_PATH = os.path.join(scratch_dir, 'bench_replica.sqlite3')
+    config.THUMBNAILS_DIR = thumbnails_dir
+    config.THUMBNAIL_STORE_DIR = os.path.join(thumbnails_dir, 'store')
+    config.THUMBNAIL_DERIVATIVES_DIR = os.path.join(thumbnails_dir, 'derivatives')
+    config.INFO_CACHE_DIR = os.path.join(scratch_dir, 'info_cache')
+
+def run_once(args):
+    """One benchmark run in a scratch directory; returns its measurements"""
+    scratch_dir = tempfile.mkdtemp(prefix='ingestion-bench-')
+    try:
+        _isolate(scratch_dir)
+
+        from app.database import init_db, add_pending_videos
+        from app.extraction import ExtractionEngine, TokenBucket
+        from app.extractors import ReplayExtractor, set_extractor
+        from app.retries import get_due_videos, record_failures
+        from app.video_urls import canonical_video_url
+        from app.youtube_scraper import YouTubeDataScraper
+        from app.ydl_pool import ydl_pool
+        from app.thumbnail_derivatives import wait_for_renders
+
+        init_db()
+        replay = ReplayExtractor(
+            corpus_dir=args.corpus, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+            failure_rate=args.failure_rate, throttle_rate=args.throttle_rate, seed=args.seed
+        )
+        set_extractor(replay)
+
+        video_ids = replay.video_ids()
+        if args.limit:
+            video_ids = video_ids[:args.limit]
+        add_pending_videos([
+            {'video_id': video_id, 'video_url': canonical_video_url(video_id)}
+            for video_id in video_ids
+        ])
+
+        started = time.monotonic()
+        # Same steps as scripts/process_videos.py, with the settings under test
+        urls = {video_url: video_id for video_id, video_url in get_due_videos()}
+        scraper = YouTubeDataScraper()
+        bucket = TokenBucket(rate=args.rate, burst=args.burst, pause_seconds=args.throttle_pause)
+        engine = ExtractionEngine(scraper.extract_video_data, workers=args.workers, bucket=bucket)
+        summary = scraper.extract_and_save(list(urls), engine=engine)
+        retries = record_failures((urls[url], error) for url, error in summary['errors'].items())
+        # Thumbnail resizing is part of ingestion, and renders into the scratch directory
+        wait_for_renders()
+        duration = time.monotonic() - started
+
+        return {
+            'workers': args.workers,
+            'videos': len(urls),
+            'processed': len(summary['video_ids']),
+            'failed': len(summary['failed']),
+            'throttled': len(summary['throttled']),
+            'dead_lettered': retries['dead'],
+            'duration_seconds': duration,
+            'videos_per_second': len(summary['video_ids']) / duration if duration else 0.0,
+            'final_rate': bucket.rate,
+            # All zero against the replay backend, which never builds a YoutubeDL
+            'ydl_pool': ydl_pool.get_stats(),
+        }
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+def bench(args):
+    """Run each worker count in a fresh process and print a comparison"""
+    if not os.path.isdir(os.path.join(args.corpus, 'info')):
+        logger.error(f"No replay corpus at {args.corpus}; create one with `record` first")
+        sys.exit(1)
+
+    results = []
+    for workers in args.workers:
+        command = [
+            sys.executable, __file__, 'run',
+            '--corpus', args.corpus,
+            '--workers', str(workers),
+            '--rate', str(args.rate),
+            '--burst', str(args.burst),
+            '--latency-ms', str(args.latency_ms),
+            '--jitter-ms', str(args.jitter_ms),
+            '--failure-rate', str(args.failure_rate),
+            '--throttle-rate', str(args.throttle_rate),
+            '--throttle-pause', str(args.throttle_pause),
+        ]
+        if args.seed is not None:
+            command += ['--seed', str(args.seed)]
+        if args.limit:
+            command += ['--limit', str(args.limit)]
+        logger.info(f"Benchmarking {workers} workers")
+        output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'workers':>8} {'videos':>7} {'ok':>6} {'failed':>7} {'dead':>5} {'throttled':>10} "
+          f"{'seconds':>8} {'videos/s':>9} {'end rate':>9} {'ydl new':>8} {'ydl reused':>11}")
+    for r in results:
+        print(f"{r['workers']:>8} {r['videos']:>7} {r['processed']:>6} {r['failed']:>7} "
+              f"{r['dead_lettered']:>5} {r['throttled']:>10} {r['duration_seconds']:>8.2f} "
+              f"{r['videos_per_second']:>9.2f} {r['final_rate']:>9.2f} "
+              f"{r['ydl_pool']['created']:>8} {r['ydl_pool']['reused']:>11}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ingestion offline with the replay extractor")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="build a replay corpus from the info cache")
+    record_parser.add_argument("--corpus", default=config.REPLAY_CORPUS_DIR)
+    record_parser.add_argument("--limit", type=int, help="record at most this many videos")
+
+    for name in ("bench", "run"):
+        sub = subparsers.add_parser(
+            name, help="compare worker counts" if name == "bench" else argparse.SUPPRESS
+        )
+        sub.add_argument("--corpus", default=config.REPLAY_CORPUS_DIR)
+        if name == "bench":
+            sub.add_argument("--workers", type=lambda s: [int(n) for n in s.split(",")],
+                             default=[1, 4, config.EXTRACTION_WORKERS],
+                             help="comma-separated worker counts to compare")
+        else:
+            sub.add_argument("--workers", type=int, required=True)
+        sub.add_argument("--limit", type=int, help="use at most this many corpus videos")
+        sub.add_argument("--rate", type=float, default=config.EXTRACTION_RATE_PER_SECOND,
+                         help="token bucket rate (requests per second)")
+        sub.add_argument("--burst", type=int, default=config.EXTRACTION_BURST)
+        sub.add_argument("--latency-ms", type=float, default=config.REPLAY_LATENCY_MS)
+        sub.add_argument("--jitter-ms", type=float, default=config.REPLAY_LATENCY_JITTER_MS)
+        sub.add_argument("--failure-rate", type=float, default=config.REPLAY_FAILURE_RATE)
+        sub.add_argument("--throttle-rate", type=float, default=config.REPLAY_THROTTLE_RATE)
+        sub.add_argument("--throttle-pause", type=float,
+                         default=config.EXTRACTION_THROTTLE_PAUSE_SECONDS,
+                         help="seconds all workers pause after a throttling response")
+        sub.add_argument("--seed", type=int, default=config.REPLAY_SEED)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.corpus, args.limit)
+    elif args.command == "bench":
+        bench(args)
+    else:
+        # Logs go to stderr; the last stdout line is the result for `bench`
+        print(json.dumps(run_once(args)))
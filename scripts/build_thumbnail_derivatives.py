@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config import THUMBNAIL_DERIVATIVE_WORKERS
+from app.database import init_db, get_db_connection
+from app.thumbnail_derivatives import build_derivatives
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render missing resized thumbnail variants")
+    parser.add_argument("--workers", type=int, default=THUMBNAIL_DERIVATIVE_WORKERS,
+                        help="worker processes")
+    args = parser.parse_args()
+
+    init_db()
+    with get_db_connection() as conn:
+        digests = [row['hash'] for row in conn.execute(
+            "SELECT hash FROM thumbnail_blobs WHERE refcount > 0"
+        )]
+    logger.info(f"Checking derivatives of {len(digests)} thumbnails")
+    written = build_derivatives(digests, workers=args.workers)
+    logger.info(f"Rendered {written} thumbnail variants")
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config import THUMBNAIL_GC_GRACE_SECONDS
+from app.database import init_db
+from app.thumbnail_store import thumbnail_store
+from app.thumbnail_derivatives import gc_derivatives
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete thumbnails no video refers to")
+    parser.add_argument("--grace-seconds", type=int, default=THUMBNAIL_GC_GRACE_SECONDS,
+                        help="keep files changed more recently than this")
+    args = parser.parse_args()
+
+    init_db()
+    thumbnail_store.gc(grace_seconds=args.grace_seconds)
+    gc_derivatives()
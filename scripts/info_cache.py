@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config import BULK_INSERT_CHUNK_SIZE
+from app.database import init_db, add_videos_bulk
+from app.info_cache import info_cache
+from app.youtube_scraper import YouTubeDataScraper
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def reprocess():
+    """Rebuild video rows from every cached info dict, without network access"""
+    init_db()
+    scraper = YouTubeDataScraper()
+    batch = []
+    totals = {'inserted': 0, 'updated': 0, 'failed': 0}
+
+    def flush():
+        result = add_videos_bulk(batch, processed=True)
+        for key in totals:
+            totals[key] += result[key]
+        batch.clear()
+
+    for video_id in info_cache.video_ids():
+        info = info_cache.get(video_id, max_age=float('inf'))
+        if info is None:
+            totals['failed'] += 1
+            continue
+        batch.append(scraper.video_data_from_info(info, download_thumbnail=False))
+        if len(batch) >= BULK_INSERT_CHUNK_SIZE:
+            flush()
+    if batch:
+        flush()
+
+    logger.info(
+        f"Reprocessed cached videos: {totals['inserted']} inserted, "
+        f"{totals['updated']} updated, {totals['failed']} failed"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the raw yt-dlp info dict cache")
+    parser.add_argument("command", choices=["reprocess", "prune"],
+                        help="reprocess: rebuild video rows from the cache offline; "
+                             "prune: delete expired entries")
+    args = parser.parse_args()
+
+    if args.command == "reprocess":
+        reprocess()
+    else:
+        info_cache.prune()
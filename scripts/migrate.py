@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.db_pool import get_db_connection
+from app.migrations import (
+    apply_migrations,
+    discover_migrations,
+    get_current_version,
+    get_pending_migrations,
+)
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def show_status():
+    """Print applied and pending migrations"""
+    with get_db_connection() as conn:
+        current = get_current_version(conn)
+    
+    print(f"Current schema version: {current}")
+    for version, name in discover_migrations():
+        state = "applied" if version <= current else "pending"
+        print(f"  [{state:>7}] {name}")
+
+def check():
+    """Exit non-zero if migrations are pending"""
+    pending = get_pending_migrations()
+    if pending:
+        print(f"{len(pending)} pending migration(s): {', '.join(name for _, name in pending)}")
+        return 1
+    print("Schema is up to date")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage database schema migrations")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    apply_parser = subparsers.add_parser("apply", help="Apply pending migrations")
+    apply_parser.add_argument("--target", type=int, default=None, help="Stop after this version")
+    subparsers.add_parser("status", help="Show applied and pending migrations")
+    subparsers.add_parser("check", help="Exit with status 1 if migrations are pending")
+    
+    args = parser.parse_args()
+    
+    if args.command == "apply":
+        applied = apply_migrations(target_version=args.target)
+        logger.info(f"Applied {len(applied)} migration(s)")
+        return 0
+    elif args.command == "status":
+        show_status()
+        return 0
+    elif args.command == "check":
+        return check()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,16 +2,20 @@
 
 import sys
 import os
+import argparse
 import logging
+import fcntl
 import datetime
-import time
 from pathlib import Path
 
 # Add parent directory to path to import app modules
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from app.database import init_db, get_db_connection
-from app.youtube_scraper import YouTubeVideoFetcher
+from app.database import init_db
+from app.retries import get_due_videos, record_failures
+from app.youtube_scraper import YouTubeDataScraper
+from app.ydl_pool import ydl_pool
+from config import DATA_DIR
 
 # Set up logging
 logging.basicConfig(
@@ -24,19 +28,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def process_pending_videos():
-    """Process videos that have been added but not processed"""
+def process_pending_videos(use_info_cache=False):
+    """Process pending videos that are due, scheduling retries for failures.
+
+    With `use_info_cache`, videos are rebuilt from cached metadata where
+    there is any, instead of being extracted again.
+    """
     logger.info("Starting video processing job")
     
     # Initialize the database if needed
     init_db()
     
-    # Get pending videos
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        pending_videos = cursor.execute(
-            "SELECT * FROM videos WHERE processed = 0 LIMIT 10"
-        ).fetchall()
+    # Pending videos whose next attempt is due (new videos are due at once)
+    pending_videos = get_due_videos()
     
     if not pending_videos:
         logger.info("No pending videos to process")
@@ -44,29 +48,40 @@ def process_pending_videos():
     
     logger.info(f"Found {len(pending_videos)} pending videos to process")
     
-    fetcher = YouTubeVideoFetcher()
-    
-    # Process each video
-    for video in pending_videos:
-        try:
-            logger.info(f"Processing video: {video['video_url']}")
-            fetcher.fetch_videos("video", video['video_url'])
-            logger.info(f"Successfully processed video: {video['video_id']}")
-        except Exception as e:
-            logger.error(f"Error processing video {video['video_id']}: {e}")
-            # Mark as processed anyway to avoid endless retry
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "UPDATE videos SET processed = 1 WHERE id = ?", 
-                    (video['id'],)
-                )
-                conn.commit()
-        
-        # Sleep to avoid rate limiting
-        time.sleep(2)
+    # Videos are extracted concurrently under a shared rate limit and
+    # saved as they complete
+    scraper = YouTubeDataScraper(use_info_cache=use_info_cache)
+    video_ids = {video_url: video_id for video_id, video_url in pending_videos}
+    summary = scraper.extract_and_save(list(video_ids))
     
-    logger.info("Video processing job completed")
+    # Failures are retried later with backoff, or dead-lettered; throttled
+    # videos stay due for the next run
+    retries = record_failures(
+        (video_ids[url], error) for url, error in summary['errors'].items()
+    )
+    logger.info(
+        f"Video processing job completed: {len(summary['video_ids'])} processed, "
+        f"{retries['retrying']} scheduled for retry, {retries['dead']} dead-lettered, "
+        f"{retries['throttled']} throttled and left for the next run"
+    )
+    pool = ydl_pool.get_stats()
+    logger.info(
+        f"yt-dlp instances: {pool['created']} created, {pool['reused']} reused, "
+        f"{pool['recycled']} recycled, {pool['open_instances']} open"
+    )
 
 if __name__ == "__main__":
-    process_pending_videos()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Extract pending videos that are due")
+    parser.add_argument("--use-info-cache", action="store_true",
+                        help="reuse cached metadata (up to INFO_CACHE_TTL_SECONDS old) "
+                             "instead of extracting again")
+    args = parser.parse_args()
+
+    # Runs can outlast the cron interval; never let two overlap
+    with open(os.path.join(DATA_DIR, "process_videos.lock"), "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            logger.info("Another video processing job is still running")
+            sys.exit(0)
+        process_pending_videos(use_info_cache=args.use_info_cache)
\ No newline at end of file
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+
+import sys
+import logging
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.database import init_db, rebuild_dashboard_stats
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def main():
+    """Recount the dashboard counters and report any drift"""
+    init_db()
+    
+    drift = rebuild_dashboard_stats()
+    if not drift:
+        logger.info("Dashboard counters were already consistent")
+        return
+    
+    for name, (stored, actual) in drift.items():
+        logger.warning(f"Counter {name} drifted: stored {stored}, actual {actual}")
+    logger.info(f"Rebuilt {len(drift)} drifted counter(s)")
+
+if __name__ == "__main__":
+    main()
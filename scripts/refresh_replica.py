@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+
+import sys
+import logging
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.database import init_db
+from app.replica import refresh_replica
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+if __name__ == "__main__":
+    init_db()
+    if not refresh_replica():
+        logger.info("Another process is already refreshing the replica")
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import fcntl
+import argparse
+import logging
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from config import DATA_DIR
+from app.database import init_db
+from app.sources import get_sources, sync_source, sync_due_sources
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Queue new videos from tracked channels and playlists")
+    parser.add_argument("--all", action="store_true", help="sync every source, not only those due")
+    parser.add_argument("--source", type=int, help="sync only this source id")
+    parser.add_argument("--full", action="store_true",
+                        help="ignore watermarks and re-read up to SOURCE_INITIAL_SYNC_LIMIT entries")
+    args = parser.parse_args()
+
+    init_db()
+    with open(os.path.join(DATA_DIR, "sync_sources.lock"), "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            logger.info("Another source sync is still running")
+            sys.exit(0)
+
+        if args.source:
+            sync_source(args.source, full=args.full)
+        elif args.all:
+            for source in get_sources():
+                sync_source(source['id'], full=args.full)
+        else:
+            results = sync_due_sources(full=args.full)
+            logger.info(f"Synced {len(results)} due sources")
@@ -0,0 +1,109 @@
+"""Shared fixtures. The whole session runs against a scratch data directory.
+
+Config paths are patched here, before any app module is imported, since
+modules bind them at import time.
+"""
+
+import os
+import sys
+import tempfile
+import itertools
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+
+_scratch_dir = tempfile.mkdtemp(prefix='clickbait-tests-')
+config.DATA_DIR = _scratch_dir
+config.DATABASE_PATH = os.path.join(_scratch_dir, 'test.sqlite3')
+config.REPLICA_PATH = os.path.join(_scratch_dir, 'test_replica.sqlite3')
+config.THUMBNAILS_DIR = os.path.join(_scratch_dir, 'thumbnails')
+config.THUMBNAIL_STORE_DIR = os.path.join(config.THUMBNAILS_DIR, 'store')
+config.THUMBNAIL_DERIVATIVES_DIR = os.path.join(config.THUMBNAILS_DIR, 'derivatives')
+config.INFO_CACHE_DIR = os.path.join(_scratch_dir, 'info_cache')
+config.API_TOKEN_SECRET_FILE = os.path.join(_scratch_dir, 'api_token_secret')
+os.makedirs(config.THUMBNAILS_DIR, exist_ok=True)
+
+from app.database import init_db, create_user, add_videos_bulk
+from app.db_pool import get_db_connection, write_transaction
+
+init_db()
+
+_ids = itertools.count()
+
+
+@pytest.fixture(autouse=True)
+def empty_queue():
+    """Each test starts with no labels and nothing queued for labeling"""
+    with write_transaction() as conn:
+        conn.execute("DELETE FROM label_queue")
+        conn.execute("DELETE FROM skipped_videos")
+        conn.execute("DELETE FROM labels")
+        conn.execute("DELETE FROM daily_stats")
+
+
+@pytest.fixture
+def make_user():
+    """Create a user; returns its row as a dict"""
+    def make(is_admin=False):
+        username = f"user{next(_ids)}"
+        assert create_user(username, f"{username}@example.com", 'password', is_admin=is_admin)
+        with get_db_connection() as conn:
+            row = conn.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
+        return dict(row)
+    return make
+
+
+def _video_row(video_id, **fields):
+    video = {
+        'video_id': video_id,
+        'title': f"Title of {video_id}",
+        'description': '',
+        'view_count': 0,
+        'like_count': 0,
+        'thumbnail_url': '',
+        'local_thumbnail_path': None,
+        'duration': 60,
+        'upload_date': '20240101',
+        'channel_id': 'channel',
+        'channel_name': 'Channel',
+        'video_url': f"https://www.youtube.com/watch?v={video_id}",
+    }
+    video.update(fields)
+    return video
+
+
+@pytest.fixture
+def make_video():
+    """Build a complete video row for add_videos_bulk, overriding any fields"""
+    return _video_row
+
+
+@pytest.fixture
+def queue_videos():
+    """Add processed videos, which queues them for labeling; returns their video_ids"""
+    def queue(count):
+        videos = [_video_row(f"vid{next(_ids):08d}") for _ in range(count)]
+        result = add_videos_bulk(videos, processed=True)
+        assert result['failed'] == 0
+        return [video['video_id'] for video in videos]
+    return queue
+
+
+@pytest.fixture
+def client():
+    """HTTP client for the FastAPI app"""
+    from fastapi.testclient import TestClient
+    from api.main import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def admin_token(client, make_user):
+    """Bearer token of a new admin, issued through /api/auth"""
+    admin = make_user(is_admin=True)
+    response = client.post('/api/auth', json={'username': admin['username'], 'password': 'password'})
+    assert response.status_code == 200
+    return response.json()['data']['access_token']
@@ -0,0 +1,38 @@
+from app.database import add_videos_bulk
+from app.db_pool import get_db_connection
+
+
+def _metadata(video_id):
+    with get_db_connection() as conn:
+        return dict(conn.execute('''
+            SELECT m.title, m.view_count, m.local_thumbnail_path
+            FROM video_metadata m JOIN videos v ON v.id = m.video_id
+            WHERE v.video_id = ?
+        ''', (video_id,)).fetchone())
+
+
+def test_upsert_keeps_stored_thumbnail_path(make_video):
+    add_videos_bulk([make_video('thumbkeep01', local_thumbnail_path='/thumbs/a.jpg')])
+
+    # A re-extraction whose thumbnail fetch failed, and a CSV row without the column
+    add_videos_bulk([make_video('thumbkeep01', title='New title', local_thumbnail_path=None)])
+    csv_row = make_video('thumbkeep01', view_count=5)
+    del csv_row['local_thumbnail_path']
+    add_videos_bulk([csv_row])
+
+    # Other fields still follow the latest row
+    assert _metadata('thumbkeep01') == {
+        'title': 'Title of thumbkeep01', 'view_count': 5, 'local_thumbnail_path': '/thumbs/a.jpg'
+    }
+
+
+def test_upsert_replaces_thumbnail_path(make_video):
+    add_videos_bulk([make_video('thumbnew001', local_thumbnail_path='/thumbs/a.jpg')])
+    add_videos_bulk([make_video('thumbnew001', local_thumbnail_path='/thumbs/b.jpg')])
+    assert _metadata('thumbnew001')['local_thumbnail_path'] == '/thumbs/b.jpg'
+
+
+def test_bulk_insert_beyond_the_sqlite_variable_limit(make_video):
+    videos = [make_video(f"bulk{i:07d}") for i in range(1500)]
+    assert add_videos_bulk(videos, chunk_size=1500) == {'inserted': 1500, 'updated': 0, 'failed': 0}
+    assert add_videos_bulk(videos, chunk_size=1500) == {'inserted': 0, 'updated': 1500, 'failed': 0}
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from app import label_queue
+from app.database import save_label
+from app.exporter import encode_cursor, decode_cursor, export_labeled_data
+from app.replica import refresh_replica
+
+
+def _label(user, count, queue_videos):
+    queue_videos(count)
+    for video in label_queue.claim_batch(user['id'], size=count).videos:
+        assert save_label(video['id'], user['id'], True, 3)
+    refresh_replica(wait=True)
+
+
+def _export(since=None):
+    chunks, _, _, next_cursor = export_labeled_data('ndjson', since=since)
+    lines = b''.join(chunks).decode('utf-8').splitlines()
+    return [json.loads(line)['video_id'] for line in lines if line], next_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor('2024-01-02 03:04:05', 42)
+    assert decode_cursor(cursor) == ('2024-01-02 03:04:05', 42)
+
+
+@pytest.mark.parametrize('cursor', ['not a cursor', 'é', encode_cursor('x', 1)[:-4] + '!!!!'])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        export_labeled_data('ndjson', since=cursor)
+
+
+def test_incremental_exports(make_user, queue_videos):
+    user = make_user()
+    _label(user, 3, queue_videos)
+
+    first, cursor = _export()
+    assert len(first) == 3
+
+    # Nothing new: no rows, and the cursor stays where it was
+    again, same_cursor = _export(since=cursor)
+    assert again == []
+    assert same_cursor == cursor
+
+    _label(user, 2, queue_videos)
+    second, next_cursor = _export(since=cursor)
+    assert len(second) == 2
+    assert set(second).isdisjoint(first)
+    assert next_cursor != cursor
+
+    # The new cursor covers everything exported so far
+    assert _export(since=next_cursor)[0] == []
+
+
+def test_export_endpoint_cursor_header(client, admin_token, make_user, queue_videos):
+    headers = {'Authorization': f"Bearer {admin_token}"}
+    _label(make_user(), 2, queue_videos)
+
+    response = client.get('/api/export-data', params={'format': 'ndjson'}, headers=headers)
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 2
+    cursor = response.headers['X-Next-Cursor']
+
+    response = client.get(
+        '/api/export-data', params={'format': 'ndjson', 'since': cursor}, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.text.strip() == ''
+    assert response.headers['X-Next-Cursor'] == cursor
+
+    response = client.get(
+        '/api/export-data', params={'format': 'ndjson', 'since': 'bogus'}, headers=headers
+    )
+    assert response.status_code == 400
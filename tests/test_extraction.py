@@ -0,0 +1,46 @@
+import urllib.error
+
+import pytest
+from yt_dlp.utils import DownloadError, ExtractorError
+
+from app.extraction import ExtractionEngine, TokenBucket, is_throttling_error
+
+
+@pytest.mark.parametrize('message', [
+    'ERROR: [youtube] Ab429xYz_0Q: Video unavailable. This video has been removed by the uploader',
+    'ERROR: [youtube] x429_ratelm: Private video',
+    'ERROR: [youtube] abcdefghijk: Unable to download webpage: timed out',
+])
+def test_ordinary_errors_are_not_throttling(message):
+    assert not is_throttling_error(DownloadError(message))
+
+
+@pytest.mark.parametrize('message', [
+    'ERROR: [youtube] abcdefghijk: Unable to download webpage: HTTP Error 429: Too Many Requests',
+    "ERROR: [youtube] abcdefghijk: Sign in to confirm you're not a bot",
+    'ERROR: [youtube] abcdefghijk: Sign in to confirm you’re not a bot',
+])
+def test_throttling_messages(message):
+    assert is_throttling_error(DownloadError(message))
+
+
+def test_throttling_status_of_wrapped_http_error():
+    http_error = urllib.error.HTTPError('https://www.youtube.com', 429, 'Slow down', {}, None)
+    error = ExtractorError('Unable to download API page', cause=http_error)
+    assert is_throttling_error(error)
+    assert is_throttling_error(DownloadError('ERROR: Unable to download API page', exc_info=(
+        ExtractorError, error, None
+    )))
+
+
+def test_unavailable_video_with_429_in_id_does_not_slow_the_bucket():
+    bucket = TokenBucket(rate=100, burst=10, pause_seconds=30)
+
+    def extract(video_id):
+        raise DownloadError(f'ERROR: [youtube] {video_id}: Video unavailable')
+
+    engine = ExtractionEngine(extract, workers=1, bucket=bucket, throttle_retries=3)
+    [result] = engine.run(['Ab429xYz_0Q'])
+
+    assert not result.ok and not result.throttled
+    assert bucket.rate == 100
@@ -0,0 +1,71 @@
+from app import label_queue
+from app.database import save_label
+from app.db_pool import get_db_connection, write_transaction
+
+
+def _expire_leases(user_id):
+    with write_transaction() as conn:
+        conn.execute(
+            "UPDATE label_queue SET lease_expires_at = 0 WHERE leased_to = ?", (user_id,)
+        )
+
+
+def test_concurrent_claims_do_not_overlap(make_user, queue_videos):
+    queue_videos(10)
+    alice, bob = make_user(), make_user()
+
+    first = label_queue.claim_batch(alice['id'], size=4)
+    second = label_queue.claim_batch(bob['id'], size=4)
+
+    first_ids = {video['id'] for video in first.videos}
+    second_ids = {video['id'] for video in second.videos}
+    assert len(first_ids) == 4
+    assert len(second_ids) == 4
+    assert first_ids.isdisjoint(second_ids)
+
+
+def test_claim_returns_held_leases_after_reload(make_user, queue_videos):
+    queue_videos(5)
+    alice = make_user()
+
+    batch = label_queue.claim_batch(alice['id'], size=3)
+    again = label_queue.claim_batch(alice['id'], size=3)
+
+    assert [v['id'] for v in again.videos] == [v['id'] for v in batch.videos]
+
+
+def test_save_label_with_lease(make_user, queue_videos):
+    queue_videos(1)
+    alice = make_user()
+    video = label_queue.claim_video(alice['id'])
+
+    assert save_label(video['id'], alice['id'], True, 3)
+    with get_db_connection() as conn:
+        queued = conn.execute("SELECT COUNT(*) FROM label_queue").fetchone()[0]
+        labels = conn.execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+    assert (queued, labels) == (0, 1)
+
+
+def test_save_label_rejected_after_lease_lost(make_user, queue_videos):
+    queue_videos(1)
+    alice, bob = make_user(), make_user()
+    video = label_queue.claim_video(alice['id'])
+
+    # Alice's lease runs out and Bob claims the video
+    _expire_leases(alice['id'])
+    assert label_queue.claim_video(bob['id'])['id'] == video['id']
+
+    assert not save_label(video['id'], alice['id'], True, 3)
+    assert save_label(video['id'], bob['id'], False, 2)
+    with get_db_connection() as conn:
+        labels = conn.execute("SELECT user_id FROM labels").fetchall()
+    assert [row['user_id'] for row in labels] == [bob['id']]
+
+
+def test_save_label_twice_is_rejected(make_user, queue_videos):
+    queue_videos(1)
+    alice = make_user()
+    video = label_queue.claim_video(alice['id'])
+
+    assert save_label(video['id'], alice['id'], True, 3)
+    assert not save_label(video['id'], alice['id'], True, 3)
@@ -0,0 +1,63 @@
+import os
+import time
+
+import pytest
+
+from app import replica
+from app.replica import get_replica_connection, refresh_replica, replica_age
+from config import REPLICA_PATH, REPLICA_REFRESH_AFTER_SECONDS, REPLICA_MAX_STALENESS_SECONDS
+
+
+def _age_replica(seconds):
+    then = time.time() - seconds
+    os.utime(REPLICA_PATH, (then, then))
+
+
+def _replica_users():
+    with get_replica_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+
+def test_age_counts_from_the_start_of_the_snapshot(monkeypatch):
+    build = replica._build_read_optimizations
+
+    def slow_build(conn):
+        time.sleep(0.3)
+        build(conn)
+
+    monkeypatch.setattr(replica, '_build_read_optimizations', slow_build)
+    refresh_replica(wait=True)
+    assert replica_age() >= 0.3
+
+
+def test_stale_replica_is_served_and_refreshed_in_background(monkeypatch):
+    refresh_replica(wait=True)
+    _age_replica(REPLICA_REFRESH_AFTER_SECONDS + 10)
+    started = []
+    monkeypatch.setattr(replica, '_refresh_in_background', lambda: started.append(True))
+
+    _replica_users()
+    assert started
+    assert replica_age() > REPLICA_REFRESH_AFTER_SECONDS
+
+
+def test_replica_past_max_staleness_is_never_served(make_user):
+    refresh_replica(wait=True)
+    before = _replica_users()
+    make_user()
+    _age_replica(REPLICA_MAX_STALENESS_SECONDS + 10)
+
+    assert _replica_users() == before + 1
+    assert replica_age() < REPLICA_REFRESH_AFTER_SECONDS
+
+
+def test_failed_refresh_is_not_hidden(monkeypatch):
+    refresh_replica(wait=True)
+    _age_replica(REPLICA_MAX_STALENESS_SECONDS + 10)
+
+    def broken_build(conn):
+        raise RuntimeError('disk full')
+
+    monkeypatch.setattr(replica, '_build_read_optimizations', broken_build)
+    with pytest.raises(RuntimeError):
+        get_replica_connection()
@@ -0,0 +1,123 @@
+import datetime
+import itertools
+
+import pytest
+from yt_dlp.utils import DownloadError
+
+from app import retries
+from app.database import add_pending_videos
+from app.db_pool import get_db_connection
+from app.retries import (
+    backoff_delay, classify_error, get_due_videos, record_failures, requeue_dead_letters,
+)
+from config import (
+    RETRY_BASE_DELAY_SECONDS, RETRY_MAX_DELAY_SECONDS, RETRY_MAX_ATTEMPTS, RETRY_FREE_THROTTLES,
+)
+
+THROTTLED = DownloadError('ERROR: [youtube] abcdefghijk: HTTP Error 429: Too Many Requests')
+TIMED_OUT = DownloadError('ERROR: [youtube] abcdefghijk: Unable to download webpage: timed out')
+
+
+_video_ids = itertools.count()
+
+
+@pytest.fixture
+def pending_video():
+    """A new pending video; returns its video_id"""
+    video_id = f"pending{next(_video_ids):04d}"
+    add_pending_videos([{'video_id': video_id, 'video_url': f"https://youtu.be/{video_id}"}])
+    return video_id
+
+
+def _row(video_id):
+    with get_db_connection() as conn:
+        return dict(conn.execute('''
+            SELECT v.attempts, v.throttles, v.next_attempt_at, v.last_error_class,
+                   d.error_class AS dead_class
+            FROM videos v LEFT JOIN dead_letter_videos d ON d.video_id = v.id
+            WHERE v.video_id = ?
+        ''', (video_id,)).fetchone())
+
+
+@pytest.mark.parametrize('attempts', range(1, 12))
+def test_backoff_doubles_up_to_the_cap(attempts):
+    delay = min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2 ** (attempts - 1))
+    for _ in range(20):
+        assert delay / 2 <= backoff_delay(attempts) <= delay
+
+
+def test_backoff_jitter_bounds(monkeypatch):
+    monkeypatch.setattr(retries.random, 'uniform', lambda low, high: high)
+    assert [backoff_delay(n) for n in (1, 2, 3)] == [
+        RETRY_BASE_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2, RETRY_BASE_DELAY_SECONDS * 4
+    ]
+    assert backoff_delay(50) == RETRY_MAX_DELAY_SECONDS
+    monkeypatch.setattr(retries.random, 'uniform', lambda low, high: low)
+    assert backoff_delay(1) == RETRY_BASE_DELAY_SECONDS / 2
+
+
+@pytest.mark.parametrize('message, error_class', [
+    ('ERROR: [youtube] Ab429xYz_0Q: Video unavailable. This video has been removed by the uploader',
+     'unavailable'),
+    ('ERROR: [youtube] abcdefghijk: Private video. Sign in if you have been granted access',
+     'unavailable'),
+    ('ERROR: [youtube] abcdefghijk: Sign in to confirm your age', 'restricted'),
+    ('ERROR: [youtube] abcdefghijk: HTTP Error 429: Too Many Requests', 'throttled'),
+    ('ERROR: [youtube] abcdefghijk: Unable to download webpage: timed out', 'network'),
+    ('ERROR: something else', 'error'),
+])
+def test_classify_error(message, error_class):
+    assert classify_error(DownloadError(message)) == error_class
+
+
+def test_failure_schedules_a_retry(pending_video):
+    before = datetime.datetime.utcnow()
+    assert record_failures([(pending_video, TIMED_OUT)]) == {'retrying': 1, 'dead': 0, 'throttled': 0}
+
+    row = _row(pending_video)
+    assert row['attempts'] == 1
+    assert row['last_error_class'] == 'network'
+    assert row['dead_class'] is None
+    next_attempt_at = datetime.datetime.strptime(row['next_attempt_at'], '%Y-%m-%d %H:%M:%S')
+    assert next_attempt_at >= before + datetime.timedelta(seconds=RETRY_BASE_DELAY_SECONDS / 2 - 1)
+    assert pending_video not in dict(get_due_videos())
+
+
+def test_dead_letter_after_max_attempts(pending_video):
+    for _ in range(RETRY_MAX_ATTEMPTS - 1):
+        record_failures([(pending_video, TIMED_OUT)])
+    assert _row(pending_video)['dead_class'] is None
+
+    assert record_failures([(pending_video, TIMED_OUT)])['dead'] == 1
+    row = _row(pending_video)
+    assert row['attempts'] == RETRY_MAX_ATTEMPTS
+    assert row['next_attempt_at'] is None
+    assert row['dead_class'] == 'network'
+
+
+def test_unavailable_video_with_429_in_id_is_dead_lettered_at_once(pending_video):
+    error = DownloadError('ERROR: [youtube] Ab429xYz_0Q: Video unavailable')
+    assert record_failures([(pending_video, error)])['dead'] == 1
+    assert _row(pending_video)['dead_class'] == 'unavailable'
+
+
+def test_throttling_is_free_only_a_few_times(pending_video):
+    for _ in range(RETRY_FREE_THROTTLES):
+        assert record_failures([(pending_video, THROTTLED)])['throttled'] == 1
+    row = _row(pending_video)
+    assert (row['attempts'], row['throttles']) == (0, RETRY_FREE_THROTTLES)
+    assert pending_video in dict(get_due_videos())
+
+    # Past the free throttles, it backs off and counts like any failure
+    assert record_failures([(pending_video, THROTTLED)])['retrying'] == 1
+    assert _row(pending_video)['attempts'] == 1
+    assert pending_video not in dict(get_due_videos())
+
+
+def test_requeue_resets_the_counters(pending_video):
+    record_failures([(pending_video, DownloadError('ERROR: Video unavailable'))])
+    assert requeue_dead_letters([pending_video]) == 1
+
+    row = _row(pending_video)
+    assert (row['attempts'], row['throttles'], row['dead_class']) == (0, 0, None)
+    assert pending_video in dict(get_due_videos())
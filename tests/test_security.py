@@ -0,0 +1,76 @@
+import pytest
+
+from api import security
+
+
+def _auth(token):
+    return {'Authorization': f"Bearer {token}"}
+
+
+def test_valid_token_is_accepted(client, admin_token):
+    assert client.get('/api/stats', headers=_auth(admin_token)).status_code == 200
+
+
+def test_missing_token_is_rejected(client):
+    response = client.get('/api/stats')
+    assert response.status_code == 401
+    assert response.headers['WWW-Authenticate'] == 'Bearer'
+
+
+def test_expired_token_is_rejected(client, make_user, monkeypatch):
+    monkeypatch.setattr(security, 'API_TOKEN_TTL_MINUTES', -1)
+    token, _ = security.issue_token(make_user(is_admin=True))
+
+    response = client.get('/api/stats', headers=_auth(token))
+    assert response.status_code == 401
+    assert response.json()['detail'] == 'Token expired'
+
+
+@pytest.mark.parametrize('tamper', [
+    # A different payload under the original signature, e.g. a forged admin claim
+    lambda payload, signature: f"{payload[:-2]}AA.{signature}",
+    lambda payload, signature: f"{payload}.{signature[:-2]}AA",
+    lambda payload, signature: payload,
+    lambda payload, signature: f"{payload}.{signature}.{signature}",
+])
+def test_tampered_token_is_rejected(client, admin_token, tamper):
+    token = tamper(*admin_token.split('.'))
+    assert client.get('/api/stats', headers=_auth(token)).status_code == 401
+
+
+def test_non_ascii_token_is_rejected(client):
+    # httpx only sends non-ASCII header values given as bytes
+    headers = {'Authorization': 'Bearer é.é'.encode('utf-8')}
+    assert client.get('/api/stats', headers=headers).status_code == 401
+
+
+def test_revoked_token_is_rejected(client, admin_token):
+    assert client.post('/api/auth/revoke', headers=_auth(admin_token)).status_code == 200
+    response = client.get('/api/stats', headers=_auth(admin_token))
+    assert response.status_code == 401
+    assert response.json()['detail'] == 'Token revoked'
+
+
+def test_non_admin_token_is_forbidden(client, make_user):
+    token, _ = security.issue_token(make_user())
+    assert client.get('/api/stats', headers=_auth(token)).status_code == 403
+
+
+def test_revocation_lookup_runs_within_db_limits(client, make_user, monkeypatch):
+    calls = []
+    run_db = security.run_db
+
+    async def recording_run_db(endpoint, func, *args, **kwargs):
+        calls.append((endpoint, func))
+        return await run_db(endpoint, func, *args, **kwargs)
+
+    monkeypatch.setattr(security, 'run_db', recording_run_db)
+    token, _ = security.issue_token(make_user(is_admin=True))
+
+    assert client.get('/api/stats', headers=_auth(token)).status_code == 200
+    assert ('auth', security.is_api_token_revoked) in calls
+
+    # Cached afterwards: no lookup at all
+    calls.clear()
+    assert client.get('/api/stats', headers=_auth(token)).status_code == 200
+    assert ('auth', security.is_api_token_revoked) not in calls
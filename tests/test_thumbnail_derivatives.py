@@ -0,0 +1,43 @@
+import pytest
+from PIL import Image
+
+from app import thumbnail_derivatives
+from app.thumbnail_derivatives import derivative_path, render_derivatives, thumbnail_variant_path
+from app.thumbnail_store import thumbnail_store
+from config import THUMBNAIL_VARIANTS
+
+
+@pytest.fixture
+def stored_thumbnail(tmp_path):
+    """A video with a stored thumbnail; returns (video_id, digest)"""
+    image_path = tmp_path / 'thumbnail.jpg'
+    Image.new('RGB', (640, 480), 'blue').save(image_path)
+    digest, size = thumbnail_store.import_file(str(image_path))
+    thumbnail_store.assign([('variantvid1', digest, size)])
+    return 'variantvid1', digest
+
+
+def test_missing_variant_is_queued_not_rendered(stored_thumbnail, monkeypatch):
+    video_id, digest = stored_thumbnail
+    queued = []
+
+    def no_inline_render(*args):
+        pytest.fail("rendered on the caller's thread")
+
+    monkeypatch.setattr(thumbnail_derivatives, 'render_derivatives', no_inline_render)
+    monkeypatch.setattr(thumbnail_derivatives, 'queue_derivatives', queued.extend)
+
+    assert thumbnail_variant_path(video_id, 'ui') == thumbnail_store.blob_path(digest)
+    assert queued == [digest]
+
+
+def test_rendered_variant_is_served(stored_thumbnail):
+    video_id, digest = stored_thumbnail
+    path = derivative_path(digest, 'ui')
+    render_derivatives(thumbnail_store.blob_path(digest), [(path, THUMBNAIL_VARIANTS['ui'])])
+
+    assert thumbnail_variant_path(video_id, 'ui') == path
+
+
+def test_video_without_thumbnail():
+    assert thumbnail_variant_path('nothumbnail', 'ui') is None
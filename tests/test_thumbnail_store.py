@@ -0,0 +1,85 @@
+import os
+import time
+import itertools
+
+import pytest
+from PIL import Image
+
+from app.database import add_videos_bulk
+from app.db_pool import get_db_connection, write_transaction
+from app.thumbnail_store import thumbnail_store
+
+# Distinct images across the session, so blobs are never shared between tests
+_colors = itertools.count(1)
+
+
+@pytest.fixture
+def make_blob(tmp_path):
+    """Store a distinct image; returns (digest, size)"""
+    def make():
+        image_path = tmp_path / 'thumbnail.jpg'
+        color = next(_colors)
+        Image.new('RGB', (32, 32), (color % 256, color // 256, 0)).save(image_path)
+        return thumbnail_store.import_file(str(image_path))
+    return make
+
+
+def _refcount(digest):
+    with get_db_connection() as conn:
+        row = conn.execute("SELECT refcount FROM thumbnail_blobs WHERE hash = ?", (digest,)).fetchone()
+    return row['refcount'] if row else None
+
+
+def _settle(digest):
+    """Make a blob look old enough for GC"""
+    with write_transaction() as conn:
+        conn.execute(
+            "UPDATE thumbnail_blobs SET created_at = datetime('now', '-1 hour') WHERE hash = ?", (digest,)
+        )
+    then = time.time() - 3600
+    os.utime(thumbnail_store.blob_path(digest), (then, then))
+
+
+def test_refcounts_follow_assignments(make_blob, make_video):
+    (first, size), (second, _) = make_blob(), make_blob()
+    add_videos_bulk([make_video('refcount001'), make_video('refcount002')], processed=False)
+
+    thumbnail_store.assign([('refcount001', first, size), ('refcount002', first, size)])
+    assert (_refcount(first), _refcount(second)) == (2, None)
+
+    # Reassigning moves the reference; assigning the same blob again changes nothing
+    thumbnail_store.assign([('refcount001', second, size), ('refcount002', first, size)])
+    assert (_refcount(first), _refcount(second)) == (1, 1)
+
+    # Deleting a video releases its thumbnail
+    with write_transaction() as conn:
+        conn.execute("DELETE FROM videos WHERE video_id = 'refcount002'")
+    assert (_refcount(first), _refcount(second)) == (0, 1)
+
+
+def test_gc_deletes_only_unreferenced_blobs(make_blob, make_video):
+    (kept, size), (orphan, _) = make_blob(), make_blob()
+    add_videos_bulk([make_video('gcvideo0001'), make_video('gcvideo0002')], processed=False)
+    thumbnail_store.assign([('gcvideo0001', kept, size), ('gcvideo0002', orphan, size)])
+    thumbnail_store.assign([('gcvideo0002', kept, size)])
+    for digest in (kept, orphan):
+        _settle(digest)
+
+    result = thumbnail_store.gc(grace_seconds=60)
+
+    assert result['blobs_deleted'] == 1
+    assert os.path.exists(thumbnail_store.blob_path(kept))
+    assert not os.path.exists(thumbnail_store.blob_path(orphan))
+    assert _refcount(kept) == 2
+    assert _refcount(orphan) is None
+
+
+def test_gc_keeps_new_unreferenced_blobs(make_blob):
+    # Stored but not yet assigned, e.g. mid-download
+    digest, _ = make_blob()
+    thumbnail_store.assign([('gcvideo0003', digest, 0)])
+    with write_transaction() as conn:
+        conn.execute("DELETE FROM video_thumbnails WHERE video_id = 'gcvideo0003'")
+
+    thumbnail_store.gc(grace_seconds=60)
+    assert os.path.exists(thumbnail_store.blob_path(digest))
@@ -0,0 +1,28 @@
+import pytest
+
+from app import youtube_scraper
+from app.info_cache import info_cache
+from app.youtube_scraper import YouTubeDataScraper
+
+
+def _info(video_id):
+    return {
+        'id': video_id,
+        'title': f"Title of {video_id}",
+        'thumbnail': f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+    }
+
+
+def test_info_cache_reprocessing_downloads_nothing(monkeypatch):
+    info_cache.put('cachedvid01', _info('cachedvid01'))
+
+    def offline(*args, **kwargs):
+        pytest.fail("reprocessing from the info cache went to the network")
+
+    monkeypatch.setattr(youtube_scraper, 'fetch_thumbnail', offline)
+    monkeypatch.setattr(youtube_scraper, 'get_extractor', offline)
+
+    scraper = YouTubeDataScraper(use_info_cache=True)
+    summary = scraper.extract_and_save(['https://www.youtube.com/watch?v=cachedvid01'])
+    assert summary['video_ids'] == ['cachedvid01']
+    assert summary['failed'] == []